@@ -0,0 +1,62 @@
+"""Throughput of small operations sent one by one or batched.
+
+Usage:
+    python -m benchmarks.bench_batching --ops 2000 --port 8799
+
+A WebSocketConsumer reflecting numpy runs in a background thread. Each
+scenario sends `--ops` additions to a small array pointer, then retrieves
+the last result, so the time includes executing every operation. The
+additions are independent: every pointer carries its parents, which makes
+long chains grow quadratically.
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from spycular import strike
+from spycular.consumer.websocket import WebSocketConsumer
+from spycular.producer.websocket import WebSocketsProducer
+from spycular.store.virtual import VirtualStore
+
+
+def serve(port: int) -> None:
+    consumer = WebSocketConsumer(VirtualStore(), "localhost", port)
+    consumer.set_module(np)
+    consumer.listen()
+
+
+def additions(remote_np, ops: int) -> float:
+    start = time.perf_counter()
+    x_ptr = remote_np.zeros(8)
+    for idx in range(ops):
+        y_ptr = x_ptr + idx
+    assert y_ptr.retrieve()[0] == ops - 1
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    threading.Thread(target=serve, args=(args.port,), daemon=True).start()
+    time.sleep(1)
+    producer = WebSocketsProducer(f"localhost:{args.port}")
+    remote_np = strike(np, producer)
+
+    single = additions(remote_np, args.ops)
+    with producer.batch(max_size=args.batch_size):
+        batched = additions(remote_np, args.ops)
+    print(f"{'mode':>8} {'time (s)':>9} {'ops/s':>10}")
+    for mode, seconds in (("single", single), ("batched", batched)):
+        print(f"{mode:>8} {seconds:>9.3f} {args.ops / seconds:>10.0f}")
+    print(f"speedup: {single / batched:.1f}x")
+    producer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Reassembly cost of chunked capnp Data fields (`combine_bytes`).
+
+Usage:
+    python -m benchmarks.bench_combine_bytes --min-size 1M --max-size 2G
+
+Payloads are split in `--chunk-size` chunks, as `chunk_bytes` would do, and
+reassembled. A linear implementation keeps the time per MB constant while
+the payload grows. The legacy `bytes +=` loop is measured up to
+`--legacy-max-size` since it grows quadratically.
+"""
+import argparse
+from typing import List
+
+from spycular.serde.capnp.recursive import combine_bytes
+
+from .utils import best_of, doubling_sizes, format_size, parse_size
+
+
+def legacy_combine_bytes(capnp_list: List[bytes]) -> bytes:
+    bytes_value = b""
+    for value in capnp_list:
+        bytes_value += value
+    return bytes_value
+
+
+def make_chunks(size: int, chunk_size: int) -> List[bytes]:
+    chunk = b"\x01" * min(size, chunk_size)
+    full, remainder = divmod(size, chunk_size)
+    chunks = [chunk] * full
+    if remainder:
+        chunks.append(chunk[:remainder])
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", default="1M")
+    parser.add_argument("--max-size", default="2G")
+    parser.add_argument("--chunk-size", default="1M")
+    parser.add_argument("--legacy-max-size", default="64M")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunk_size = parse_size(args.chunk_size)
+    legacy_max_size = parse_size(args.legacy_max_size)
+    print(
+        f"{'payload':>10} {'chunks':>7} {'combine (s)':>12} "
+        f"{'ms/MB':>8} {'legacy (s)':>11} {'ms/MB':>8}",
+    )
+    for size in doubling_sizes(
+        parse_size(args.min_size),
+        parse_size(args.max_size),
+    ):
+        chunks = make_chunks(size, chunk_size)
+        # Bound as defaults, the lambdas don't hold the name deleted below.
+        elapsed = best_of(
+            lambda chunks=chunks: combine_bytes(chunks),
+            args.repeat,
+        )
+        row = (
+            f"{format_size(size):>10} {len(chunks):>7} {elapsed:>12.4f} "
+            f"{elapsed * 1e3 / (size / 2**20):>8.3f}"
+        )
+        if size <= legacy_max_size:
+            legacy = best_of(
+                lambda chunks=chunks: legacy_combine_bytes(chunks),
+                1,
+            )
+            row += f" {legacy:>11.4f} {legacy * 1e3 / (size / 2**20):>8.3f}"
+        print(row)
+        del chunks
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""In-band array serde cost of each compression policy.
+
+Usage:
+    python -m benchmarks.bench_compression --min-size 1K --max-size 16M
+
+Arrays of several dtypes and contents (compressible or not) are serialized
+and deserialized with every codec, and with the adaptive snappy policy.
+Times are round trips; ratio is the message size over the array size.
+"""
+import argparse
+
+import numpy as np
+
+from spycular.serde.capnp.compression import CompressionPolicy
+from spycular.serde.capnp.context import serde_context
+from spycular.serde.capnp.deserialize import _deserialize
+from spycular.serde.capnp.serialize import _serialize
+
+from .utils import best_of, format_size, parse_size
+
+POLICIES = {
+    "none": CompressionPolicy(codec="none"),
+    "lz4": CompressionPolicy(codec="lz4", min_size=0, adaptive=False),
+    "zstd": CompressionPolicy(codec="zstd", min_size=0, adaptive=False),
+    "snappy": CompressionPolicy(codec="snappy", min_size=0, adaptive=False),
+    "adaptive": CompressionPolicy(codec="snappy"),
+}
+
+
+def make_arrays(size: int):
+    rng = np.random.default_rng(0)
+    return {
+        "float32 noise": rng.random(size // 4, dtype=np.float32),
+        "float64 zeros": np.zeros(size // 8),
+        "int64 arange": np.arange(size // 8),
+        "bool random": rng.random(size) > 0.5,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", default="1K")
+    parser.add_argument("--max-size", default="16M")
+    parser.add_argument("--factor", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'array':>14} {'size':>8} "
+        + " ".join(f"{name:>16}" for name in POLICIES),
+    )
+    size = parse_size(args.min_size)
+    while size <= parse_size(args.max_size):
+        for name, array in make_arrays(size).items():
+            cells = []
+            for policy in POLICIES.values():
+                with serde_context(compression=policy):
+                    blob = _serialize(array, to_bytes=True)
+
+                    def round_trip():
+                        _deserialize(
+                            _serialize(array, to_bytes=True),
+                            from_bytes=True,
+                        )
+
+                    seconds = best_of(round_trip, args.repeat)
+                ratio = len(blob) / array.nbytes
+                cells.append(f"{seconds * 1e3:>8.2f}ms {ratio:>5.2f}")
+            print(f"{name:>14} {format_size(size):>8} " + " ".join(cells))
+        size *= args.factor
+
+
+if __name__ == "__main__":
+    main()
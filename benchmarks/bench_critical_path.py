@@ -0,0 +1,97 @@
+"""Makespan of a skewed PointerGraph, before and after learning costs.
+
+Usage:
+    python -m benchmarks.bench_critical_path --workers 2 --branches 4
+
+The graph has a root, one slow node and `--branches` chains of two fast
+nodes. Nodes call `time.sleep`, which releases the GIL, so the makespan
+depends on the scheduling order and not on the number of cores.
+
+Without estimates every node costs the same, the chains look longer and
+run first, leaving the slow node for the end. Once a run measured the
+node times, the slow node starts first and the chains fill the other
+workers. The best of `--repeat` runs is reported for each.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+
+from spycular.pointer.callable_pointer import FunctionPointer
+from spycular.pointer.graph.async_graph import AsyncPointerGraph
+from spycular.pointer.graph.scheduler import GraphScheduler
+from spycular.reflection.reflected import ReflectedModule
+from spycular.store.virtual import VirtualStore
+
+
+def sleeps_module(slow: float, fast: float) -> ModuleType:
+    """A module sleeping under distinct paths, told apart by the costs."""
+    module = ModuleType("sleeps")
+    module.root = lambda: None
+    module.slow = lambda: time.sleep(slow)
+    module.fast = lambda: time.sleep(fast)
+    return module
+
+
+def skewed_graph(branches: int) -> AsyncPointerGraph:
+    root = FunctionPointer("root")
+    slow = FunctionPointer("slow")
+    pointers = [root, slow]
+    dependencies = {slow.id: [root.id]}
+    for _ in range(branches):
+        parent = root
+        for _ in range(2):
+            ptr = FunctionPointer("fast")
+            dependencies[ptr.id] = [parent.id]
+            pointers.append(ptr)
+            parent = ptr
+    return AsyncPointerGraph(pointers, dependencies=dependencies)
+
+
+def makespan(
+    scheduler: GraphScheduler,
+    graph: AsyncPointerGraph,
+    module: ModuleType,
+) -> float:
+    start = time.perf_counter()
+    asyncio.run(
+        scheduler.run(graph, ReflectedModule(module), VirtualStore(), None),
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--branches", type=int, default=4)
+    parser.add_argument("--slow", type=float, default=0.4)
+    parser.add_argument("--fast", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    module = sleeps_module(args.slow, args.fast)
+
+    results = {}
+    for name in ("unit costs", "learned costs"):
+        times = []
+        for _ in range(args.repeat):
+            executor = ThreadPoolExecutor(max_workers=args.workers)
+            scheduler = GraphScheduler(executor)
+            if name == "learned costs":
+                makespan(scheduler, skewed_graph(args.branches), module)
+            times.append(
+                makespan(scheduler, skewed_graph(args.branches), module)
+            )
+            scheduler.shutdown()
+        results[name] = min(times)
+
+    total = args.slow + 2 * args.branches * args.fast
+    print(f"{'ordering':>14} {'makespan (s)':>13}")
+    print(f"{'lower bound':>14} {total / args.workers:>13.3f}")
+    for name, seconds in results.items():
+        print(f"{name:>14} {seconds:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Retrieving an array again after a small update, with and without delta
+transfers.
+
+Usage:
+    python -m benchmarks.bench_delta --size 1G --changed 0.01
+
+The consumer array is updated (`--changed` of its bytes, in one contiguous
+region, or scattered with `--scattered`) and sent through the frame
+protocol, either whole or as the blocks that changed since the producer
+copy. Delta times include the block checksums on both sides, and the
+transfer time of the sent bytes at `--bandwidth` bytes per second.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from spycular.serde.capnp.delta import (
+    DEFAULT_BLOCK_SIZE,
+    DeltaArray,
+    DeltaCopy,
+    make_delta,
+)
+from spycular.serde.capnp.frames import FrameReader, iter_frames
+
+from .utils import format_size, parse_size
+
+
+def transfer(obj):
+    reader = FrameReader()
+    sent = 0
+    for frame in iter_frames(obj):
+        sent += memoryview(frame).nbytes
+        reader.feed(frame)
+    return reader.result(), sent
+
+
+def update(array: np.ndarray, changed: float, scattered: bool) -> None:
+    count = int(array.size * changed)
+    if scattered:
+        rng = np.random.default_rng(0)
+        array[rng.choice(array.size, count, replace=False)] += 1
+    else:
+        start = array.size // 3
+        array[start : start + count] += 1  # noqa: E203
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1G")
+    parser.add_argument("--changed", type=float, default=0.01)
+    parser.add_argument("--scattered", action="store_true")
+    parser.add_argument("--block-size", default=str(DEFAULT_BLOCK_SIZE))
+    parser.add_argument("--bandwidth", default="1G")
+    args = parser.parse_args()
+    bandwidth = parse_size(args.bandwidth)
+
+    block_size = parse_size(args.block_size)
+    array = np.zeros(parse_size(args.size) // 8)
+    copy = DeltaCopy(transfer(array)[0], block_size)
+    update(array, args.changed, args.scattered)
+
+    start = time.perf_counter()
+    result, full_sent = transfer(array)
+    full_time = time.perf_counter() - start
+    assert np.array_equal(result, array)
+
+    start = time.perf_counter()
+    delta, delta_sent = transfer(
+        make_delta(array, copy.checksums, copy.descriptor, block_size),
+    )
+    if isinstance(delta, DeltaArray):
+        copy.apply(delta)
+    else:
+        # Most blocks changed, the whole array was sent.
+        copy = DeltaCopy(delta, block_size)
+    delta_time = time.perf_counter() - start
+    assert np.array_equal(copy.obj, array)
+
+    print(f"{'mode':>6} {'time (s)':>9} {'sent':>10} {'with link (s)':>14}")
+    for mode, seconds, sent in [
+        ("full", full_time, full_sent),
+        ("delta", delta_time, delta_sent),
+    ]:
+        print(
+            f"{mode:>6} {seconds:>9.3f} {format_size(sent):>10} "
+            f"{seconds + sent / bandwidth:>14.3f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
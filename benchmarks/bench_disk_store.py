@@ -0,0 +1,65 @@
+"""Resident memory of a working set, on a VirtualStore and a DiskStore.
+
+Usage:
+    python -m benchmarks.bench_disk_store --arrays 16 --size 64M
+
+Every store saves `--arrays` float64 arrays of `--size` bytes, built one
+at a time, then reads every array back and sums it. The VirtualStore
+keeps them all in memory, the DiskStore writes them to .npy files and
+returns arrays memory-mapped on them, whose pages are only resident while
+an array is used.
+
+Each store runs in its own process, the peak is its largest resident set
+size, as reported by getrusage.
+"""
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from spycular.store.disk import DiskStore
+from spycular.store.virtual import VirtualStore
+
+from .utils import format_size, parse_size
+
+
+def fill_and_read(name: str, arrays: int, size: int, queue) -> None:
+    with tempfile.TemporaryDirectory() as path:
+        store = DiskStore(path) if name == "disk" else VirtualStore()
+        start = time.perf_counter()
+        for idx in range(arrays):
+            store.save(str(idx), np.full(size // 8, float(idx)))
+        total = sum(float(store.get(str(idx)).sum()) for idx in range(arrays))
+        seconds = time.perf_counter() - start
+        if name == "disk":
+            store.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put((seconds, peak, total))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arrays", type=int, default=16)
+    parser.add_argument("--size", type=parse_size, default="64M")
+    args = parser.parse_args()
+
+    print(f"working set: {format_size(args.arrays * args.size)}")
+    print(f"{'store':>8} {'time (s)':>9} {'peak RSS':>10}")
+    context = multiprocessing.get_context("spawn")
+    for name in ("virtual", "disk"):
+        queue = context.Queue()
+        process = context.Process(
+            target=fill_and_read,
+            args=(name, args.arrays, args.size, queue),
+        )
+        process.start()
+        seconds, peak, _ = queue.get()
+        process.join()
+        print(f"{name:>8} {seconds:>9.3f} {format_size(peak):>10}")
+
+
+if __name__ == "__main__":
+    main()
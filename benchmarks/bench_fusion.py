@@ -0,0 +1,71 @@
+"""Time and peak memory of an elementwise chain, with and without fusion.
+
+Usage:
+    python -m benchmarks.bench_fusion --size 80M --repeat 3
+
+The graph computes `((x + y) * 3 - x) / 2 + y` on two float64 arrays of
+`--size` bytes, keeping only the final result. Unfused, every operation
+allocates an array, stored until the next one ran. Fused, the first
+operation allocates the result and the next ones write into it.
+
+The peak is the largest memory traced by tracemalloc while the graph runs
+(numpy reports its buffers to it), on top of the two input arrays.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy
+
+from spycular import strike
+from spycular.pointer.graph.fusion import fuse_elementwise
+from spycular.producer.virtual import VirtualProducer
+from spycular.reflection.reflected import ReflectedModule
+from spycular.store.virtual import VirtualStore
+
+from .utils import format_size, parse_size
+
+
+def run(size: int, fuse: bool):
+    producer = VirtualProducer([], {})
+    np = strike(numpy, producer, lazy=True)
+    module = ReflectedModule(numpy)
+    storage = VirtualStore()
+    # Inputs first, outside of the measure.
+    x_ptr = np.ones(size // 8)
+    y_ptr = np.arange(size // 8, dtype="float64")
+    producer.recorder.pop_graph().solve(module, storage)
+
+    result = ((x_ptr + y_ptr) * 3 - x_ptr) / 2 + y_ptr
+    graph = producer.recorder.pop_graph()
+    # Only the result is read back.
+    graph.pinned = {result.id}
+    if fuse:
+        fuse_elementwise(graph)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph.solve(module, storage)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=parse_size, default="80M")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'graph':>8} {'time (s)':>9} {'peak':>10}")
+    for fuse in (False, True):
+        results = [run(args.size, fuse) for _ in range(args.repeat)]
+        seconds = min(result[0] for result in results)
+        peak = max(result[1] for result in results)
+        name = "fused" if fuse else "unfused"
+        print(f"{name:>8} {seconds:>9.3f} {format_size(peak):>10}")
+
+
+if __name__ == "__main__":
+    main()
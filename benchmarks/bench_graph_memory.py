@@ -0,0 +1,92 @@
+"""Peak memory of a wide PointerGraph, with and without a memory budget.
+
+Usage:
+    python -m benchmarks.bench_graph_memory --width 32 --size 8M
+
+The graph has a root array of `--size` bytes, and `--width` branches
+computing a new array from it, then reducing that array to a scalar.
+Critical path ordering runs every expanding node before the reductions,
+so without a budget every intermediate array is stored at once. With a
+budget of `--budget` times the array size, reductions run as soon as the
+budget is reached and free their inputs.
+
+The peak is the largest memory traced by tracemalloc while the graph runs
+(numpy reports its buffers to it), the tracked peak the largest number of
+bytes the scheduler counted.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from spycular.pointer.callable_pointer import FunctionPointer
+from spycular.pointer.graph.async_graph import AsyncPointerGraph
+from spycular.pointer.graph.scheduler import GraphScheduler
+from spycular.pointer.object_pointer import ObjectPointer
+from spycular.reflection.reflected import ReflectedModule
+from spycular.store.virtual import VirtualStore
+
+from .utils import format_size, parse_size
+
+
+def expand_reduce_graph(width: int, size: int) -> AsyncPointerGraph:
+    root = FunctionPointer("ones", args=(size // 8,))
+    pointers = [root]
+    dependencies = {}
+    for _ in range(width):
+        branch = FunctionPointer(
+            "sin", args=(ObjectPointer(pointer_id=root.id),)
+        )
+        total = FunctionPointer(
+            "sum", args=(ObjectPointer(pointer_id=branch.id),)
+        )
+        dependencies[branch.id] = [root.id]
+        dependencies[total.id] = [branch.id]
+        pointers += [branch, total]
+    return AsyncPointerGraph(pointers, dependencies=dependencies)
+
+
+def run(scheduler: GraphScheduler, width: int, size: int):
+    graph = expand_reduce_graph(width, size)
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(
+        scheduler.run(graph, ReflectedModule(np), VirtualStore(), None),
+    )
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--size", default="8M")
+    parser.add_argument("--budget", type=float, default=4.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    scenarios = {
+        "unbounded": None,
+        f"budget {args.budget:g}x": int(args.budget * size),
+    }
+    print(f"{'scenario':>12} {'time (s)':>9} {'peak':>10} {'tracked':>10}")
+    for name, budget in scenarios.items():
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+        scheduler = GraphScheduler(executor, memory_budget=budget)
+        seconds, peak = run(scheduler, args.width, size)
+        tracked = format_size(scheduler.memory_peak) if budget else "-"
+        print(
+            f"{name:>12} {seconds:>9.3f} {format_size(peak):>10} "
+            f"{tracked:>10}",
+        )
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
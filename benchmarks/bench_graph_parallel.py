@@ -0,0 +1,85 @@
+"""Execution time of a wide PointerGraph, serial and on executor pools.
+
+Usage:
+    python -m benchmarks.bench_graph_parallel --width 64 --size 4M
+
+The graph has one root array of `--size` bytes and `--width` independent
+branches applying `--op` (a numpy ufunc, which releases the GIL) to it.
+AsyncPointerGraph runs the branches one after the other on the event loop;
+GraphScheduler runs them on thread pools of growing size, then on a process
+pool. Speedups are relative to the serial run and bounded by the number of
+cores. The best of `--repeat` runs is reported, the first one warms the
+pools up.
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from spycular.pointer.callable_pointer import FunctionPointer
+from spycular.pointer.graph.async_graph import AsyncPointerGraph
+from spycular.pointer.graph.scheduler import GraphScheduler
+from spycular.pointer.object_pointer import ObjectPointer
+from spycular.reflection.reflected import ReflectedModule
+from spycular.store.virtual import VirtualStore
+
+from .utils import doubling_sizes, parse_size
+
+
+def wide_graph(width: int, size: int, op: str) -> AsyncPointerGraph:
+    root = FunctionPointer("ones", args=(size // 8,))
+    branches = [
+        FunctionPointer(op, args=(ObjectPointer(pointer_id=root.id),))
+        for _ in range(width)
+    ]
+    dependencies = {ptr.id: [root.id] for ptr in branches}
+    return AsyncPointerGraph([root] + branches, dependencies=dependencies)
+
+
+def solve(graph: AsyncPointerGraph, scheduler) -> float:
+    module = ReflectedModule(np)
+    storage = VirtualStore()
+    start = time.perf_counter()
+    if scheduler is None:
+        coroutine = graph.async_solve(module, storage, None)
+    else:
+        coroutine = scheduler.run(graph, module, storage, None)
+    asyncio.run(coroutine)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--size", default="4M")
+    parser.add_argument("--op", default="sin")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    scenarios = {"serial": None}
+    for workers in doubling_sizes(1, args.max_workers):
+        executor = ThreadPoolExecutor(max_workers=workers)
+        scenarios[f"{workers} threads"] = GraphScheduler(executor)
+    executor = ProcessPoolExecutor(max_workers=args.max_workers)
+    scenarios[f"{args.max_workers} processes"] = GraphScheduler(executor)
+
+    print(f"{'executor':>14} {'time (s)':>9} {'speedup':>8}")
+    serial = None
+    for name, scheduler in scenarios.items():
+        seconds = min(
+            solve(wide_graph(args.width, size, args.op), scheduler)
+            for _ in range(args.repeat)
+        )
+        serial = serial or seconds
+        print(f"{name:>14} {seconds:>9.3f} {serial / seconds:>7.2f}x")
+        if scheduler is not None:
+            scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
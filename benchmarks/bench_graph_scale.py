@@ -0,0 +1,190 @@
+"""Scheduling overhead of PointerGraphs with up to 100k nodes.
+
+Usage:
+    python -m benchmarks.bench_graph_scale --nodes 100000 --fan-in 1000
+
+Nodes run on a stub module doing nothing but saving a result, so the times
+are the graph bookkeeping only: building the nodes, compiling the index
+based view, then running the graph synchronously and on the event loop.
+
+Four shapes are measured: a chain, a single root fanning out to every
+other node, reductions of `--fan-in` inputs each, and random layers of
+100 nodes with 3 parents each. `rescan` is the readiness check graphs used
+before, looking at the state of every parent of a successor once per
+finished parent, O(edges x in-degree); it's skipped when it would check
+more than `--rescan-limit` parents.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Tuple
+
+from spycular.pointer.callable_pointer import FunctionPointer
+from spycular.pointer.graph.async_graph import AsyncPointerGraph
+from spycular.pointer.graph.state_enum import PointerState
+from spycular.store.virtual import VirtualStore
+
+from .utils import best_of
+
+# (pointer IDs, dependencies by pointer ID)
+Shape = Tuple[List[FunctionPointer], Dict[str, List[str]]]
+
+
+class StubModule:
+    """Executes pointers by saving None as their result."""
+
+    def execute(self, pointer, storage=None, reply_callback=None):
+        storage.save(pointer.id, None)
+
+
+def chain(nodes: int) -> Shape:
+    pointers = [FunctionPointer("noop") for _ in range(nodes)]
+    dependencies = {
+        ptr.id: [parent.id] for parent, ptr in zip(pointers, pointers[1:])
+    }
+    return pointers, dependencies
+
+
+def fan_out(nodes: int) -> Shape:
+    pointers = [FunctionPointer("noop") for _ in range(nodes)]
+    root = pointers[0].id
+    return pointers, {ptr.id: [root] for ptr in pointers[1:]}
+
+
+def fan_in(nodes: int, degree: int) -> Shape:
+    pointers: List[FunctionPointer] = []
+    dependencies: Dict[str, List[str]] = {}
+    while len(pointers) + degree + 1 <= nodes:
+        inputs = [FunctionPointer("noop") for _ in range(degree)]
+        reduction = FunctionPointer("noop")
+        dependencies[reduction.id] = [ptr.id for ptr in inputs]
+        pointers += inputs + [reduction]
+    return pointers, dependencies
+
+
+def layered(nodes: int, width: int = 100, parents: int = 3) -> Shape:
+    rng = random.Random(0)
+    pointers = [FunctionPointer("noop") for _ in range(nodes)]
+    dependencies = {}
+    for idx in range(width, nodes):
+        begin = (idx // width - 1) * width
+        end = begin + width
+        previous = pointers[begin:end]
+        dependencies[pointers[idx].id] = [
+            ptr.id for ptr in rng.sample(previous, parents)
+        ]
+    return pointers, dependencies
+
+
+def shapes(nodes: int, degree: int) -> Iterator[Tuple[str, Shape]]:
+    yield "chain", chain(nodes)
+    yield "fan-out", fan_out(nodes)
+    yield f"fan-in {degree}", fan_in(nodes, degree)
+    yield "layered", layered(nodes)
+
+
+def rescan_solve(graph: AsyncPointerGraph, storage: VirtualStore) -> None:
+    """Readiness by rescanning the parents, as graphs used to do it."""
+    graph_map = graph.graph_map
+    ready = [key for key, node in graph_map.items() if not node.parents]
+    module = StubModule()
+    while ready:
+        key = ready.pop()
+        module.execute(graph_map[key].pointer, storage)
+        graph_map[key].state = PointerState.FINISHED
+        for sucessor in graph_map[key].sucessor:
+            to_be_executed = True
+            for parent in graph_map[sucessor].parents:
+                if graph_map[parent].state != PointerState.FINISHED:
+                    to_be_executed = False
+            if to_be_executed:
+                ready.append(sucessor)
+
+
+def rescan_checks(graph: AsyncPointerGraph) -> int:
+    graph_map = graph.graph_map
+    return sum(
+        len(graph_map[sucessor].parents)
+        for node in graph_map.values()
+        for sucessor in node.sucessor
+    )
+
+
+def measure(shape: Shape, repeat: int, rescan_limit: int) -> Dict[str, float]:
+    pointers, dependencies = shape
+
+    def build():
+        return AsyncPointerGraph(pointers, dependencies=dependencies)
+
+    def compiled():
+        graph = build()
+        start = time.perf_counter()
+        graph.compiled
+        return graph, time.perf_counter() - start
+
+    def timed(run) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            graph, _ = compiled()
+            start = time.perf_counter()
+            run(graph)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    tracemalloc.start()
+    graph = build()
+    node_bytes = tracemalloc.get_traced_memory()[0] / len(pointers)
+    tracemalloc.stop()
+    del graph
+
+    module = StubModule()
+    # The collector would walk every node of the graphs while timing.
+    gc.disable()
+    results = {
+        "build": best_of(build, repeat),
+        "compile": min(compiled()[1] for _ in range(repeat)),
+        "solve": timed(lambda graph: graph.solve(module, VirtualStore())),
+        "async": timed(
+            lambda graph: asyncio.run(
+                graph.async_solve(module, VirtualStore()),
+            ),
+        ),
+        "bytes/node": node_bytes,
+        "rescan": float("nan"),
+    }
+    if rescan_checks(build()) <= rescan_limit:
+        results["rescan"] = timed(
+            lambda graph: rescan_solve(graph, VirtualStore()),
+        )
+    gc.enable()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--fan-in", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rescan-limit", type=int, default=10**7)
+    args = parser.parse_args()
+
+    columns = ("build", "compile", "solve", "async", "rescan")
+    print(
+        f"{'shape':>12} {'nodes':>7} "
+        + " ".join(f"{name + ' (s)':>11}" for name in columns)
+        + f" {'bytes/node':>11}",
+    )
+    for name, shape in shapes(args.nodes, args.fan_in):
+        results = measure(shape, args.repeat, args.rescan_limit)
+        print(
+            f"{name:>12} {len(shape[0]):>7} "
+            + " ".join(f"{results[column]:>11.3f}" for column in columns)
+            + f" {results['bytes/node']:>11.0f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Wall time of `import spycular` in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5
+
+Scenarios:
+    lazy: numpy and torch installed, their serde registered on first use.
+    eager: same, then every serde loaded right away (the former behaviour).
+    first array: lazy import, then one numpy array round trip.
+    no extras: numpy, pyarrow and torch hidden, as if not installed.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+HIDE_EXTRAS = """
+import sys
+class HideExtras:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in ("numpy", "pyarrow", "torch"):
+            raise ImportError(name)
+sys.meta_path.insert(0, HideExtras())
+"""
+
+SCENARIOS = {
+    "lazy": "import spycular",
+    "eager": (
+        "import spycular\n"
+        "from spycular.serde.capnp.recursive import load_all_serde\n"
+        "load_all_serde()"
+    ),
+    "first array": (
+        "import spycular\n"
+        "import numpy as np\n"
+        "from spycular.serde.capnp.deserialize import _deserialize\n"
+        "from spycular.serde.capnp.serialize import _serialize\n"
+        "_deserialize(_serialize(np.ones(4), to_bytes=True), from_bytes=True)"
+    ),
+    "no extras": HIDE_EXTRAS + "import spycular",
+}
+
+
+def import_time(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = import_time("pass", args.repeat)
+    print(f"{'scenario':>12} {'time (s)':>9}")
+    print(f"{'interpreter':>12} {baseline:>9.3f}")
+    for name, code in SCENARIOS.items():
+        print(f"{name:>12} {import_time(code, args.repeat):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
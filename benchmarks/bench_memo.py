@@ -0,0 +1,61 @@
+"""Time of repeated pure numpy calls, with and without a Memoizer.
+
+Usage:
+    python -m benchmarks.bench_memo --size 10000000 --repeat 20
+
+A client calls `np.arange(size)` then `np.sqrt` on it `--repeat` times,
+in one lazy graph, then again in a second request. Without memoization
+every call runs. With `numpy.arange` and `numpy.sqrt` declared pure, the
+equal nodes of the graph run once and the second request is served from
+the cache, paying only for the copies.
+"""
+import argparse
+import time
+
+import numpy
+
+from spycular import reflect, strike
+from spycular.consumer.virtual import VirtualConsumer
+from spycular.producer.virtual import VirtualProducer
+from spycular.reflection.memo import Memoizer
+from spycular.store.virtual import VirtualStore
+
+
+def run(size: int, repeat: int, memo: Memoizer | None) -> float:
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(
+        VirtualStore(),
+        message_queue,
+        reply_queue,
+        memo=memo,
+    )
+    reflect(numpy, consumer)
+    np = strike(numpy, producer, lazy=True)
+
+    start = time.perf_counter()
+    for _ in range(2):
+        roots = [np.sqrt(np.arange(size)) for _ in range(repeat)]
+        producer.stop_recording()
+        consumer.listen()
+        for ptr in roots:
+            consumer.storage.delete(ptr.id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    memo = Memoizer(pure=["numpy.arange", "numpy.sqrt"])
+    plain = run(args.size, args.repeat, None)
+    cached = run(args.size, args.repeat, memo)
+    print(f"{'consumer':>10} {'time (s)':>9} {'hits':>5} {'misses':>7}")
+    print(f"{'plain':>10} {plain:>9.3f} {'-':>5} {'-':>7}")
+    print(f"{'memoized':>10} {cached:>9.3f} {memo.hits:>5} {memo.misses:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Serialization throughput of small pointer messages.
+
+Usage:
+    python -m benchmarks.bench_pointer_serde --count 5000
+
+Measures the ObjectActionPointer messages sent for every operation on an
+ObjectPointer, as `WebSocketsProducer.send` and
+`WebSocketConsumer.handle_input` would encode and decode them, and the
+typical primitive args/kwargs of a call.
+"""
+import argparse
+
+from spycular.pointer.object_pointer import ObjectActionPointer, ObjectPointer
+from spycular.serde.capnp.context import serde_context
+from spycular.serde.capnp.deserialize import _deserialize
+from spycular.serde.capnp.serialize import _serialize
+
+from .utils import best_of
+
+
+def action_pointers(count: int):
+    target = ObjectPointer(path="array")
+    return [
+        ObjectActionPointer(
+            target_id=target.id,
+            path="__add__",
+            args=(idx,),
+            parents=(target,),
+        )
+        for idx in range(count)
+    ]
+
+
+def call_arguments(count: int):
+    return [
+        ((idx, 2.5, "mean", True), {"axis": 0, "dtype": "float32"})
+        for idx in range(count)
+    ]
+
+
+def bench(name: str, objs: list, repeat: int) -> None:
+    blobs = [_serialize(obj, to_bytes=True) for obj in objs]
+
+    encode = best_of(
+        lambda: [_serialize(obj, to_bytes=True) for obj in objs],
+        repeat,
+    )
+    decode = best_of(
+        lambda: [_deserialize(blob, from_bytes=True) for blob in blobs],
+        repeat,
+    )
+    with serde_context(type_ids=frozenset()):
+        named = _serialize(objs[0], to_bytes=True)
+    print(f"{name}:")
+    print(f"  message size: {len(blobs[0])} bytes ({len(named)} with names)")
+    print(f"  encode: {len(objs) / encode:>10.0f} messages/s")
+    print(f"  decode: {len(objs) / decode:>10.0f} messages/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    bench("pointers", action_pointers(args.count), args.repeat)
+    bench("call arguments", call_arguments(args.count), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Cost of sending the same array repeatedly, with and without a serde
+cache.
+
+Usage:
+    python -m benchmarks.bench_serde_cache --size 64M --calls 10
+
+The array is sent `--calls` times through the frame protocol. The content
+cache hashes the array on every call, the identity cache only looks it up.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from spycular.serde.capnp.cache import CacheMirror, SerdeCache
+from spycular.serde.capnp.frames import FrameReader, iter_frames
+
+from .utils import format_size, parse_size
+
+
+def transfer(array: np.ndarray, calls: int, cache, readonly: bool):
+    reader = FrameReader(readonly=readonly, cache_mirror=CacheMirror())
+    sent = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        for frame in iter_frames(array, cache=cache):
+            sent += memoryview(frame).nbytes
+            reader.feed(frame)
+        reader.result()
+    return time.perf_counter() - start, sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="64M")
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    array = np.random.default_rng(0).random(size // 8)
+    identity = SerdeCache(max_bytes=2 * size, by_content=False)
+    identity.mark_immutable(array)
+    caches = {
+        "none": None,
+        "content": SerdeCache(max_bytes=2 * size),
+        "identity": identity,
+    }
+
+    print(f"{'cache':>10} {'readonly':>9} {'time (s)':>9} {'sent':>10}")
+    for readonly in (False, True):
+        for name, cache in caches.items():
+            if cache is not None:
+                cache.clear()
+            seconds, sent = transfer(array, args.calls, cache, readonly)
+            print(
+                f"{name:>10} {str(readonly):>9} {seconds:>9.3f} "
+                f"{format_size(sent):>10}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Peak memory of sending an array through the frame protocol.
+
+Usage:
+    python -m benchmarks.bench_streaming --min-size 16M --max-size 256M
+
+Every frame is copied once as bytes, as a websocket client does when it
+masks the frame, and fed to a FrameReader, as the consumer does. The peak
+traced memory (excluding the array being sent) is reported for single-frame
+parts and for frames bounded by `--chunk-size`.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from spycular.serde.capnp.frames import FrameReader, iter_frames
+
+from .utils import doubling_sizes, format_size, parse_size
+
+
+def transfer(array: np.ndarray, chunk_size):
+    reader = FrameReader()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for frame in iter_frames(array, chunk_size=chunk_size):
+        if reader.feed(bytes(frame)):
+            result = reader.result()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result.nbytes == array.nbytes
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-size", default="16M")
+    parser.add_argument("--max-size", default="256M")
+    parser.add_argument("--chunk-size", default="1M")
+    args = parser.parse_args()
+
+    chunk_size = parse_size(args.chunk_size)
+    print(
+        f"{'payload':>10} {'single (s)':>11} {'peak':>10} "
+        f"{'chunked (s)':>12} {'peak':>10}",
+    )
+    for size in doubling_sizes(
+        parse_size(args.min_size),
+        parse_size(args.max_size),
+    ):
+        array = np.ones(size // 8)
+        single, single_peak = transfer(array, None)
+        chunked, chunked_peak = transfer(array, chunk_size)
+        print(
+            f"{format_size(size):>10} {single:>11.3f} "
+            f"{format_size(single_peak):>10} {chunked:>12.3f} "
+            f"{format_size(chunked_peak):>10}",
+        )
+
+
+if __name__ == "__main__":
+    main()
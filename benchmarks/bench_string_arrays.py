@@ -0,0 +1,71 @@
+"""Size and speed of the string-array serde against the legacy uint64
+encoding.
+
+Usage:
+    python -m benchmarks.bench_string_arrays --count 100000
+
+Measures categorical labels and longer non-ASCII text, in `U` and object
+dtypes.
+"""
+import argparse
+
+import numpy as np
+
+from spycular.serde.capnp.deserialize import _deserialize
+from spycular.serde.capnp.numpy.serde import (
+    arraytonumpyutf8,
+    numpy_deserialize,
+)
+from spycular.serde.capnp.serialize import _serialize
+
+from .utils import best_of, format_size
+
+
+def make_arrays(count: int):
+    labels = np.array([f"category_{idx % 100}" for idx in range(count)])
+    text = np.array([f"texto número {idx} " * 4 for idx in range(count)])
+    return {
+        "labels U": labels,
+        "labels object": labels.astype(object),
+        "text U": text,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'array':>14} {'codec':>7} {'size':>10} "
+        f"{'encode (s)':>11} {'decode (s)':>11}",
+    )
+    for name, array in make_arrays(args.count).items():
+        codecs = {
+            "utf8": lambda: _serialize(array, to_bytes=True),
+        }
+        if array.dtype.kind == "U":
+            codecs["legacy"] = lambda: arraytonumpyutf8(array)
+
+        for codec, encode in codecs.items():
+            blob = encode()
+            encode_time = best_of(encode, args.repeat)
+            if codec == "legacy":
+                decode_time = best_of(
+                    lambda: numpy_deserialize(blob),
+                    args.repeat,
+                )
+            else:
+                decode_time = best_of(
+                    lambda: _deserialize(blob, from_bytes=True),
+                    args.repeat,
+                )
+            print(
+                f"{name:>14} {codec:>7} {format_size(len(blob)):>10} "
+                f"{encode_time:>11.3f} {decode_time:>11.3f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Nested (v1) vs flat (v2) wire format on deep ObjectPointer chains.
+
+Usage:
+    python -m benchmarks.bench_wire_format --max-depth 512
+
+Every pointer of the chain references the previous one through `parents`,
+like the pointers created by chained operations on an ObjectPointer.
+"""
+import argparse
+import sys
+
+from spycular.pointer.object_pointer import ObjectPointer
+from spycular.serde.capnp.deserialize import _deserialize
+from spycular.serde.capnp.flat import FLAT_WIRE_VERSION, NESTED_WIRE_VERSION
+from spycular.serde.capnp.serialize import _serialize
+
+from .utils import best_of, doubling_sizes, format_size
+
+
+def pointer_chain(depth: int) -> ObjectPointer:
+    ptr = ObjectPointer(path="array")
+    for _ in range(depth):
+        ptr = ObjectPointer(path="T", parents=(ptr,), target_id=ptr.id)
+    return ptr
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-depth", type=int, default=8)
+    parser.add_argument("--max-depth", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # The nested format recurses once per level for encoding and decoding.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * args.max_depth))
+
+    print(
+        f"{'depth':>6} {'format':>7} {'size':>10} "
+        f"{'encode (ms)':>12} {'decode (ms)':>12}",
+    )
+    for depth in doubling_sizes(args.min_depth, args.max_depth):
+        ptr = pointer_chain(depth)
+        for name, version in (
+            ("nested", NESTED_WIRE_VERSION),
+            ("flat", FLAT_WIRE_VERSION),
+        ):
+            blob = _serialize(ptr, to_bytes=True, version=version)
+            encode = best_of(
+                lambda: _serialize(ptr, to_bytes=True, version=version),
+                args.repeat,
+            )
+            decode = best_of(
+                lambda: _deserialize(blob, from_bytes=True),
+                args.repeat,
+            )
+            print(
+                f"{depth:>6} {name:>7} {format_size(len(blob)):>10} "
+                f"{encode * 1e3:>12.2f} {decode * 1e3:>12.2f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Serde micro-benchmark suite with regression tracking.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --max-size 1G --filter ndarray
+
+Every case is encoded and decoded through `_serialize` / `_deserialize`.
+For each one the suite records the message size, the best time per encode
+and decode, and the peak memory traced by tracemalloc while encoding and
+decoding (torch tensor storage is not traced).
+
+With `--baseline` the results are compared against a previous `--output`
+file, and the script exits with status 1 when a time grows by more than
+`--threshold`, or a size or allocation by more than `--alloc-threshold`.
+Timings are only comparable on the same machine: regenerate the baseline
+with `--update-baseline` before tracking a new one. On shared machines,
+`--threshold inf` only checks the sizes and allocations, which don't
+depend on the machine load.
+"""
+import argparse
+import gc
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from spycular.pointer.callable_pointer import (
+    BuiltinPointer,
+    FunctionPointer,
+    MethodPointer,
+)
+from spycular.pointer.graph.async_graph import AsyncPointerGraph
+from spycular.pointer.object_pointer import (
+    GetPointer,
+    ObjectActionPointer,
+    ObjectPointer,
+)
+from spycular.pointer.registry_pointer import TypeRegistryPointer
+from spycular.serde.capnp.deserialize import _deserialize
+from spycular.serde.capnp.serialize import _serialize
+
+from .utils import best_of, doubling_sizes, format_size, parse_size
+
+FORMAT_VERSION = 1
+
+# Metrics compared against the baseline, by kind.
+METRICS = {
+    "encode_s": "time",
+    "decode_s": "time",
+    "size": "size",
+    "encode_alloc": "alloc",
+    "decode_alloc": "alloc",
+}
+
+# Allocation changes below this many bytes are noise, not regressions.
+# Sizes are deterministic, any growth past the threshold counts.
+MIN_ALLOC_DELTA = 4096
+
+# (name, group, object, array bytes or 0)
+Case = Tuple[str, str, Any, int]
+
+
+def primitive_cases() -> Iterator[Case]:
+    yield "int", "primitives", 2**40, 0
+    yield "float", "primitives", 3.14159, 0
+    yield "bool", "primitives", True, 0
+    yield "none", "primitives", None, 0
+    yield "str 1KB", "primitives", "spycular" * 128, 0
+    yield "bytes 1KB", "primitives", bytes(range(256)) * 4, 0
+
+
+def container_cases() -> Iterator[Case]:
+    ints = list(range(1000))
+    floats = {str(idx): float(idx) for idx in ints}
+    yield "list[int] x1000", "containers", ints, 0
+    yield "tuple[str] x1000", "containers", tuple(map(str, ints)), 0
+    yield "set[int] x1000", "containers", set(ints), 0
+    yield "dict[str, float] x1000", "containers", floats, 0
+    nested: Any = [1, 2.0, "leaf"]
+    for depth in range(16):
+        nested = {"depth": depth, "items": [nested, (depth, str(depth))]}
+    yield "nested depth 16", "containers", nested, 0
+
+
+def pointer_cases() -> Iterator[Case]:
+    target = ObjectPointer(path="numpy.ones")
+    action = ObjectActionPointer(
+        target_id=target.id,
+        path="__add__",
+        args=(1,),
+        parents=(target,),
+    )
+    call: Dict[str, Any] = {"args": [target], "kwargs": {"axis": 0}}
+    yield "ObjectPointer", "pointers", target, 0
+    yield "ObjectActionPointer", "pointers", action, 0
+    yield "GetPointer", "pointers", GetPointer(target_id=target.id), 0
+    function = FunctionPointer("numpy.sum", **call)
+    builtin = BuiltinPointer("len", args=[target])
+    yield "FunctionPointer", "pointers", function, 0
+    yield "BuiltinPointer", "pointers", builtin, 0
+    yield (
+        "MethodPointer",
+        "pointers",
+        MethodPointer("numpy.ndarray.sum", **call),
+        0,
+    )
+    yield "TypeRegistryPointer", "pointers", TypeRegistryPointer(), 0
+
+
+def graph_cases() -> Iterator[Case]:
+    for nodes in (10, 100):
+        pointers = [ObjectPointer(path="numpy.zeros")]
+        for idx in range(nodes - 1):
+            parent = pointers[idx // 2]
+            pointers.append(
+                ObjectActionPointer(
+                    target_id=parent.id,
+                    path="__add__",
+                    args=(idx,),
+                    parents=(parent,),
+                ),
+            )
+        graph = AsyncPointerGraph(set(pointers))
+        yield f"PointerGraph {nodes} nodes", "graphs", graph, 0
+
+
+def array_cases(max_size: int) -> Iterator[Case]:
+    # Every other doubling, from 1KB to `max_size`.
+    sizes = doubling_sizes(2**10, max_size)[::2]
+    for size in sizes:
+        array = np.random.default_rng(0).random(size // 8)
+        yield f"ndarray float64 {format_size(size)}", "ndarray", array, size
+    try:
+        import torch as th
+    except ImportError:
+        return
+    for size in sizes:
+        generator = th.Generator().manual_seed(0)
+        tensor = th.rand(size // 4, generator=generator)
+        yield f"tensor float32 {format_size(size)}", "tensor", tensor, size
+
+
+def all_cases(max_size: int) -> Iterator[Case]:
+    yield from primitive_cases()
+    yield from container_cases()
+    yield from pointer_cases()
+    yield from graph_cases()
+    yield from array_cases(max_size)
+
+
+def time_per_call(fn: Callable[[], Any], repeat: int, min_time: float):
+    """Best time per call, looping fast calls for at least `min_time`.
+
+    The garbage collector is paused while timing, as timeit does.
+    """
+    loops = 1
+    gc.collect()
+    gc.disable()
+    try:
+        while True:
+            elapsed = best_of(lambda: [fn() for _ in range(loops)], 1)
+            if elapsed >= min_time or loops >= 2**20:
+                break
+            loops *= max(2, int(min_time / max(elapsed, 1e-9)) + 1)
+        return best_of(lambda: [fn() for _ in range(loops)], repeat) / loops
+    finally:
+        gc.enable()
+
+
+def peak_alloc(fn: Callable[[], Any]) -> int:
+    """Peak traced memory allocated by one call, in bytes."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(obj: Any, repeat: int, min_time: float) -> Dict[str, float]:
+    blob = _serialize(obj, to_bytes=True)
+
+    def encode():
+        return _serialize(obj, to_bytes=True)
+
+    def decode():
+        return _deserialize(blob, from_bytes=True)
+
+    return {
+        "size": len(blob),
+        "encode_s": time_per_call(encode, repeat, min_time),
+        "decode_s": time_per_call(decode, repeat, min_time),
+        "encode_alloc": peak_alloc(encode),
+        "decode_alloc": peak_alloc(decode),
+    }
+
+
+def environment() -> Dict[str, str]:
+    import capnp
+
+    versions = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pycapnp": getattr(capnp, "__version__", "unknown"),
+    }
+    try:
+        import torch as th
+
+        versions["torch"] = th.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    alloc_threshold: float,
+) -> List[str]:
+    """Return a line for every metric of a case that regressed."""
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, kind in METRICS.items():
+            old, new = previous.get(metric), metrics[metric]
+            if old is None:
+                continue
+            limit = threshold if kind == "time" else alloc_threshold
+            if kind == "alloc" and new - old < MIN_ALLOC_DELTA:
+                continue
+            if new > old * (1 + limit):
+                change = (new / old - 1) * 100 if old else float("inf")
+                regressions.append(
+                    f"{name}: {metric} {old:.6g} -> {new:.6g} "
+                    f"(+{change:.0f}%)",
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", default="16M")
+    parser.add_argument("--filter", default="", help="regex on case names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--alloc-threshold", type=float, default=0.1)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="overwrite --baseline with these results instead of comparing",
+    )
+    args = parser.parse_args()
+
+    pattern = re.compile(args.filter)
+    results: Dict[str, Dict[str, Any]] = {}
+    print(
+        f"{'case':>28} {'size':>10} {'encode':>10} {'decode':>10} "
+        f"{'enc alloc':>10} {'dec alloc':>10}",
+    )
+    for name, group, obj, nbytes in all_cases(parse_size(args.max_size)):
+        if not pattern.search(name):
+            continue
+        metrics = run_case(obj, args.repeat, args.min_time)
+        results[name] = {"group": group, "nbytes": nbytes, **metrics}
+        if nbytes >= 2**20:
+            encode = f"{format_size(nbytes / metrics['encode_s'])}/s"
+            decode = f"{format_size(nbytes / metrics['decode_s'])}/s"
+        else:
+            encode = f"{metrics['encode_s'] * 1e6:.1f}us"
+            decode = f"{metrics['decode_s'] * 1e6:.1f}us"
+        print(
+            f"{name:>28} {format_size(metrics['size']):>10} {encode:>10} "
+            f"{decode:>10} {format_size(metrics['encode_alloc']):>10} "
+            f"{format_size(metrics['decode_alloc']):>10}",
+        )
+
+    report = {
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        return
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(
+        results,
+        baseline["cases"],
+        args.threshold,
+        args.alloc_threshold,
+    )
+    missing = sorted(set(results) - set(baseline["cases"]))
+    if missing:
+        print(f"\nnot in baseline: {', '.join(missing)}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        print("\n".join(f"  {line}" for line in regressions))
+        sys.exit(1)
+    print(f"\nno regression against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
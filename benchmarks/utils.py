@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark scripts."""
+import time
+from typing import Callable, List
+
+_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30}
+
+
+def parse_size(size: str) -> int:
+    """Parse human readable sizes such as `512K`, `1M` or `2G`."""
+    size = size.strip().upper().rstrip("B")
+    unit = size[-1] if size and size[-1] in _UNITS else ""
+    number = size[: len(size) - len(unit)]
+    return int(float(number) * _UNITS[unit])
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def doubling_sizes(min_size: int, max_size: int) -> List[int]:
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= 2
+    return sizes
+
+
+def best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Run `fn` `repeat` times and return the fastest wall time in
+    seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -5,7 +5,13 @@ from .producer.abstract import AbstractProducer
 from .reflection.incident import IncidentModule
 
 
-def strike(module: ModuleType, producer: AbstractProducer):
+def strike(
+    module: ModuleType,
+    producer: AbstractProducer,
+    lazy: bool = False,
+):
+    if lazy:
+        producer.start_recording()
     return IncidentModule(lib=module, broker=producer)
 
 
@@ -1,9 +1,13 @@
 from abc import ABCMeta, abstractmethod
 from types import ModuleType
-from typing import Any
+from typing import Any, Callable
 
 from ..pointer.abstract import Pointer
 from ..pointer.graph.abstract import PointerGraph
+from ..pointer.graph.cost import CostModel
+from ..pointer.graph.fusion import fuse_elementwise
+from ..pointer.graph.scheduler import GraphScheduler
+from ..reflection.memo import MemoizedModule, Memoizer
 from ..reflection.reflected import ReflectedModule
 
 
@@ -14,13 +18,33 @@ class AbstractConsumer(metaclass=ABCMeta):
     and modules using reflected module and pointers.
     """
 
-    def __init__(self, storage):
+    def __init__(
+        self,
+        storage,
+        scheduler: GraphScheduler | None = None,
+        memo: Memoizer | None = None,
+        fuse: bool = False,
+    ):
         """Initialize the consumer with given storage.
 
         Args:
             storage: Storage instance to be used by the consumer.
+            scheduler (GraphScheduler, optional): Executes graphs in a
+            thread or process pool. Graphs run on the event loop otherwise.
+            memo (Memoizer, optional): Serves repeated pure calls from a
+            cache, and executes equal pure nodes of a graph once.
+            fuse (bool): Whether chains of elementwise operations of a
+            graph are evaluated at once, without storing intermediate
+            results.
         """
         self.storage = storage
+        self.scheduler = scheduler
+        self.memo = memo
+        self.fuse = fuse
+        # Set by set_module, memoized or not.
+        self.reflected_module: ReflectedModule
+        # Execution times of the graph nodes, to run critical paths first.
+        self.costs = scheduler.costs if scheduler else CostModel()
         super().__init__()
 
     def set_module(self, module: ModuleType) -> None:
@@ -30,7 +54,10 @@ class AbstractConsumer(metaclass=ABCMeta):
         Args:
             module (ModuleType): The python module to be used by the consumer.
         """
-        self.reflected_module = ReflectedModule(module)
+        if self.memo is not None:
+            self.reflected_module = MemoizedModule(module, self.memo)
+        else:
+            self.reflected_module = ReflectedModule(module)
 
     def execute(self, ptr: Pointer):
         """Execute operations on the given pointer using the reflected
@@ -38,13 +65,58 @@ class AbstractConsumer(metaclass=ABCMeta):
 
         Args:
             ptr (Pointer): Pointer instance pointing to a specific resource.
+            PointerGraphs are executed synchronously.
         """
+        if isinstance(ptr, PointerGraph):
+            self.optimize(ptr)
+            ptr.solve(
+                reflected_module=self.reflected_module,
+                storage=self.storage,
+                reply_callback=self.reply,
+            )
+            return
         self.reflected_module.execute(
             pointer=ptr,
             storage=self.storage,
             reply_callback=self.reply,
         )
 
+    async def solve_graph(
+        self,
+        graph: PointerGraph,
+        reply_callback: Callable,
+    ) -> None:
+        """Execute a graph with the scheduler of the consumer, if any.
+
+        Args:
+            graph (PointerGraph): The graph.
+            reply_callback (Callable): Callback for replies.
+        """
+        self.optimize(graph)
+        if self.scheduler is not None:
+            await self.scheduler.run(
+                graph,
+                self.reflected_module,
+                self.storage,
+                reply_callback,
+            )
+        else:
+            await graph.async_solve(
+                reflected_module=self.reflected_module,
+                storage=self.storage,
+                reply_callback=reply_callback,
+                costs=self.costs,
+            )
+
+    def optimize(self, graph: PointerGraph) -> None:
+        """Rewrite a graph before it runs: order its equal pure nodes after
+        the first one, which the others are served from, and fuse its
+        elementwise chains."""
+        if self.memo is not None:
+            self.memo.dedupe(graph, self.reflected_module.module_name)
+        if self.fuse:
+            fuse_elementwise(graph)
+
     @abstractmethod
     async def execute_graph(self, ptr: PointerGraph) -> None:
         """Abstract method to execute operations on a given pointer
@@ -1,6 +1,8 @@
 from typing import Any
 
 from ..pointer.graph.abstract import PointerGraph
+from ..pointer.graph.scheduler import GraphScheduler
+from ..reflection.memo import Memoizer
 from .abstract import AbstractConsumer
 
 
@@ -12,7 +14,15 @@ class VirtualConsumer(AbstractConsumer):
     the underlying reflected module and storage system.
     """
 
-    def __init__(self, storage, message_queue, reply_queue):
+    def __init__(
+        self,
+        storage,
+        message_queue,
+        reply_queue,
+        scheduler: GraphScheduler | None = None,
+        memo: Memoizer | None = None,
+        fuse: bool = False,
+    ):
         """Initialize the virtual consumer with given storage, message
         queue, and reply queue.
 
@@ -20,8 +30,12 @@ class VirtualConsumer(AbstractConsumer):
             storage: Storage instance to be used by the consumer.
             message_queue (list): List-based queue for incoming messages.
             reply_queue (dict): Dictionary-based queue for outgoing replies.
+            scheduler (GraphScheduler, optional): Executes graphs in a
+            thread or process pool.
+            memo (Memoizer, optional): Cache of the pure calls.
+            fuse (bool): Whether elementwise chains of graphs are fused.
         """
-        super().__init__(storage)
+        super().__init__(storage, scheduler, memo, fuse)
         self.message_queue = message_queue
         self.reply_queue = reply_queue
 
@@ -53,11 +67,7 @@ class VirtualConsumer(AbstractConsumer):
             graph (PointerGraph): PointerGraph instance representing a set
             of resources.
         """
-        await graph.async_solve(
-            reflected_module=self.reflected_module,
-            storage=self.storage,
-            reply_callback=self.reply,
-        )
+        await self.solve_graph(graph, self.reply)
 
     def reply(self, obj_id: str, obj: Any):
         """Handle replies by storing them in the reply queue with the
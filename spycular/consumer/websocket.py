@@ -1,11 +1,15 @@
 import asyncio
-from typing import Any, Dict
+from typing import Any, Callable, Dict, FrozenSet
 
 import websockets
 
+from ..pointer.batch_pointer import PointerBatch
 from ..pointer.graph.abstract import PointerGraph
-from ..serde.capnp.deserialize import _deserialize
-from ..serde.capnp.serialize import _serialize
+from ..pointer.graph.scheduler import GraphScheduler
+from ..pointer.registry_pointer import TypeRegistryPointer
+from ..reflection.memo import Memoizer
+from ..serde.capnp.cache import CacheMirror
+from ..serde.capnp.frames import DEFAULT_CHUNK_SIZE, FrameReader, iter_frames
 from ..store.abstract import AbstractStore
 from .abstract import AbstractConsumer
 
@@ -14,10 +18,32 @@ class WebSocketConsumer(AbstractConsumer):
     reply_queue: Dict[Any, Any] = {}
     count = 0
 
-    def __init__(self, storage: AbstractStore, url: str, port: int) -> None:
-        super().__init__(storage=storage)
+    def __init__(
+        self,
+        storage: AbstractStore,
+        url: str,
+        port: int,
+        readonly_arrays: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        scheduler: GraphScheduler | None = None,
+        memo: Memoizer | None = None,
+        fuse: bool = False,
+    ) -> None:
+        super().__init__(
+            storage=storage,
+            scheduler=scheduler,
+            memo=memo,
+            fuse=fuse,
+        )
         self.url = url
         self.port = port
+        # Zero-copy read-only arrays, for modules that never write their
+        # arguments in place.
+        self.readonly_arrays = readonly_arrays
+        # Replies are streamed in frames of at most chunk_size bytes.
+        self.chunk_size = chunk_size
+        # Registry IDs shared with each connected producer.
+        self.type_ids: Dict[Any, FrozenSet[int]] = {}
 
     # This coroutine handles the incoming messages
     async def handle_input(self, websocket):
@@ -26,16 +52,34 @@ class WebSocketConsumer(AbstractConsumer):
             reply_callback = WebSocketConsumer.create_user_reply_callback(
                 websocket,
             )
+            # Arrays cached by the producer live as long as the connection.
+            reader = FrameReader(
+                readonly=self.readonly_arrays,
+                cache_mirror=CacheMirror(),
+            )
             async for message in websocket:
-                ptr = _deserialize(message, from_bytes=True)
-                self.reflected_module.execute(
-                    ptr,
-                    self.storage,
-                    reply_callback,
+                if not reader.feed(message):
+                    continue
+                ptr = reader.result()
+                if isinstance(ptr, PointerGraph):
+                    await self.execute_graph(ptr, reply_callback)
+                    continue
+                # Batched pointers are executed in the order they were sent.
+                batch = (
+                    ptr.pointers if isinstance(ptr, PointerBatch) else [ptr]
                 )
+                for ptr in batch:
+                    if isinstance(ptr, TypeRegistryPointer):
+                        self.type_ids[websocket] = ptr.shared_type_ids()
+                    self.reflected_module.execute(
+                        ptr,
+                        self.storage,
+                        reply_callback,
+                    )
         finally:
             # Remove client from dictionary upon disconnection
             WebSocketConsumer.reply_queue.pop(websocket, None)
+            self.type_ids.pop(websocket, None)
 
     # This coroutine sends messages asynchronously
     async def handle_output(self, websocket):
@@ -46,15 +90,18 @@ class WebSocketConsumer(AbstractConsumer):
                     WebSocketConsumer.reply_queue.get(websocket, False)
                     and WebSocketConsumer.reply_queue[websocket]
                 ):
-                    await websocket.send(
-                        _serialize(
-                            WebSocketConsumer.reply_queue[websocket].pop(0),
-                            to_bytes=True,
-                        ),
-                    )
+                    reply = WebSocketConsumer.reply_queue[websocket].pop(0)
+                    type_ids = self.type_ids.get(websocket, frozenset())
+                    for frame in iter_frames(
+                        reply,
+                        chunk_size=self.chunk_size,
+                        type_ids=type_ids,
+                    ):
+                        await websocket.send(frame)
         finally:
             # Remove client from dictionary upon disconnection
             WebSocketConsumer.reply_queue.pop(websocket, None)
+            self.type_ids.pop(websocket, None)
 
     @staticmethod
     def create_user_reply_callback(websocket):
@@ -86,9 +133,19 @@ class WebSocketConsumer(AbstractConsumer):
     def close(self):
         self.stop_event.set()
 
-    async def execute_graph(self, ptr: PointerGraph) -> None:
-        # return await super().execute_graph(ptr)
-        pass
+    async def execute_graph(
+        self,
+        ptr: PointerGraph,
+        reply_callback: Callable | None = None,
+    ) -> None:
+        """Execute a graph sent by a lazy producer.
+
+        Args:
+            ptr (PointerGraph): The graph.
+            reply_callback (Callable, optional): Callback replying to the
+            producer that sent it.
+        """
+        await self.solve_graph(ptr, reply_callback or self.reply)
 
     def reply(self, obj_id: str, obj: object) -> Any:
         # return super().reply(obj_id, obj)
@@ -6,6 +6,10 @@ from ..store.abstract import AbstractStore
 from ..utils.uuid_gen import generate_uuid
 
 
+def ignore_reply(obj_id: str, obj: Any) -> None:
+    """Reply callback of pointers executed without a requester."""
+
+
 class Pointer(metaclass=ABCMeta):
     """Abstract class representing a Pointer.
 
@@ -0,0 +1,61 @@
+from types import ModuleType
+from typing import Any, Callable, List
+
+from ..serde.capnp.recursive import serializable
+from ..store.abstract import AbstractStore
+from .abstract import Pointer, ignore_reply
+
+
+@serializable
+class PointerBatch(Pointer):
+    """A pointer carrying several pointers queued by a batching producer.
+
+    The whole batch is serialized and sent as a single message, and the
+    consumer executes its pointers in the order they were queued.
+    """
+
+    def __init__(
+        self,
+        pointers: List[Pointer] | None = None,
+        path: str = "",
+        pointer_id: str = "",
+    ):
+        """Initialize a PointerBatch.
+
+        Args:
+            pointers (List[Pointer], optional): Pointers to execute, in
+            order.
+            path (str): Path to the object. Optional.
+            pointer_id (str): ID for the pointer. Optional.
+        """
+        super().__init__(path, pointer_id)
+        self.pointers = pointers if pointers is not None else []
+
+    def __len__(self) -> int:
+        return len(self.pointers)
+
+    def __repr__(self) -> str:
+        return f"<PointerBatch {self.id} pointers={len(self.pointers)}>"
+
+    def solve(
+        self,
+        lib: ModuleType,
+        storage: AbstractStore,
+        reply_callback: Callable = ignore_reply,
+    ) -> None | Any:
+        """Execute every pointer of the batch, in order.
+
+        Args:
+            lib (ModuleType): The module the consumer is reflecting.
+            storage (AbstractStore): The storage where we'll get or save
+            data.
+            reply_callback (Callable, optional): The callback to reply to
+            the broker. Replies are ignored by default.
+        """
+        # relative
+        from ..reflection.reflected import ReflectedModule
+
+        reflected_module = ReflectedModule(lib)
+        for ptr in self.pointers:
+            reflected_module.execute(ptr, storage, reply_callback)
+        return None
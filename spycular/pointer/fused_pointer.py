@@ -0,0 +1,149 @@
+from types import ModuleType
+from typing import Any, Callable, List, Tuple
+
+from ..serde.capnp.recursive import serializable
+from ..store.abstract import AbstractStore
+from .abstract import Pointer, ignore_reply
+
+# Elementwise operator actions, and the numpy ufunc each one calls.
+ELEMENTWISE_UFUNCS = {
+    "__add__": "add",
+    "__sub__": "subtract",
+    "__mul__": "multiply",
+    "__truediv__": "true_divide",
+    "__floordiv__": "floor_divide",
+    "__mod__": "remainder",
+    "__pow__": "power",
+}
+
+# (operator action, left operand, right operand, ID to save the result
+# under or ""). Operands are indices in the pointer args if positive, or
+# `-1 - k` for the result of step `k`.
+FusedStep = Tuple[str, int, int, str]
+
+
+@serializable
+class FusedPointer(Pointer):
+    """A pointer evaluating a chain of elementwise operator actions at
+    once, in place of the ObjectActionPointers it replaces.
+
+    Results of intermediate steps aren't stored, unless a step has an ID
+    to save its result under. When an unsaved step result is a numpy array
+    of the shape and dtype of the next step result, the next step writes
+    into it through the `out=` argument of the ufunc, so a chain like
+    `(a + b) * c - d` allocates a single array instead of one per
+    operation. Other steps call the operator action, exactly like the
+    pointer they replace.
+    """
+
+    def __init__(
+        self,
+        steps: List[FusedStep] | None = None,
+        args: List[Any] | None = None,
+        path: str = "",
+        pointer_id: str = "",
+    ):
+        """Initialize a FusedPointer.
+
+        Args:
+            steps (List[FusedStep], optional): Operations, in order. The
+            result of the last one is the result of the pointer.
+            args (List[Any], optional): Operands read by the steps,
+            pointers or values.
+            path (str): Path to the object. Optional.
+            pointer_id (str): ID for the pointer, the one of the last
+            action it replaces.
+        """
+        super().__init__(path, pointer_id)
+        self.steps = steps if steps is not None else []
+        self.args = args if args is not None else []
+
+    def __repr__(self) -> str:
+        return f"<FusedPointer {self.id} path={self.path}>"
+
+    def solve(
+        self,
+        lib: ModuleType,
+        storage: AbstractStore,
+        reply_callback: Callable = ignore_reply,
+    ) -> None | Any:
+        """Evaluate every step and save the last result.
+
+        Args:
+            lib (ModuleType): The module the consumer is reflecting.
+            storage (AbstractStore): The storage where we'll get or save
+            data.
+            reply_callback (Callable, optional): The callback to reply to
+            the broker. Replies are ignored by default.
+        Returns:
+            None | Any: The result of the last step.
+        """
+        values = [
+            (
+                arg.solve(lib, storage=storage, reply_callback=reply_callback)
+                if isinstance(arg, Pointer)
+                else arg
+            )
+            for arg in self.args
+        ]
+        results: List[Any] = []
+        saved = set()
+        for name, left, right, save_id in self.steps:
+            operands = [
+                values[ref] if ref >= 0 else results[-1 - ref]
+                for ref in (left, right)
+            ]
+            out = None
+            for ref, operand in zip((left, right), operands):
+                # Only unsaved step results are ours to overwrite, unless an
+                # operator returned one of the operands.
+                if (
+                    ref < 0
+                    and ref not in saved
+                    and not any(operand is value for value in values)
+                    and self._fits(lib, name, operand, *operands)
+                ):
+                    out = operand
+                    break
+            if out is not None:
+                ufunc = getattr(lib, ELEMENTWISE_UFUNCS[name])
+                results.append(ufunc(*operands, out=out))
+            else:
+                results.append(getattr(operands[0], name)(operands[1]))
+            # Every step result is read by a single step.
+            for ref in (left, right):
+                if ref < 0:
+                    results[-1 - ref] = None
+            if save_id:
+                storage.save(save_id, results[-1])
+                saved.add(-len(results))
+
+        result = results[-1] if results else None
+        storage.save(self.id, result)
+        return result
+
+    @staticmethod
+    def _fits(
+        lib: ModuleType,
+        name: str,
+        out: Any,
+        left: Any,
+        right: Any,
+    ) -> bool:
+        """Whether the ufunc of an operator action can write its result in
+        `out` and get the result of the action."""
+        ndarray = getattr(lib, "ndarray", None)
+        if ndarray is None or type(left) is not ndarray:
+            return False
+        # Operators on 0-d arrays return scalars.
+        if type(out) is not ndarray or out.ndim == 0:
+            return False
+        # Other operands may override the operator, or the ufunc.
+        if type(right) is not ndarray and not lib.isscalar(right):
+            return False
+        kind = out.dtype.kind
+        if kind not in "iufc" or (kind in "iu" and name == "__truediv__"):
+            return False
+        return out.dtype == lib.result_type(
+            left, right
+        ) and out.shape == lib.broadcast_shapes(left.shape, lib.shape(right))
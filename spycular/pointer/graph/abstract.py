@@ -1,19 +1,44 @@
 from abc import ABCMeta, abstractmethod
-from typing import Callable, Dict, List, Set
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set, cast
 
 from ...reflection.reflected import ReflectedModule
 from ...serde.capnp.recursive import serializable
 from ...store.abstract import AbstractStore
-from ..abstract import Pointer
+from ..abstract import Pointer, ignore_reply
+from ..object_pointer import GetPointer
+from .compiled import CompiledGraph
+from .cost import CostModel
 from .pointer_node import PointerNode
 from .state_enum import PointerState
 
 
 @serializable
 class PointerGraph(metaclass=ABCMeta):
-    def __init__(self, pointers: Set[Pointer]) -> None:
+    # Rebuilt from the graph map by the receiver.
+    __exclude__ = ["_compiled"]
+
+    def __init__(
+        self,
+        pointers: Iterable[Pointer],
+        dependencies: Dict[str, List[str]] | None = None,
+        pinned: Set[str] | None = None,
+    ) -> None:
+        """Initialize a PointerGraph.
+
+        Args:
+            pointers (Iterable[Pointer]): Pointers to execute.
+            dependencies (Dict[str, List[str]], optional): IDs of the
+            pointers each pointer must run after. By default they're
+            derived from the pointer parents.
+            pinned (Set[str], optional): IDs of results kept in the storage
+            after their last successor ran. The targets of GetPointers are
+            always kept.
+        """
         self.graph_map: Dict[str, PointerNode] = {}
-        self.__build_execution_graph(pointers)
+        self.pinned: Set[str] = set(pinned) if pinned else set()
+        self._compiled: CompiledGraph | None = None
+        self.__build_graph(pointers, dependencies)
 
     @abstractmethod
     async def async_solve(
@@ -21,9 +46,173 @@ class PointerGraph(metaclass=ABCMeta):
         reflected_module: ReflectedModule,
         storage: AbstractStore | None = None,
         reply_callback: Callable | None = None,
+        costs: CostModel | None = None,
     ) -> None:
         pass
 
+    def solve(
+        self,
+        reflected_module: ReflectedModule,
+        storage: AbstractStore | None = None,
+        reply_callback: Callable | None = None,
+    ) -> None:
+        """Execute the graph synchronously, every pointer after its
+        parents, in insertion order otherwise.
+
+        Args:
+            reflected_module (ReflectedModule): Module executing pointers.
+            storage (AbstractStore): Storage of the results.
+            reply_callback (Callable, optional): Callback for replies.
+
+        Raises:
+            ValueError: If there's no storage.
+        """
+        if storage is None:
+            raise ValueError("Graphs run on a storage.")
+        compiled = self.compiled
+        pending = compiled.indegree.tolist()
+        ready = deque(idx for idx, count in enumerate(pending) if count == 0)
+        while ready:
+            idx = ready.popleft()
+            node = compiled.nodes[idx]
+            reflected_module.execute(
+                # Nodes of a graph always hold a pointer.
+                pointer=cast(Pointer, node.pointer),
+                storage=storage,
+                reply_callback=reply_callback or ignore_reply,
+            )
+            node.state = PointerState.FINISHED
+            self.release_parents(idx, storage)
+            for sucessor in compiled.sucessors(idx):
+                pending[sucessor] -= 1
+                if pending[sucessor] == 0:
+                    ready.append(sucessor)
+
+    @property
+    def compiled(self) -> CompiledGraph:
+        """Index-based view of the graph, built on first use."""
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None:
+            compiled = self._compiled = CompiledGraph(self.graph_map)
+        return compiled
+
+    def release_parents(
+        self,
+        idx: int,
+        storage: AbstractStore | None,
+    ) -> List[int]:
+        """Delete the unpinned parent results no other node needs.
+
+        Args:
+            idx (int): Index of the node that just ran.
+            storage (AbstractStore, optional): Storage of the results.
+
+        Returns:
+            List[int]: Indices of the nodes whose result was deleted.
+        """
+        compiled = self.compiled
+        deleted = []
+        for parent in compiled.parents(idx):
+            node = compiled.nodes[parent]
+            node.count -= 1
+            if (
+                node.count == 0
+                and node.id not in self.pinned
+                and storage is not None
+            ):
+                storage.delete(node.id)
+                deleted.append(parent)
+        return deleted
+
+    def add_dependency(self, parent: str, key: str) -> None:
+        """Make a node run after another node of the graph.
+
+        Args:
+            parent (str): ID of the node to run first.
+            key (str): ID of the node to run after it.
+        """
+        node = self.graph_map[key]
+        node.parents.append(parent)
+        node.predecessor = True
+        self.graph_map[parent].count += 1
+        self.graph_map[parent].sucessor.append(key)
+        self._compiled = None
+
+    def replace_nodes(self, keys: List[str], pointer: Pointer) -> None:
+        """Replace connected nodes with a single pointer computing the
+        result of the last one.
+
+        Only the last node may have successors. The new node depends on
+        every parent of the replaced nodes outside of them.
+
+        Args:
+            keys (List[str]): IDs of the replaced nodes, the last one being
+            the ID of the pointer.
+            pointer (Pointer): The pointer replacing them.
+        """
+        replaced = set(keys)
+        parents = [
+            parent
+            for key in keys
+            for parent in self.graph_map[key].parents
+            if parent not in replaced
+        ]
+        parents = list(dict.fromkeys(parents))
+        for parent in parents:
+            parent_node = self.graph_map.get(parent, None)
+            if parent_node is None:
+                continue
+            sucessors = [
+                key for key in parent_node.sucessor if key not in replaced
+            ]
+            parent_node.count -= len(parent_node.sucessor) - len(sucessors)
+            parent_node.sucessor = sucessors + [pointer.id]
+            parent_node.count += 1
+
+        node = self.graph_map[keys[-1]]
+        fused = PointerNode(pointer=pointer, parents=parents)
+        fused.count = node.count
+        fused.sucessor = node.sucessor
+        for key in keys[:-1]:
+            del self.graph_map[key]
+        # Same position in the map, the insertion order stays the same.
+        self.graph_map[pointer.id] = fused
+        self._compiled = None
+
+    def topological_order(self) -> List[str]:
+        """IDs of the nodes, every node after its parents."""
+        keys = self.compiled.keys
+        return [keys[idx] for idx in self.compiled.topological_order()]
+
+    def critical_path(
+        self,
+        costs: CostModel | None = None,
+    ) -> Dict[str, float]:
+        """Estimated time left once each node starts: its cost plus the
+        longest path through its successors.
+
+        Running the nodes with the longest remaining path first keeps the
+        critical path of the graph busy, and shortens the total time of
+        graphs with branches of uneven lengths.
+
+        Args:
+            costs (CostModel, optional): Costs of the nodes, by pointer
+            path. Every node costs 1 by default, the remaining path is then
+            the number of nodes left on it.
+
+        Returns:
+            Dict[str, float]: Remaining path by node ID.
+        """
+        return dict(
+            zip(self.compiled.keys, self.compiled.critical_path(costs)),
+        )
+
+    @property
+    def width(self) -> int:
+        """Largest number of nodes at the same depth, the number of
+        nodes that can usefully run at once."""
+        return self.compiled.width()
+
     @property
     def root_nodes(self) -> List[str]:
         node_starters = []
@@ -35,25 +224,30 @@ class PointerGraph(metaclass=ABCMeta):
                 self.graph_map[key].state = PointerState.RUNNING
         return node_starters
 
-    def __build_execution_graph(self, pointers):
+    def __build_graph(
+        self,
+        pointers: Iterable[Pointer],
+        dependencies: Dict[str, List[str]] | None,
+    ) -> None:
         for ptr in pointers:
-            node = self.graph_map.get(ptr.id, None)
-            if not node:
-                self.graph_map[ptr.id] = PointerNode(pointer=ptr)
-            else:
-                self.graph_map[ptr.id].set_pointer(ptr)
-
-            if getattr(ptr, "parents", None):
-                for parent in ptr.parents:
-                    parent_id = (
-                        parent.target_id if parent.target_id else parent.id
-                    )
-                    parent_node = self.graph_map.get(parent_id, None)
-                    if parent_node:
-                        self.graph_map[parent_id].count += 1
-                        self.graph_map[parent_id].sucessor.append(ptr.id)
-                    else:
-                        self.graph_map[ptr.id] = PointerNode(pointer=ptr)
+            # Retrieved results outlive the graph, the client reads them.
+            if isinstance(ptr, GetPointer) and ptr.target_id:
+                self.pinned.add(ptr.target_id)
+            self.graph_map[ptr.id] = PointerNode(
+                pointer=ptr,
+                parents=(
+                    list(dependencies.get(ptr.id, []))
+                    if dependencies is not None
+                    else None
+                ),
+            )
+        # Edges are linked once every node exists, so pointers may come in
+        # any order.
+        for key, node in self.graph_map.items():
+            for parent in node.parents:
+                if parent in self.graph_map:
+                    self.graph_map[parent].count += 1
+                    self.graph_map[parent].sucessor.append(key)
 
     def __repr__(self) -> str:
         return str(self.graph_map)
@@ -1,86 +1,170 @@
 import asyncio
-from typing import Callable, Set
+import itertools
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 from ...reflection.reflected import ReflectedModule
 from ...serde.capnp.recursive import serializable
 from ...store.abstract import AbstractStore
-from ..abstract import Pointer
+from ..abstract import Pointer, ignore_reply
 from .abstract import PointerGraph
+from .cost import CostModel
 from .state_enum import PointerState
 
+# Workers take turns on the event loop, more of them only add tasks to
+# switch between, even for graphs wider than that.
+MAX_WORKERS = 64
+
+# (negated remaining path, insertion order, node index or None to stop)
+QueueItem = Tuple[float, int, Optional[int]]
+
+
+class _Progress:
+    """Counters shared by the workers of a run."""
+
+    def __init__(self, left: int, workers: int) -> None:
+        self.left = left
+        self.workers = workers
+        self.sequence = itertools.count()
+
 
 @serializable
 class AsyncPointerGraph(PointerGraph):
-    def __init__(self, pointers: Set[Pointer]) -> None:
-        super().__init__(pointers)
+    def __init__(
+        self,
+        pointers: Iterable[Pointer],
+        dependencies: Dict[str, List[str]] | None = None,
+        pinned: Set[str] | None = None,
+    ) -> None:
+        super().__init__(pointers, dependencies, pinned)
 
-    @staticmethod
     async def worker(
-        graph_map,
-        queue,
-        lock,
-        reflected_module,
-        storage,
-        reply_callback,
-        number,
-    ):
-        while not queue.empty():
-            node = await queue.get()
-            # graph_map[node].solve(, storage, reply_callback)
-            reflected_module.execute(
-                pointer=graph_map[node].pointer,
-                storage=storage,
-                reply_callback=reply_callback,
-            )
+        self,
+        queue: "asyncio.PriorityQueue[QueueItem]",
+        pending: List[int],
+        progress: _Progress,
+        priority: List[float],
+        reflected_module: ReflectedModule,
+        storage: AbstractStore,
+        reply_callback: Callable,
+        costs: CostModel | None,
+    ) -> None:
+        """Execute ready nodes, longest remaining path first, until the
+        queue yields None."""
+        compiled = self.compiled
+        while True:
+            _, _, idx = await queue.get()
+            if idx is None:
+                return
+            node = compiled.nodes[idx]
+            node.state = PointerState.RUNNING
+            start = time.perf_counter()
+            try:
+                reflected_module.execute(
+                    # Nodes of a graph always hold a pointer.
+                    pointer=cast(Pointer, node.pointer),
+                    storage=storage,
+                    reply_callback=reply_callback,
+                )
+            except BaseException:
+                self._stop_workers(queue, progress)
+                raise
+            if costs is not None:
+                costs.update(node.path, time.perf_counter() - start)
+            node.state = PointerState.FINISHED
+            self.release_parents(idx, storage)
 
-            async with lock:
-                graph_map[node].state = PointerState.FINISHED
-
-            for parent in graph_map[node].parents:
-                async with lock:
-                    graph_map[parent].count -= 1
-                    if graph_map[parent].count == 0:
-                        storage.delete(parent)
-
-            for sucessor in graph_map[node].sucessor:
-                to_be_executed = True
-                for parent in graph_map[sucessor].parents:
-                    if graph_map[parent].state != PointerState.FINISHED:
-                        to_be_executed = False
-
-                if to_be_executed:
-                    async with lock:
-                        graph_map[sucessor].state = PointerState.RUNNING
-                        queue.put_nowait(sucessor)
+            # The event loop runs one worker at a time, so counters are
+            # updated atomically.
+            for sucessor in compiled.sucessors(idx):
+                pending[sucessor] -= 1
+                if pending[sucessor] == 0:
+                    queue.put_nowait(
+                        (
+                            -priority[sucessor],
+                            next(progress.sequence),
+                            sucessor,
+                        ),
+                    )
+            progress.left -= 1
+            if progress.left == 0:
+                self._stop_workers(queue, progress)
             await asyncio.sleep(0)
 
+    @staticmethod
+    def _stop_workers(
+        queue: "asyncio.PriorityQueue[QueueItem]",
+        progress: _Progress,
+    ) -> None:
+        # Sentinels sort before every node.
+        for _ in range(progress.workers):
+            queue.put_nowait((float("-inf"), next(progress.sequence), None))
+
     async def async_solve(
         self,
         reflected_module: ReflectedModule,
         storage: AbstractStore | None = None,
         reply_callback: Callable | None = None,
+        costs: CostModel | None = None,
     ) -> None:
-        node_starters = self.root_nodes
+        """Execute the graph, every pointer after its parents.
+
+        Ready pointers run longest remaining path first, on as many workers
+        as the graph width up to MAX_WORKERS, so branches of a single root
+        can progress together.
 
-        queue: asyncio.Queue = asyncio.Queue(
-            maxsize=len(self.graph_map.keys()),
+        Args:
+            reflected_module (ReflectedModule): Module executing pointers.
+            storage (AbstractStore): Storage of the results.
+            reply_callback (Callable, optional): Callback for replies.
+            costs (CostModel, optional): Execution times of previous runs,
+            updated with the times of this one. Every pointer costs the
+            same by default.
+
+        Raises:
+            ValueError: If there's no storage.
+        """
+        if storage is None:
+            raise ValueError("Graphs run on a storage.")
+        compiled = self.compiled
+        order = compiled.topological_order()
+        if not order:
+            return
+        priority = compiled.critical_path(costs)
+        pending = compiled.indegree.tolist()
+        progress = _Progress(
+            left=len(order),
+            workers=min(compiled.width(), MAX_WORKERS),
         )
-        graph_changes_lock = asyncio.Lock()
-        for item in node_starters:
-            queue.put_nowait(item)
+        queue: "asyncio.PriorityQueue[QueueItem]" = asyncio.PriorityQueue()
+        for idx, count in enumerate(pending):
+            if count == 0:
+                queue.put_nowait(
+                    (-priority[idx], next(progress.sequence), idx)
+                )
 
         consumer_tasks = [
             asyncio.create_task(
-                AsyncPointerGraph.worker(
-                    graph_map=self.graph_map,
+                self.worker(
                     queue=queue,
-                    lock=graph_changes_lock,
-                    number=i,
+                    pending=pending,
+                    progress=progress,
+                    priority=priority,
                     reflected_module=reflected_module,
                     storage=storage,
-                    reply_callback=reply_callback,
+                    reply_callback=reply_callback or ignore_reply,
+                    costs=costs,
                 ),
             )
-            for i in range(len(node_starters))
+            for _ in range(progress.workers)
         ]
         await asyncio.gather(*consumer_tasks)
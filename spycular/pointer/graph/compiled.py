@@ -0,0 +1,132 @@
+from array import array
+from itertools import accumulate, chain
+from typing import Dict, List, Tuple
+
+from .cost import CostModel
+from .pointer_node import PointerNode
+
+
+def _csr(adjacency: List[List[int]]) -> Tuple[array, array]:
+    """Pack adjacency lists in (offsets, targets) arrays: the neighbours
+    of node `i` are `targets[offsets[i]:offsets[i + 1]]`."""
+    offsets = array("l", [0])
+    offsets.extend(accumulate(map(len, adjacency)))
+    return offsets, array("l", chain.from_iterable(adjacency))
+
+
+class CompiledGraph:
+    """Index-based view of a PointerGraph, built once before it runs.
+
+    Nodes are numbered in the graph insertion order, and edges are stored
+    in compressed sparse rows, so finding the successors of a node is a
+    slice, and a node is ready when a counter of its parents left reaches
+    zero, whatever its number of parents. Only the parents inside the graph
+    are edges, the others already are in the storage.
+
+    Attributes:
+        keys (List[str]): Node IDs by index.
+        nodes (List[PointerNode]): Nodes by index.
+        index (Dict[str, int]): Index of every node ID.
+        indegree (array): Number of parent edges of every node.
+        sucessor_offsets (array): Row offsets of the successor edges.
+        sucessor_targets (array): Successor indices, row after row.
+        parent_offsets (array): Row offsets of the parent edges.
+        parent_targets (array): Parent indices, row after row.
+    """
+
+    __slots__ = (
+        "keys",
+        "nodes",
+        "index",
+        "indegree",
+        "sucessor_offsets",
+        "sucessor_targets",
+        "parent_offsets",
+        "parent_targets",
+        "_order",
+    )
+
+    def __init__(self, graph_map: Dict[str, PointerNode]) -> None:
+        self.keys = list(graph_map)
+        self.nodes = list(graph_map.values())
+        self.index = {key: idx for idx, key in enumerate(self.keys)}
+        index = self.index
+
+        parents = [
+            [idx for idx in map(index.get, node.parents) if idx is not None]
+            for node in self.nodes
+        ]
+        # Successors are always inside the graph.
+        sucessors = [
+            list(map(index.__getitem__, node.sucessor)) for node in self.nodes
+        ]
+
+        self.indegree = array("l", map(len, parents))
+        self.parent_offsets, self.parent_targets = _csr(parents)
+        self.sucessor_offsets, self.sucessor_targets = _csr(sucessors)
+        self._order: List[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def sucessors(self, idx: int) -> array:
+        """Indices of the nodes depending on a node."""
+        offsets = self.sucessor_offsets
+        start, end = offsets[idx], offsets[idx + 1]
+        return self.sucessor_targets[start:end]
+
+    def parents(self, idx: int) -> array:
+        """Indices of the nodes a node depends on, inside the graph."""
+        offsets = self.parent_offsets
+        start, end = offsets[idx], offsets[idx + 1]
+        return self.parent_targets[start:end]
+
+    def topological_order(self) -> List[int]:
+        """Node indices, every node after its parents."""
+        if self._order is None:
+            self._order = self._sort()
+        return self._order
+
+    def _sort(self) -> List[int]:
+        pending = self.indegree.tolist()
+        order = [idx for idx, count in enumerate(pending) if count == 0]
+        offsets, targets = self.sucessor_offsets, self.sucessor_targets
+        for idx in order:
+            start, end = offsets[idx], offsets[idx + 1]
+            for sucessor in targets[start:end]:
+                pending[sucessor] -= 1
+                if pending[sucessor] == 0:
+                    order.append(sucessor)
+        return order
+
+    def critical_path(self, costs: CostModel | None = None) -> List[float]:
+        """Cost of every node plus the longest path through its
+        successors, by index. Every node costs 1 without `costs`."""
+        remaining = [0.0] * len(self.keys)
+        offsets, targets = self.sucessor_offsets, self.sucessor_targets
+        for idx in reversed(self.topological_order()):
+            cost = (
+                costs.estimate(self.nodes[idx].path)
+                if costs is not None
+                else 1.0
+            )
+            start, end = offsets[idx], offsets[idx + 1]
+            remaining[idx] = cost + max(
+                [remaining[sucessor] for sucessor in targets[start:end]],
+                default=0.0,
+            )
+        return remaining
+
+    def width(self) -> int:
+        """Largest number of nodes at the same depth."""
+        depth = [0] * len(self.keys)
+        offsets, targets = self.sucessor_offsets, self.sucessor_targets
+        counts: Dict[int, int] = {}
+        for idx in self.topological_order():
+            level = depth[idx] + 1
+            counts[level] = counts.get(level, 0) + 1
+            start, end = offsets[idx], offsets[idx + 1]
+            for sucessor in targets[start:end]:
+                if depth[sucessor] < level:
+                    depth[sucessor] = level
+        return max(counts.values(), default=0)
@@ -0,0 +1,48 @@
+from typing import Dict
+
+
+class CostModel:
+    """Execution time estimates of pointers, by path, learned from
+    previous runs.
+
+    Each estimate is an exponential moving average of the measured times,
+    so it follows slow changes of the data sizes. Paths never measured
+    cost `default`, which makes the critical path of an unknown graph its
+    longest chain of nodes.
+
+    Attributes:
+        default (float): Estimate of a path never measured, in seconds.
+        smoothing (float): Weight of a new measure in the average.
+    """
+
+    def __init__(self, default: float = 1e-3, smoothing: float = 0.5):
+        """Initialize a CostModel.
+
+        Args:
+            default (float): Estimate of a path never measured, in seconds.
+            smoothing (float): Weight of a new measure in the average,
+            between 0 and 1.
+        """
+        self.default = default
+        self.smoothing = smoothing
+        self._estimates: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._estimates)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._estimates
+
+    def estimate(self, path: str) -> float:
+        """Estimated execution time of a pointer path, in seconds."""
+        return self._estimates.get(path, self.default)
+
+    def update(self, path: str, seconds: float) -> None:
+        """Add a measured execution time of a pointer path."""
+        previous = self._estimates.get(path, None)
+        if previous is None:
+            self._estimates[path] = seconds
+        else:
+            self._estimates[path] = previous + self.smoothing * (
+                seconds - previous
+            )
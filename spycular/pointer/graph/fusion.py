@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Set
+
+from ..abstract import Pointer
+from ..fused_pointer import ELEMENTWISE_UFUNCS, FusedPointer, FusedStep
+from ..object_pointer import ObjectActionPointer, ObjectPointer
+from .abstract import PointerGraph
+
+
+def is_elementwise(ptr: Pointer | None) -> bool:
+    """Whether a pointer is a binary operator action on a stored object,
+    like the ones of `a + b`."""
+    return (
+        isinstance(ptr, ObjectActionPointer)
+        and ptr.path in ELEMENTWISE_UFUNCS
+        and ptr.temp_obj is None
+        and len(ptr.args) == 1
+        and not ptr.kwargs
+    )
+
+
+class _Chain:
+    """Steps of the FusedPointer replacing an elementwise node and the
+    elementwise nodes only it reads."""
+
+    def __init__(self, graph: PointerGraph, skip: Set[str]) -> None:
+        self.graph = graph
+        self.skip = skip
+        self.keys: List[str] = []
+        self.steps: List[FusedStep] = []
+        self.args: List[Any] = []
+        self._refs: Dict[str, int] = {}
+
+    def emit(self, key: str) -> int:
+        """Add the steps of a node after the ones of its operands.
+
+        Returns:
+            int: Reference to the result of the node.
+        """
+        ptr = self.graph.graph_map[key].pointer
+        if not isinstance(ptr, ObjectActionPointer):
+            raise TypeError(f"{ptr} isn't an elementwise action.")
+        arg = ptr.args[0]
+        target = ObjectPointer(pointer_id=ptr.target_id)
+        left = self._operand(key, ptr.target_id, target)
+        arg_id = (
+            arg.id
+            if isinstance(arg, ObjectPointer) and not arg.target_id
+            else None
+        )
+        right = self._operand(key, arg_id, arg)
+        # Intermediate results the client may read are still saved.
+        save_id = key if key in self.graph.pinned else ""
+        self.steps.append((ptr.path, left, right, save_id))
+        self.keys.append(key)
+        self._refs[key] = -len(self.steps)
+        return self._refs[key]
+
+    def pointer(self) -> FusedPointer:
+        names = ",".join(step[0] for step in self.steps)
+        return FusedPointer(
+            steps=self.steps,
+            args=self.args,
+            path=f"fused:{names}",
+            pointer_id=self.keys[-1],
+        )
+
+    def _operand(self, key: str, obj_id: str | None, value: Any) -> int:
+        if obj_id in self._refs:
+            return self._refs[obj_id]
+        if obj_id is not None and self._fusable(obj_id, key):
+            return self.emit(obj_id)
+        self.args.append(value)
+        return len(self.args) - 1
+
+    def _fusable(self, obj_id: str, key: str) -> bool:
+        node = self.graph.graph_map.get(obj_id, None)
+        return (
+            node is not None
+            and obj_id not in self.skip
+            and is_elementwise(node.pointer)
+            and set(node.sucessor) == {key}
+        )
+
+
+def fuse_elementwise(graph: PointerGraph) -> int:
+    """Replace the chains of elementwise operator actions of a graph with
+    FusedPointers.
+
+    A chain is an elementwise node and, recursively, the elementwise nodes
+    it reads whose result no other node needs. Evaluated at once, their
+    intermediate results are neither scheduled nor stored, and numpy
+    arrays are reused through `out=` buffers.
+
+    Args:
+        graph (PointerGraph): The graph, modified in place.
+
+    Returns:
+        int: Number of FusedPointers added.
+    """
+    fused: Set[str] = set()
+    count = 0
+    # Last nodes first, a chain ends at the node using its result.
+    for key in reversed(graph.topological_order()):
+        if key in fused or not is_elementwise(graph.graph_map[key].pointer):
+            continue
+        chain = _Chain(graph, fused)
+        chain.emit(key)
+        if len(chain.keys) < 2:
+            continue
+        fused.update(chain.keys)
+        graph.replace_nodes(chain.keys, chain.pointer())
+        count += 1
+    return count
@@ -0,0 +1,197 @@
+import heapq
+import sys
+from typing import AbstractSet, Any, Dict, List, Tuple
+
+from .compiled import CompiledGraph
+
+
+def object_nbytes(obj: Any) -> int:
+    """Approximate memory held by a stored object, in bytes.
+
+    Arrays report their buffer size, containers the sum of their items.
+    """
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    # torch tensors, without importing torch.
+    if hasattr(obj, "element_size") and hasattr(obj, "nelement"):
+        return obj.element_size() * obj.nelement()
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(map(object_nbytes, obj))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(map(object_nbytes, obj.values()))
+    return sys.getsizeof(obj)
+
+
+class MemoryBudget:
+    """Bound on the bytes of results a graph keeps stored while it runs.
+
+    The size of the result of a node is estimated from the results of the
+    same pointer path in previous runs, or as large as its largest input
+    for a path never measured, which holds for elementwise operations.
+
+    Attributes:
+        limit (int): Largest number of bytes stored at once.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize a MemoryBudget.
+
+        Args:
+            limit (int): Largest number of bytes stored at once.
+        """
+        self.limit = limit
+        self._result_sizes: Dict[str, int] = {}
+
+    def estimate(self, path: str, input_nbytes: int) -> int:
+        """Estimated size of the result of a pointer path, in bytes."""
+        return self._result_sizes.get(path, input_nbytes)
+
+    def update(self, path: str, nbytes: int) -> None:
+        """Add a measured result size of a pointer path."""
+        self._result_sizes[path] = nbytes
+
+
+class MemoryTracker:
+    """Bytes stored by the nodes of a running graph.
+
+    Running nodes reserve the estimated size of their result until it's
+    measured in the storage. Results stay counted until the graph deletes
+    them, pinned ones until the end of the run.
+
+    Attributes:
+        stored (Dict[int, int]): Size of every stored result, by node
+        index.
+        used (int): Bytes stored and reserved.
+        peak (int): Largest value of `used` during the run.
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledGraph,
+        budget: MemoryBudget,
+        pinned: AbstractSet[str] = frozenset(),
+    ) -> None:
+        self.compiled = compiled
+        self.budget = budget
+        self.pinned = pinned
+        self.stored: Dict[int, int] = {}
+        self._reserved: Dict[int, int] = {}
+        self.used = 0
+        self.peak = 0
+
+    def estimate(self, idx: int) -> int:
+        """Estimated size of the result of a node."""
+        input_nbytes = max(
+            (
+                self.stored.get(parent, 0)
+                for parent in self.compiled.parents(idx)
+            ),
+            default=0,
+        )
+        return self.budget.estimate(
+            self.compiled.nodes[idx].path, input_nbytes
+        )
+
+    def growth(self, idx: int) -> int:
+        """Estimated change of the stored bytes once a node ran: its
+        result, minus the inputs only it still needs."""
+        nodes = self.compiled.nodes
+        freed = sum(
+            self.stored.get(parent, 0)
+            for parent in self.compiled.parents(idx)
+            if nodes[parent].count == 1 and nodes[parent].id not in self.pinned
+        )
+        return self.estimate(idx) - freed
+
+    def fits(self, idx: int) -> bool:
+        """Whether the result of a node fits in the budget."""
+        return self.used + self.estimate(idx) <= self.budget.limit
+
+    def reserve(self, idx: int) -> None:
+        """Count the estimated result of a node about to run."""
+        self._reserved[idx] = self.estimate(idx)
+        self._add(self._reserved[idx])
+
+    def finished(self, idx: int, nbytes: int) -> None:
+        """Replace the reservation of a node with its measured result."""
+        self.budget.update(self.compiled.nodes[idx].path, nbytes)
+        self._add(nbytes - self._reserved.pop(idx, 0))
+        self.stored[idx] = nbytes
+
+    def deleted(self, indices: List[int]) -> None:
+        """Stop counting the results the graph deleted."""
+        for idx in indices:
+            self._add(-self.stored.pop(idx, 0))
+
+    def _add(self, nbytes: int) -> None:
+        self.used += nbytes
+        self.peak = max(self.peak, self.used)
+
+
+# (-remaining path, insertion order, node index)
+ReadyItem = Tuple[float, int, int]
+
+
+class ReadyNodes:
+    """Nodes whose parents all ran, longest remaining path first.
+
+    With a MemoryTracker, a node whose result doesn't fit in the budget is
+    deferred, and the next nodes that fit run first, typically reductions
+    freeing their inputs. Deferred nodes run as soon as they fit. When
+    nothing fits and nothing runs, the deferred node growing the stored
+    bytes the least runs anyway, so the graph always progresses.
+    """
+
+    def __init__(
+        self,
+        priority: List[float],
+        tracker: MemoryTracker | None = None,
+    ) -> None:
+        self.priority = priority
+        self.tracker = tracker
+        self._ready: List[ReadyItem] = []
+        # Unordered, they're all checked whenever memory may be available.
+        self._deferred: List[ReadyItem] = []
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._ready) + len(self._deferred)
+
+    def push(self, idx: int) -> None:
+        self._sequence += 1
+        heapq.heappush(
+            self._ready,
+            (-self.priority[idx], self._sequence, idx),
+        )
+
+    def pop(self, running: int) -> int | None:
+        """Next node to run, or None to wait for a running node.
+
+        Args:
+            running (int): Number of nodes running.
+        """
+        tracker = self.tracker
+        if tracker is None:
+            return heapq.heappop(self._ready)[2] if self._ready else None
+
+        best = min(
+            (item for item in self._deferred if tracker.fits(item[2])),
+            default=None,
+        )
+        while self._ready and (best is None or self._ready[0] < best):
+            item = heapq.heappop(self._ready)
+            if tracker.fits(item[2]):
+                return item[2]
+            self._deferred.append(item)
+        if best is None and running == 0 and self._deferred:
+            # Lambdas don't keep the narrowed type of the tracker.
+            growth = tracker.growth
+            best = min(
+                self._deferred,
+                key=lambda item: (growth(item[2]), item),
+            )
+        if best is None:
+            return None
+        self._deferred.remove(best)
+        return best[2]
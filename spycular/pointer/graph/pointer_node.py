@@ -1,55 +1,80 @@
-from typing import List
+from typing import Any, Dict, List
 
 from ...serde.capnp.recursive import serializable
 from ..abstract import Pointer
+from ..object_pointer import GetPointer
 from .state_enum import PointerState
 
 
+def parent_ids(pointer: Pointer | None) -> List[str]:
+    """IDs of the stored objects the parents of a pointer resolve to.
+
+    Parents that aren't pointers, like the operand of `ptr + 1`, are
+    skipped. A GetPointer depends on the object it retrieves.
+    """
+    if isinstance(pointer, GetPointer):
+        return [pointer.target_id] if pointer.target_id else []
+    return [
+        getattr(parent, "target_id", None) or parent.id
+        for parent in getattr(pointer, "parents", None) or ()
+        if isinstance(parent, Pointer)
+    ]
+
+
 @serializable
 class PointerNode:
+    # Graphs hold a node per pointer, slots keep large ones compact. The
+    # annotations are the attributes serialized.
+    __slots__ = (
+        "id",
+        "pointer",
+        "path",
+        "parents",
+        "predecessor",
+        "count",
+        "state",
+        "sucessor",
+    )
+    id: str
+    pointer: Pointer | None
+    path: str
+    parents: List[str]
+    predecessor: bool
+    count: int
+    state: PointerState
+    sucessor: List[str]
+
     def __init__(
         self,
         pointer: Pointer | None = None,
         count: int = 0,
         sucessor: List[str] | None = None,
+        parents: List[str] | None = None,
     ) -> None:
         self.id = pointer.id if pointer else ""  # type: ignore
         self.pointer = pointer
         self.path = pointer.path if self.pointer else ""  # type: ignore
-        self.parents = (
-            [
-                parent.target_id if parent.target_id else parent.id
-                for parent in pointer.parents  # type: ignore
-            ]
-            if getattr(pointer, "parents", None)
-            else []
-        )
-
-        self.predecessor = (
-            False
-            if not getattr(pointer, "parents", False)
-            or not pointer.parents  # type: ignore
-            else True
-        )
+        # Explicit dependencies replace the ones of the pointer parents.
+        self.parents = parents if parents is not None else parent_ids(pointer)
+        self.predecessor = bool(self.parents)
         self.count = count
         self.state = PointerState.PENDING
         self.sucessor = sucessor if sucessor else []
 
+    @classmethod
+    def serde_constructor(cls, kwargs: Dict[str, Any]) -> "PointerNode":
+        # Slotted objects have no __dict__ to restore.
+        node = cls.__new__(cls)
+        for name, value in kwargs.items():
+            setattr(node, name, value)
+        return node
+
     def set_pointer(self, pointer: Pointer):
         self.id = pointer.id
         self.pointer = pointer
         self.path = pointer.path
-        self.parents = (
-            [
-                parent.target_id if parent.target_id else parent.id
-                for parent in pointer.parents  # type: ignore
-            ]
-            if getattr(pointer, "parents", None)
-            else []
-        )
-        self.predecessor = (
-            False if not pointer.parents else True  # type: ignore
-        )
+        self.parents = parent_ids(pointer)
+        self.predecessor = bool(self.parents)
 
     def __repr__(self) -> str:
         return f"<PointerNode id={self.id} count={self.count} \
@@ -0,0 +1,271 @@
+import weakref
+from typing import Any, Dict, Iterable, List, Set
+
+from ..abstract import Pointer
+from ..callable_pointer import CallablePointer
+from ..object_pointer import ObjectActionPointer, ObjectPointer
+from .async_graph import AsyncPointerGraph
+
+# Actions returning a new object without modifying their operands. Any
+# other action or call may write the objects it receives.
+PURE_ACTIONS = frozenset(
+    {
+        "__add__",
+        "__sub__",
+        "__mul__",
+        "__truediv__",
+        "__floordiv__",
+        "__mod__",
+        "__pow__",
+        "__getitem__",
+    },
+)
+
+
+def is_pure(ptr: Pointer) -> bool:
+    """Whether a pointer returns a new object without modifying the
+    objects it receives."""
+    if isinstance(ptr, ObjectActionPointer):
+        name = ptr.path.rsplit(".", 1)[-1]
+        return name in PURE_ACTIONS or ptr.temp_obj is not None
+    return not isinstance(ptr, CallablePointer)
+
+
+def pointer_arguments(ptr: Any) -> List[Any]:
+    """Positional and keyword argument values of a pointer."""
+    args = list(getattr(ptr, "args", ()) or ())
+    return args + list((getattr(ptr, "kwargs", {}) or {}).values())
+
+
+def detach(obj: Any) -> Any:
+    """Copy the object pointers of an argument without their broker and
+    parents, so recorded pointers don't keep the client pointers alive."""
+    if isinstance(obj, ObjectPointer):
+        # Attribute lookups on object pointers create pointers, copy the
+        # attributes directly.
+        copy = object.__new__(type(obj))
+        vars(copy).update(vars(obj))
+        copy.parents, copy.broker = tuple(), None
+        return copy
+    if type(obj) in (list, tuple):
+        return type(obj)(detach(item) for item in obj)
+    if type(obj) is dict:
+        return {key: detach(value) for key, value in obj.items()}
+    return obj
+
+
+class GraphRecorder:
+    """Records the pointers sent by a lazy producer, with their
+    dependencies, until one of their results is retrieved.
+
+    Only the pointers a retrieved result depends on are sent, as a single
+    AsyncPointerGraph. A pointer depends on the last writer of every object
+    it reads, and a pointer that may write an object also depends on the
+    pointers that read it before, so operations on a shared object keep
+    their order.
+
+    The results the client can still reach are kept in the consumer
+    storage: the ones with live object pointers, the retrieved ones and
+    the ones pointers still recorded read. The others are deleted once
+    used, and fused graphs don't store them at all.
+
+    Attributes:
+        pending (Dict[str, Pointer]): Recorded pointers not sent yet, in
+        the order they were recorded.
+        dependencies (Dict[str, List[str]]): IDs of the pointers each
+        recorded pointer must run after.
+    """
+
+    def __init__(self) -> None:
+        self.pending: Dict[str, Pointer] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        # Last pointer that created or may have modified each object.
+        self._writers: Dict[str, str] = {}
+        # Pointers that read each object since its last writer.
+        self._readers: Dict[str, List[str]] = {}
+        # Client pointers to the result of each recorded pointer.
+        self._handles: Dict[str, List[weakref.ref]] = {}
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def track(self, handle: ObjectPointer) -> None:
+        """Keep the result of a recorded pointer while a client pointer to
+        it is alive.
+
+        Results of recorded pointers never tracked are always kept.
+
+        Args:
+            handle (ObjectPointer): Client pointer to the result, or to an
+            attribute of it.
+        """
+        key = handle.target_id or handle.id
+        if key in self.pending:
+            self._handles.setdefault(key, []).append(weakref.ref(handle))
+
+    def record(self, ptr: Pointer) -> bool:
+        """Record a pointer instead of sending it.
+
+        Returns:
+            bool: False if the pointer can't be recorded and must be sent
+            right away.
+        """
+        if not isinstance(
+            ptr,
+            (ObjectPointer, ObjectActionPointer, CallablePointer),
+        ):
+            return False
+
+        reads = self._reads(ptr)
+        writes = self._writes(ptr, reads)
+        dependencies: List[str] = []
+        for key in reads:
+            writer = self._writers.get(key, None)
+            if writer is not None:
+                dependencies.append(writer)
+            if key not in writes:
+                self._readers.setdefault(key, []).append(ptr.id)
+        for key in writes:
+            dependencies.extend(self._readers.pop(key, []))
+            self._writers[key] = ptr.id
+        self._writers[ptr.id] = ptr.id
+
+        self.pending[ptr.id] = self._detach(ptr)
+        self.dependencies[ptr.id] = [
+            key for key in dict.fromkeys(dependencies) if key != ptr.id
+        ]
+        return True
+
+    def pop_graph(
+        self,
+        target_ids: Iterable[str] | None = None,
+    ) -> AsyncPointerGraph | None:
+        """Remove the pending pointers the targets depend on and return
+        them as a graph.
+
+        Args:
+            target_ids (Iterable[str], optional): IDs of the objects about
+            to be retrieved. Every pending pointer by default.
+
+        Returns:
+            AsyncPointerGraph | None: The graph, None if nothing is pending
+            for these targets.
+        """
+        targets: Set[str] = set()
+        if target_ids is None:
+            selected = set(self.pending)
+        else:
+            for key in target_ids:
+                targets.update((key, self._writers.get(key, key)))
+            selected = self._closure(targets)
+        if not selected:
+            return None
+
+        pointers = [
+            self.pending.pop(key)
+            for key in list(self.pending)
+            if key in selected
+        ]
+        dependencies = {
+            ptr.id: [
+                key for key in self.dependencies.pop(ptr.id) if key in selected
+            ]
+            for ptr in pointers
+        }
+        # Results later graphs may use stay in the consumer storage, and
+        # so do the objects modified in place, read through their last
+        # writer rather than the pointer that created them.
+        read = {
+            key for ptr_id in self.pending for key in self.dependencies[ptr_id]
+        }
+        pinned = {
+            key
+            for key in selected
+            if key in targets
+            or key in read
+            or self._writers.get(key, key) != key
+            or self._reachable(key)
+        }
+        for key in selected:
+            self._handles.pop(key, None)
+        return AsyncPointerGraph(
+            pointers,
+            dependencies=dependencies,
+            pinned=pinned,
+        )
+
+    def _reachable(self, key: str) -> bool:
+        """Whether the client may still use the result of a pointer."""
+        handles = self._handles.get(key, None)
+        if handles is None:
+            return True
+        return any(handle() is not None for handle in handles)
+
+    @staticmethod
+    def _detach(
+        ptr: ObjectPointer | ObjectActionPointer | CallablePointer,
+    ) -> Pointer:
+        """Drop the references of a recorded pointer to client pointers.
+        Its dependencies are recorded apart."""
+        if isinstance(ptr, ObjectPointer):
+            return detach(ptr)
+        if isinstance(ptr, ObjectActionPointer):
+            ptr.parents = tuple()
+            ptr.temp_obj = detach(ptr.temp_obj)
+        ptr.args = detach(ptr.args)
+        ptr.kwargs = detach(ptr.kwargs)
+        return ptr
+
+    def _closure(self, keys: Iterable[str]) -> Set[str]:
+        selected: Set[str] = set()
+        stack = [key for key in keys if key in self.pending]
+        while stack:
+            key = stack.pop()
+            if key in selected:
+                continue
+            selected.add(key)
+            stack.extend(
+                parent
+                for parent in self.dependencies[key]
+                if parent in self.pending and parent not in selected
+            )
+        return selected
+
+    def _reads(self, ptr: Pointer) -> List[str]:
+        """IDs of the stored objects a pointer reads."""
+        reads: List[str] = []
+        if isinstance(ptr, ObjectActionPointer):
+            # Temporary objects are resolved from the module.
+            if ptr.temp_obj is None:
+                reads.append(ptr.target_id)
+        elif isinstance(ptr, ObjectPointer) and ptr.target_id:
+            reads.append(ptr.target_id)
+        for arg in pointer_arguments(ptr):
+            self._collect(arg, reads)
+        return list(dict.fromkeys(reads))
+
+    def _writes(self, ptr: Pointer, reads: List[str]) -> List[str]:
+        """IDs of the stored objects a pointer may modify."""
+        if is_pure(ptr):
+            return []
+        if isinstance(ptr, ObjectActionPointer):
+            return [ptr.target_id]
+        return reads
+
+    def _collect(self, obj: Any, reads: List[str]) -> None:
+        if isinstance(obj, Pointer):
+            # Attribute pointers resolve to the object they point into.
+            target_id = getattr(obj, "target_id", None)
+            if obj.id not in self._writers and target_id:
+                reads.append(target_id)
+            else:
+                reads.append(obj.id)
+            # Nested pointers the consumer resolves in place.
+            for arg in pointer_arguments(obj):
+                self._collect(arg, reads)
+        elif isinstance(obj, (list, tuple, set)):
+            for item in obj:
+                self._collect(item, reads)
+        elif isinstance(obj, dict):
+            for item in obj.values():
+                self._collect(item, reads)
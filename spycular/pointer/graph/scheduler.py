@@ -0,0 +1,291 @@
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Dict, List, Set, Tuple, cast
+
+from ...reflection.memo import MemoizedModule, written_ids
+from ...reflection.reflected import ReflectedModule
+from ...serde.capnp.deserialize import _deserialize
+from ...serde.capnp.serialize import _serialize
+from ...store.abstract import AbstractStore
+from ...store.locked import LockedStore
+from ...store.virtual import VirtualStore
+from ..abstract import Pointer
+from ..object_pointer import ObjectActionPointer
+from .abstract import PointerGraph
+from .cost import CostModel
+from .memory import MemoryBudget, MemoryTracker, ReadyNodes, object_nbytes
+from .recorder import is_pure, pointer_arguments
+from .state_enum import PointerState
+
+
+def _timed(fn: Callable, *args: Any) -> Tuple[Any, float]:
+    """Call a function in a pool worker, and time it."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _execute_isolated(module_name: str, payload: bytes) -> bytes:
+    """Execute a pointer in a process pool worker.
+
+    Args:
+        module_name (str): Module the consumer is reflecting.
+        payload (bytes): Serialized pointer, input objects by ID and
+        whether the inputs must be sent back.
+
+    Returns:
+        bytes: Serialized objects saved by the pointer by ID, and replies.
+    """
+    ptr, inputs, return_inputs = _deserialize(payload, from_bytes=True)
+    storage = VirtualStore()
+    for key, obj in inputs.items():
+        storage.save(key, obj)
+    replies: List[Tuple[str, Any]] = []
+    reflected_module = ReflectedModule(importlib.import_module(module_name))
+    reflected_module.execute(
+        ptr,
+        storage,
+        lambda obj_id, obj: replies.append((obj_id, obj)),
+    )
+    outputs = {
+        key: obj
+        for key, obj in storage.get_all().items()
+        if return_inputs or key not in inputs
+    }
+    return _serialize((outputs, replies), to_bytes=True)
+
+
+class GraphScheduler:
+    """Executes PointerGraphs on an executor, running independent
+    branches in parallel.
+
+    Ready nodes are dispatched as soon as their last parent finished,
+    longest remaining path first, with at most `max_in_flight` of them
+    running at once, and no more than the graph width. The remaining paths
+    are estimated from the execution times of previous runs of the same
+    pointer paths.
+
+    With a MemoryBudget, the size of every stored result is tracked, and
+    ready nodes whose result would exceed the budget wait for running nodes
+    to free their inputs, while the nodes that fit run first. Pinned
+    results and the targets of GetPointers are never deleted.
+
+    With a ThreadPoolExecutor, nodes share the consumer storage through a
+    LockedStore. numpy and torch release the GIL in most of their calls.
+
+    With a ProcessPoolExecutor, every node runs on a VirtualStore holding
+    only its inputs, sent to the worker serialized. Its results are saved
+    back to the consumer storage, along with its inputs when the pointer
+    may modify them.
+
+    Attributes:
+        executor (Executor): The pool running the nodes.
+        max_in_flight (int): Largest number of nodes submitted at once.
+        isolated (bool): Whether nodes run in other processes.
+        costs (CostModel): Execution times of the pointer paths.
+        memory_budget (MemoryBudget, optional): Bound on the bytes stored
+        by a running graph.
+        memory_peak (int): Largest number of bytes the last run stored at
+        once, 0 without a memory budget.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        max_in_flight: int | None = None,
+        costs: CostModel | None = None,
+        memory_budget: MemoryBudget | int | None = None,
+    ) -> None:
+        """Initialize a GraphScheduler.
+
+        Args:
+            executor (Executor, optional): Thread or process pool. Defaults
+            to a ThreadPoolExecutor with a thread per CPU.
+            max_in_flight (int, optional): Largest number of nodes
+            submitted at once. Defaults to the number of pool workers.
+            costs (CostModel, optional): Execution times of previous runs.
+            Defaults to an empty CostModel, updated by every run.
+            memory_budget (MemoryBudget | int, optional): Bound on the bytes
+            stored by a running graph, or its limit. Unbounded by default.
+        """
+        workers = os.cpu_count() or 1
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self.isolated = isinstance(self.executor, ProcessPoolExecutor)
+        if not max_in_flight:
+            max_in_flight = int(
+                getattr(self.executor, "_max_workers", workers),
+            )
+        self.max_in_flight = max_in_flight
+        self.costs = costs if costs is not None else CostModel()
+        if isinstance(memory_budget, int):
+            memory_budget = MemoryBudget(memory_budget)
+        self.memory_budget = memory_budget
+        self.memory_peak = 0
+
+    async def run(
+        self,
+        graph: PointerGraph,
+        reflected_module: ReflectedModule,
+        storage: AbstractStore,
+        reply_callback: Callable | None = None,
+    ) -> None:
+        """Execute every node of a graph, each after its parents.
+
+        Args:
+            graph (PointerGraph): The graph.
+            reflected_module (ReflectedModule): Module executing pointers.
+            storage (AbstractStore): Storage of the results.
+            reply_callback (Callable, optional): Callback for replies.
+        """
+        loop = asyncio.get_running_loop()
+        compiled = graph.compiled
+        shared = storage if self.isolated else LockedStore(storage)
+        max_in_flight = max(1, min(self.max_in_flight, compiled.width()))
+        tracker = (
+            MemoryTracker(compiled, self.memory_budget, graph.pinned)
+            if self.memory_budget is not None
+            else None
+        )
+        ready = ReadyNodes(compiled.critical_path(self.costs), tracker)
+        # Only the event loop thread updates the counters, never the pool.
+        pending = compiled.indegree.tolist()
+        for idx, count in enumerate(pending):
+            if count == 0:
+                ready.push(idx)
+        running: Dict[asyncio.Future, int] = {}
+        error: BaseException | None = None
+
+        while ready or running:
+            while ready and error is None:
+                if len(running) >= max_in_flight:
+                    break
+                next_idx = ready.pop(len(running))
+                if next_idx is None:
+                    break
+                idx = next_idx
+                # Nodes of a graph always hold a pointer.
+                pointer = cast(Pointer, compiled.nodes[idx].pointer)
+                if tracker is not None:
+                    tracker.reserve(idx)
+                compiled.nodes[idx].state = PointerState.RUNNING
+                future = self._submit(
+                    loop,
+                    pointer,
+                    reflected_module,
+                    shared,
+                    reply_callback,
+                )
+                running[future] = idx
+            if not running:
+                break
+            done, _ = await asyncio.wait(
+                running,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for future in done:
+                idx = running.pop(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                result, seconds = future.result()
+                node = compiled.nodes[idx]
+                self.costs.update(node.path, seconds)
+                if self.isolated:
+                    self._save_outputs(result, storage, reply_callback)
+                node.state = PointerState.FINISHED
+                deleted = graph.release_parents(idx, shared)
+                if tracker is not None:
+                    tracker.finished(idx, self._stored_nbytes(node.id, shared))
+                    tracker.deleted(deleted)
+                for sucessor in compiled.sucessors(idx):
+                    pending[sucessor] -= 1
+                    if pending[sucessor] == 0:
+                        ready.push(sucessor)
+
+        self.memory_peak = tracker.peak if tracker is not None else 0
+        if error is not None:
+            raise error
+
+    @staticmethod
+    def _stored_nbytes(obj_id: str, storage: AbstractStore) -> int:
+        return object_nbytes(storage.get(obj_id)) if storage.has(obj_id) else 0
+
+    def _submit(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        ptr: Pointer,
+        reflected_module: ReflectedModule,
+        storage: AbstractStore,
+        reply_callback: Callable | None,
+    ) -> asyncio.Future:
+        if not self.isolated:
+            return loop.run_in_executor(
+                self.executor,
+                _timed,
+                reflected_module.execute,
+                ptr,
+                storage,
+                reply_callback,
+            )
+        # Cached results the worker may modify can't be served anymore.
+        if isinstance(reflected_module, MemoizedModule):
+            reflected_module.memo.invalidate(written_ids(ptr))
+        inputs = {
+            key: storage.get(key)
+            for key in self._input_ids(ptr)
+            if storage.has(key)
+        }
+        payload = _serialize((ptr, inputs, not is_pure(ptr)), to_bytes=True)
+        return loop.run_in_executor(
+            self.executor,
+            _timed,
+            _execute_isolated,
+            reflected_module.module_name,
+            payload,
+        )
+
+    @staticmethod
+    def _save_outputs(
+        result: bytes,
+        storage: AbstractStore,
+        reply_callback: Callable | None,
+    ) -> None:
+        outputs, replies = _deserialize(result, from_bytes=True)
+        for key, obj in outputs.items():
+            storage.save(key, obj)
+        if reply_callback is not None:
+            for obj_id, obj in replies:
+                reply_callback(obj_id, obj)
+
+    @staticmethod
+    def _input_ids(ptr: Pointer) -> Set[str]:
+        """IDs of every stored object a pointer may resolve."""
+        ids: Set[str] = set()
+        stack: List[Any] = [ptr]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, Pointer):
+                ids.add(obj.id)
+                target_id = getattr(obj, "target_id", None)
+                if target_id:
+                    ids.add(target_id)
+                # ObjectPointer.__getattr__ makes up any other attribute.
+                if isinstance(obj, ObjectActionPointer) and obj.temp_obj:
+                    stack.append(obj.temp_obj)
+                stack.extend(pointer_arguments(obj))
+            elif isinstance(obj, (list, tuple, set)):
+                stack.extend(obj)
+            elif isinstance(obj, dict):
+                stack.extend(obj.values())
+        return ids
+
+    def shutdown(self) -> None:
+        """Shut the executor down."""
+        self.executor.shutdown()
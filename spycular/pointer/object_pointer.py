@@ -46,6 +46,11 @@ class ObjectPointer(Pointer):
         self.__registered = register
         self.target_id = target_id
         self.class_attribute = class_attribute
+        # Lazy producers keep the results of the pointers recorded while
+        # the client can reach them.
+        recorder = getattr(broker, "recorder", None)
+        if recorder is not None:
+            recorder.track(self)
 
     @property
     def args(self) -> tuple[Any, ...]:
@@ -113,7 +118,7 @@ class ObjectPointer(Pointer):
         self.broker.send(obj_action)
         obj = ObjectPointer(
             pointer_id=obj_action.id,
-            parents=(self,),
+            parents=(obj_action,),
             broker=self.broker,
             register=True,
         )
@@ -318,15 +323,21 @@ class ObjectPointer(Pointer):
         self.__registered = True
         return self
 
-    def retrieve(self) -> None | ObjectPointer:
+    def retrieve(self, delta: bool = False) -> None | ObjectPointer:
         """Retrieve the Object Pointer value from the consumer.
 
+        Args:
+            delta (bool): Only transfer the blocks of an array that changed
+            since its last delta retrieval, see `request_delta`.
+
         Returns:
             None | ObjectPointer: The Object Pointer value.
         """
         if not self.__registered:
             self.register()
 
+        if delta:
+            return self.broker.request_delta(self.id)
         obj = self.broker.request(GetPointer(target_id=self.id))
         return obj
 
@@ -352,6 +363,9 @@ class GetPointer(Pointer):
         pointer_id: str = "",
         page_index: int = 0,
         page_size: int = 0,
+        delta_block_size: int = 0,
+        delta_checksums: bytes = b"",
+        delta_descriptor: str = "",
     ):
         """Initialize a GetPointer.
 
@@ -359,11 +373,19 @@ class GetPointer(Pointer):
             target_id (str): The ID of the target object to get.
             path (str): Path to the object. Optional.
             pointer_id (str): ID for the pointer. Optional.
+            delta_block_size (int): Block size of a delta request, 0 to
+            always reply with the whole object.
+            delta_checksums (bytes): Block checksums of the requester copy,
+            empty if it has none.
+            delta_descriptor (str): Type, dtype and shape of that copy.
         """
         super().__init__(path, pointer_id)
         self.target_id = target_id
         self.page_index = page_index
         self.page_size = page_size
+        self.delta_block_size = delta_block_size
+        self.delta_checksums = delta_checksums
+        self.delta_descriptor = delta_descriptor
 
     def solve(
         self,
@@ -394,7 +416,10 @@ class GetPointer(Pointer):
         """
         if storage and reply_callback:
             if self.target_id and storage.has(self.target_id):
-                reply_callback(self.target_id, storage.get(self.target_id))
+                obj = storage.get(self.target_id)
+                if self.delta_block_size:
+                    obj = self.delta(obj)
+                reply_callback(self.target_id, obj)
             elif self.target_id and not storage.has(self.target_id):
                 pass
             else:
@@ -404,6 +429,19 @@ class GetPointer(Pointer):
                 )
         return None
 
+    def delta(self, obj: Any) -> Any:
+        """Reduce an array to the blocks that changed since the requester
+        copy, see `make_delta`."""
+        # relative
+        from ..serde.capnp.delta import make_delta
+
+        return make_delta(
+            obj,
+            self.delta_checksums,
+            self.delta_descriptor,
+            self.delta_block_size,
+        )
+
 
 @serializable
 class ObjectActionPointer(Pointer):
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from types import ModuleType
+from typing import Any, Callable, Dict, FrozenSet
+
+from ..serde.capnp.recursive import (
+    serializable,
+    shared_type_ids,
+    type_registry,
+)
+from ..store.abstract import AbstractStore
+from .abstract import Pointer
+
+
+@serializable
+class TypeRegistryPointer(Pointer):
+    """A pointer exchanging the serde type registries of a producer and a
+    consumer.
+
+    It's sent once per connection. Afterwards both sides write the types
+    they share as small registry IDs instead of fully qualified names.
+    """
+
+    def __init__(
+        self,
+        registry: Dict[int, str] | None = None,
+        path: str = "",
+        pointer_id: str = "",
+    ):
+        """Initialize a TypeRegistryPointer.
+
+        Args:
+            registry (Dict[int, str], optional): Registry IDs and fully
+            qualified names known by the sender. Defaults to the local
+            registry.
+            path (str): Path to the object. Optional.
+            pointer_id (str): ID for the pointer. Optional.
+        """
+        super().__init__(path, pointer_id)
+        self.registry = type_registry() if registry is None else registry
+
+    def shared_type_ids(self) -> FrozenSet[int]:
+        """Registry IDs the sender and this process map to the same
+        type."""
+        return shared_type_ids(self.registry)
+
+    def solve(
+        self,
+        lib: ModuleType,
+        storage: AbstractStore | None = None,
+        reply_callback: Callable | None = None,
+    ) -> None | Any:
+        """Reply with the part of the sender registry this process shares.
+
+        Args:
+            lib (ModuleType): The module the consumer is reflecting.
+            storage (AbstractStore, optional): Unused.
+            reply_callback (Callable, optional): The callback to reply to
+            the broker. Defaults to None.
+        """
+        if reply_callback:
+            shared = self.shared_type_ids()
+            reply_callback(
+                self.id,
+                {type_id: self.registry[type_id] for type_id in shared},
+            )
+        return None
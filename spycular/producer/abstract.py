@@ -1,7 +1,12 @@
+import threading
 from abc import ABCMeta, abstractmethod
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from ..pointer.abstract import Pointer
+from ..pointer.batch_pointer import PointerBatch
+from ..pointer.graph.abstract import PointerGraph
+from ..pointer.graph.recorder import GraphRecorder
 from ..pointer.object_pointer import GetPointer
 
 
@@ -16,15 +21,25 @@ class AbstractProducer(metaclass=ABCMeta):
     def __init__(self):
         """Initialize the AbstractProducer."""
         super().__init__()
+        # Local copies of the arrays retrieved by delta, by object ID.
+        self.delta_copies: Dict[str, Any] = {}
+        # Pointers queued while batching, sent together by flush().
+        self.batch_queue: List[Pointer] = []
+        self.batch_size = 0
+        self.batch_delay: Optional[float] = None
+        self._batch_lock = threading.RLock()
+        self._batch_timer: Optional[threading.Timer] = None
+        # Pointers recorded in lazy mode, sent as graphs on retrieval.
+        self.recorder: Optional[GraphRecorder] = None
 
     @abstractmethod
-    def send(self, ptr: Pointer) -> None:
+    def send(self, ptr: Pointer | PointerGraph) -> None:
         """Abstract method to send or process data based on a given
         pointer.
 
         Args:
-            ptr (Pointer): Pointer containing information about the data
-            to be processed.
+            ptr (Pointer | PointerGraph): Pointer containing information
+            about the data to be processed, or graph of pointers.
 
         Returns:
             None: This method should not return anything.
@@ -42,3 +57,212 @@ class AbstractProducer(metaclass=ABCMeta):
         Returns:
             Any: The requested data.
         """
+
+    @property
+    def batching(self) -> bool:
+        """Whether sent pointers are queued instead of sent right away."""
+        return self.batch_size > 0
+
+    def start_batching(
+        self,
+        max_size: int = 1024,
+        max_delay: Optional[float] = None,
+    ) -> None:
+        """Queue the pointers sent from now on, and send them as a single
+        PointerBatch message.
+
+        The queue is flushed when it holds `max_size` pointers, `max_delay`
+        seconds after its first pointer was queued, before every request
+        and when batching stops.
+
+        Args:
+            max_size (int): Number of queued pointers that triggers a flush.
+            max_delay (float, optional): Longest time a pointer is kept
+            in the queue, in seconds. None to only flush on size.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.batch_size = max_size
+        self.batch_delay = max_delay
+
+    def stop_batching(self) -> None:
+        """Flush the queued pointers and send the next ones right away."""
+        self.flush()
+        self.batch_size = 0
+        self.batch_delay = None
+
+    @contextmanager
+    def batch(
+        self,
+        max_size: int = 1024,
+        max_delay: Optional[float] = None,
+    ) -> Iterator["AbstractProducer"]:
+        """Context manager batching the pointers sent in its body, see
+        `start_batching`. The queue is flushed on exit.
+
+        Args:
+            max_size (int): Number of queued pointers that triggers a flush.
+            max_delay (float, optional): Longest time a pointer is kept
+            in the queue, in seconds. None to only flush on size.
+        """
+        previous = (self.batch_size, self.batch_delay)
+        self.start_batching(max_size, max_delay)
+        try:
+            yield self
+        finally:
+            self.flush()
+            self.batch_size, self.batch_delay = previous
+
+    @property
+    def lazy(self) -> bool:
+        """Whether sent pointers are recorded until a result is
+        retrieved."""
+        return self.recorder is not None
+
+    def start_recording(self) -> None:
+        """Record the pointers sent from now on instead of sending them.
+
+        Retrieving an object sends the recorded pointers it depends on as
+        a single PointerGraph. The others stay recorded, and are never sent
+        if nothing retrieved depends on them.
+        """
+        if self.recorder is None:
+            self.recorder = GraphRecorder()
+
+    def stop_recording(self) -> None:
+        """Send every recorded pointer and send the next ones right
+        away."""
+        self.execute_recorded()
+        self.recorder = None
+
+    def execute_recorded(
+        self, target_ids: Iterable[str] | None = None
+    ) -> None:
+        """Send the recorded pointers some objects depend on as a single
+        PointerGraph.
+
+        Args:
+            target_ids (Iterable[str], optional): IDs of the objects. Every
+            recorded pointer is sent by default.
+        """
+        if self.recorder is None:
+            return
+        graph = self.recorder.pop_graph(target_ids)
+        if graph is not None:
+            self.send(graph)
+
+    def defer(self, ptr: Any) -> bool:
+        """Record or queue a pointer instead of sending it, depending on
+        the mode of the producer.
+
+        Subclasses call it first thing in `send`. Requests send the
+        recorded pointers they depend on first.
+
+        Args:
+            ptr (Any): Pointer or PointerGraph being sent.
+
+        Returns:
+            bool: False if the pointer must be sent right away.
+        """
+        if self.recorder is not None:
+            if isinstance(ptr, GetPointer):
+                self.execute_recorded([ptr.target_id])
+            elif self.recorder.record(ptr):
+                return True
+        return self.enqueue(ptr)
+
+    def enqueue(self, ptr: Any) -> bool:
+        """Queue a pointer if batching, flushing the queue when full.
+
+        Args:
+            ptr (Any): Pointer or PointerGraph being sent.
+
+        Returns:
+            bool: False if the pointer must be sent right away.
+        """
+        if not self.batching:
+            return False
+        if isinstance(ptr, PointerBatch) or not isinstance(ptr, Pointer):
+            # Graphs aren't batched, the pointers queued before go first.
+            self.flush()
+            return False
+        with self._batch_lock:
+            self.batch_queue.append(ptr)
+            if len(self.batch_queue) >= self.batch_size:
+                self.flush()
+            elif self.batch_delay is not None and self._batch_timer is None:
+                self._batch_timer = threading.Timer(
+                    self.batch_delay,
+                    self.flush,
+                )
+                self._batch_timer.daemon = True
+                self._batch_timer.start()
+        return True
+
+    def flush(self) -> None:
+        """Send the queued pointers as a single PointerBatch."""
+        with self._batch_lock:
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+            if not self.batch_queue:
+                return
+            pointers, self.batch_queue = self.batch_queue, []
+            self.send(PointerBatch(pointers))
+
+    def forget_delta(self, target_id: str | None = None) -> None:
+        """Drop the copy of an array kept by `request_delta`. The next
+        delta retrieval transfers the whole array again.
+
+        Args:
+            target_id (str, optional): ID of the object. Every copy is
+            dropped by default.
+        """
+        if target_id is None:
+            self.delta_copies.clear()
+        else:
+            self.delta_copies.pop(target_id, None)
+
+    def request_delta(self, target_id: str, block_size: int = 2**20) -> Any:
+        """Retrieve an object, transferring only the blocks of an array
+        that changed since its previous delta retrieval.
+
+        The producer keeps a copy of every array retrieved this way, which
+        is patched in place by later retrievals, so the returned object
+        can't be written to: numpy arrays are returned as read-only views
+        of that copy, and tensors, which can't be made read-only, as clones
+        of it. Copies are kept until `forget_delta` drops them.
+
+        Args:
+            target_id (str): ID of the object to be retrieved.
+            block_size (int): Granularity of the changes, in bytes.
+
+        Returns:
+            Any: The object.
+        """
+        # relative
+        from ..serde.capnp.delta import DeltaArray, DeltaCopy, raw_view
+
+        copy = self.delta_copies.get(target_id, None)
+        ptr = GetPointer(target_id=target_id, delta_block_size=block_size)
+        if copy is not None and copy.block_size == block_size:
+            ptr.delta_checksums = copy.checksums
+            ptr.delta_descriptor = copy.descriptor
+
+        reply = self.request(ptr)
+        if isinstance(reply, DeltaArray) and copy is not None:
+            copy.apply(reply)
+        elif raw_view(reply) is not None:
+            copy = DeltaCopy(reply, block_size)
+            self.delta_copies[target_id] = copy
+        else:
+            self.delta_copies.pop(target_id, None)
+            return reply
+
+        obj = copy.obj
+        if hasattr(obj, "setflags"):
+            obj = obj.view()
+            obj.setflags(write=False)
+        elif hasattr(obj, "clone"):
+            obj = obj.clone()
+        return obj
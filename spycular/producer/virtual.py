@@ -1,6 +1,7 @@
 from typing import Any
 
 from ..pointer.abstract import Pointer
+from ..pointer.graph.abstract import PointerGraph
 from ..pointer.object_pointer import GetPointer
 from .abstract import AbstractProducer
 
@@ -24,12 +25,15 @@ class VirtualProducer(AbstractProducer):
         self.message_queue = message_queue
         self.reply_queue = reply_queue
 
-    def send(self, ptr: Pointer) -> None:
+    def send(self, ptr: Pointer | PointerGraph) -> None:
         """Send or enqueue a pointer to the message queue.
 
         Args:
-            ptr (Pointer): The pointer to be sent or enqueued.
+            ptr (Pointer | PointerGraph): The pointer or graph to be sent
+            or enqueued.
         """
+        if self.defer(ptr):
+            return
         self.message_queue.append(ptr)
 
     def request(self, ptr: GetPointer) -> Any:
@@ -44,5 +48,6 @@ class VirtualProducer(AbstractProducer):
         Returns:
             Any: The data retrieved based on the pointer.
         """
-        self.message_queue.append(ptr)
+        self.send(ptr)
+        self.flush()
         return self.reply_queue.get(ptr)
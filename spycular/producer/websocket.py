@@ -1,26 +1,68 @@
+from typing import AbstractSet, Optional
+
 from websockets.sync.client import connect
 
 from ..pointer.abstract import Pointer
+from ..pointer.graph.abstract import PointerGraph
 from ..pointer.object_pointer import GetPointer
-from ..serde.capnp.deserialize import _deserialize
-from ..serde.capnp.serialize import _serialize
+from ..pointer.registry_pointer import TypeRegistryPointer
+from ..serde.capnp.cache import SerdeCache
+from ..serde.capnp.frames import DEFAULT_CHUNK_SIZE, FrameReader, iter_frames
 from .abstract import AbstractProducer
 
 
 class WebSocketsProducer(AbstractProducer):
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        negotiate_types: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache: Optional[SerdeCache] = None,
+    ):
         self.socket = connect(f"ws://{url}")
+        # Payloads are streamed in frames of at most chunk_size bytes.
+        self.chunk_size = chunk_size
+        self.reader = FrameReader()
+        # Arrays sent again are replaced by a reference to the consumer copy.
+        self.cache = cache
+        # Types are sent by name until the consumer registry is known.
+        self.type_ids: Optional[AbstractSet[int]] = frozenset()
         super().__init__()
+        if negotiate_types:
+            self.negotiate_types()
+
+    def negotiate_types(self):
+        registry = self.request(TypeRegistryPointer())
+        self.type_ids = frozenset(registry)
 
-    def send(self, ptr: Pointer):
-        msg = _serialize(ptr, to_bytes=True)
-        self.socket.send(msg)
+    def send(self, ptr: Pointer | PointerGraph):
+        if self.defer(ptr):
+            return
+        # Large array buffers are sent as their own frames, without copies.
+        frames = iter_frames(
+            ptr,
+            chunk_size=self.chunk_size,
+            type_ids=self.type_ids,
+            cache=self.cache,
+        )
+        try:
+            for frame in frames:
+                self.socket.send(frame)
+        finally:
+            # Rolls back the cache puts of a message that wasn't sent.
+            frames.close()
 
     def request(self, ptr: GetPointer):
-        msg = _serialize(ptr, to_bytes=True)
-        self.socket.send(msg)
-        response = self.socket.recv()
-        return _deserialize(response, from_bytes=True)
+        # The request travels in the same message as the queued pointers.
+        self.send(ptr)
+        self.flush()
+        while True:
+            message = self.socket.recv()
+            if isinstance(message, str):
+                raise TypeError("Replies are binary, got a text frame.")
+            if self.reader.feed(message):
+                return self.reader.result()
 
     def close(self):
+        self.flush()
         self.socket.close()
@@ -0,0 +1,374 @@
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from ..pointer.abstract import Pointer
+from ..pointer.batch_pointer import PointerBatch
+from ..pointer.callable_pointer import CallablePointer
+from ..pointer.graph.abstract import PointerGraph
+from ..pointer.graph.memory import object_nbytes
+from ..pointer.graph.recorder import is_pure, pointer_arguments
+from ..pointer.object_pointer import ObjectActionPointer
+from ..store.abstract import AbstractStore
+from .reflected import ReflectedModule
+
+# Argument types hashed by value.
+_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+
+class _Unhashable(Exception):
+    """Raised for arguments without a structural key."""
+
+
+class _Entry:
+    __slots__ = ("result", "owner", "inputs", "nbytes")
+
+    def __init__(self, result: Any, owner: str, inputs: Set[str]) -> None:
+        self.result = result
+        # ID of the stored result, which the cache shares.
+        self.owner = owner
+        self.inputs = inputs
+        self.nbytes = object_nbytes(result)
+
+
+def detach(obj: Any) -> Any:
+    """Copy of a mutable result served to another pointer, so changing
+    one of them in place doesn't change the other."""
+    if isinstance(obj, _SCALARS):
+        return obj
+    clone = getattr(obj, "clone", None)
+    if callable(clone):
+        return clone()
+    copy = getattr(obj, "copy", None)
+    return copy() if callable(copy) else obj
+
+
+def written_ids(ptr: Pointer) -> Set[str]:
+    """IDs of the stored objects a pointer may modify."""
+    if isinstance(ptr, ObjectActionPointer):
+        return set() if is_pure(ptr) else {ptr.target_id}
+    if not isinstance(ptr, CallablePointer):
+        return set()
+    ids: Set[str] = set()
+    stack: List[Any] = pointer_arguments(ptr)
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Pointer):
+            ids.add(obj.id)
+            target_id = getattr(obj, "target_id", None)
+            if target_id:
+                ids.add(target_id)
+            stack.extend(pointer_arguments(obj))
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+    return ids
+
+
+class Memoizer:
+    """Result cache of the calls declared pure, shared by the pointers of
+    every request a consumer executes.
+
+    A call is pure if its result only depends on its arguments and it
+    doesn't modify them. Purity is opt-in, by module path patterns like
+    `numpy.arange` or `numpy.linalg.*`. Calls are keyed on their path and
+    the structure of their arguments, with the IDs of pointer arguments as
+    leaves, so the same call on the same stored objects is only executed
+    once. Other pointers served the result get a copy of it.
+
+    Cached results are dropped when a pointer that may modify one of their
+    arguments, or the result itself, is executed, and in least recently
+    used order past `max_entries` results or `max_bytes` bytes.
+
+    Attributes:
+        max_entries (int): Largest number of cached results.
+        max_bytes (int, optional): Largest size of the cached results.
+        hits (int): Pointers served from the cache.
+        misses (int): Pure pointers executed.
+    """
+
+    def __init__(
+        self,
+        pure: Iterable[str] = (),
+        max_entries: int = 1024,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Initialize a Memoizer.
+
+        Args:
+            pure (Iterable[str]): Patterns of the module paths of pure
+            calls, matched with fnmatch.
+            max_entries (int): Largest number of cached results.
+            max_bytes (int, optional): Largest size of the cached results,
+            unbounded by default.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._patterns: List[str] = list(pure)
+        self._pure_paths: Dict[str, bool] = {}
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        # Keys of the entries reading or owning each ID.
+        self._dependents: Dict[str, Set[Hashable]] = {}
+        # Pointers served a copy of another result, to its owner.
+        self._aliases: Dict[str, str] = {}
+        self._aliased: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def mark_pure(self, *patterns: str) -> None:
+        """Declare more module paths pure."""
+        with self._lock:
+            self._patterns.extend(patterns)
+            self._pure_paths.clear()
+
+    def is_pure(self, path: str) -> bool:
+        """Whether a module path matches a pure pattern."""
+        pure = self._pure_paths.get(path, None)
+        if pure is None:
+            pure = any(fnmatchcase(path, pat) for pat in self._patterns)
+            self._pure_paths[path] = pure
+        return pure
+
+    def key(
+        self,
+        module_name: str,
+        ptr: Pointer,
+        aliases: Dict[str, str] | None = None,
+    ) -> Tuple[Hashable, Set[str]] | None:
+        """Cache key of a pointer and the IDs it reads, None if it can't
+        be memoized.
+
+        Args:
+            module_name (str): Module the consumer is reflecting.
+            ptr (Pointer): The pointer.
+            aliases (Dict[str, str], optional): Owners of the results
+            served to other pointers. The cache ones by default.
+        """
+        if not isinstance(ptr, CallablePointer):
+            return None
+        path = f"{module_name}.{ptr.path}"
+        if not self.is_pure(path):
+            return None
+        aliases = self._aliases if aliases is None else aliases
+        inputs: Set[str] = set()
+        try:
+            args = _structure(ptr.args, aliases, inputs)
+            kwargs = _structure(ptr.kwargs, aliases, inputs)
+        except _Unhashable:
+            return None
+        return (type(ptr).__name__, path, args, kwargs), inputs
+
+    def serve(self, key: Hashable, obj_id: str, storage: AbstractStore):
+        """Save a copy of a cached result for a pointer.
+
+        Returns:
+            bool: False if the key isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self._aliases[obj_id] = entry.owner
+            self._aliased.setdefault(entry.owner, set()).add(obj_id)
+            self.hits += 1
+        storage.save(obj_id, detach(entry.result))
+        return True
+
+    def remember(
+        self,
+        key: Hashable,
+        inputs: Set[str],
+        obj_id: str,
+        storage: AbstractStore,
+    ) -> None:
+        """Cache the stored result of a pointer."""
+        if not storage.has(obj_id):
+            return
+        entry = _Entry(storage.get(obj_id), obj_id, inputs)
+        if self.max_bytes is not None and entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            for dependency in inputs | {obj_id}:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._nbytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, ids: Iterable[str]) -> None:
+        """Drop the results reading or owning objects about to be
+        modified."""
+        with self._lock:
+            for obj_id in ids:
+                for key in list(self._dependents.pop(obj_id, ())):
+                    self._drop(key)
+                # Copies of this object and the object it's a copy of
+                # won't be equal anymore.
+                owner = self._aliases.pop(obj_id, None)
+                if owner is not None:
+                    self._aliased.get(owner, set()).discard(obj_id)
+                for alias in self._aliased.pop(obj_id, ()):
+                    self._aliases.pop(alias, None)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            self._aliases.clear()
+            self._aliased.clear()
+            self._nbytes = 0
+
+    def dedupe(self, graph: PointerGraph, module_name: str) -> int:
+        """Make every pure node of a graph equal to a previous one run
+        after it, so it's served from the cache instead of executed.
+
+        Args:
+            graph (PointerGraph): The graph, modified in place.
+            module_name (str): Module the consumer is reflecting.
+
+        Returns:
+            int: Number of duplicate nodes.
+        """
+        first: Dict[Hashable, str] = {}
+        # Aliases the duplicates will get once served.
+        with self._lock:
+            aliases = dict(self._aliases)
+        duplicates = 0
+        for key_id in graph.topological_order():
+            pointer = graph.graph_map[key_id].pointer
+            if pointer is None:
+                continue
+            keyed = self.key(module_name, pointer, aliases)
+            if keyed is None:
+                continue
+            original = first.setdefault(keyed[0], key_id)
+            if original != key_id:
+                graph.add_dependency(original, key_id)
+                aliases[key_id] = aliases.get(original, original)
+                duplicates += 1
+        return duplicates
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._nbytes -= entry.nbytes
+        for dependency in entry.inputs | {entry.owner}:
+            keys = self._dependents.get(dependency, None)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+
+
+def _structure(obj: Any, aliases: Dict[str, str], inputs: Set[str]):
+    """Hashable structure of an argument, pointers by ID.
+
+    Pointers served a copy of another result are keyed as their owner. The
+    IDs of both are added to `inputs`, writing either drops the key.
+    """
+    if isinstance(obj, _SCALARS):
+        return (type(obj).__name__, obj)
+    if isinstance(obj, Pointer):
+        target_id = getattr(obj, "target_id", None)
+        obj_id = target_id or obj.id
+        canonical = aliases.get(obj_id, obj_id)
+        inputs.update((obj_id, canonical))
+        if target_id:
+            leaf: Tuple[Any, ...] = ("attr", canonical, obj.path)
+        else:
+            leaf = ("ptr", canonical)
+        nested = pointer_arguments(obj)
+        if nested:
+            return leaf + (obj.path, _structure(nested, aliases, inputs))
+        return leaf
+    if isinstance(obj, (list, tuple)):
+        return (
+            type(obj).__name__,
+            tuple(_structure(item, aliases, inputs) for item in obj),
+        )
+    if isinstance(obj, dict):
+        return (
+            "dict",
+            tuple(
+                (key, _structure(value, aliases, inputs))
+                for key, value in sorted(obj.items(), key=_item_order)
+            ),
+        )
+    if isinstance(obj, (set, frozenset)):
+        return (
+            "set",
+            frozenset(_structure(item, aliases, inputs) for item in obj),
+        )
+    if isinstance(obj, slice):
+        return (
+            "slice",
+            _structure((obj.start, obj.stop, obj.step), aliases, inputs),
+        )
+    if obj is Ellipsis:
+        return ("ellipsis",)
+    raise _Unhashable(type(obj))
+
+
+def _item_order(item: Tuple[Any, Any]) -> str:
+    return repr(item[0])
+
+
+class MemoizedModule(ReflectedModule):
+    """A ReflectedModule serving the pure calls of a Memoizer from its
+    cache.
+
+    Attributes:
+        memo (Memoizer): The cache.
+    """
+
+    def __init__(self, lib, memo: Memoizer) -> None:
+        """Initialize a MemoizedModule.
+
+        Args:
+            lib (ModuleType): The original library or module.
+            memo (Memoizer): The cache.
+        """
+        super().__init__(lib)
+        self.memo = memo
+
+    def execute(
+        self,
+        pointer: Pointer,
+        storage: AbstractStore,
+        reply_callback: Callable,
+    ) -> None:
+        """Execute a pointer, or serve its result from the cache.
+
+        Args:
+            pointer (Pointer): The pointer to be executed.
+            storage (AbstractStore): The storage of the results.
+            reply_callback (Callable): Callback for replies.
+        """
+        if isinstance(pointer, PointerBatch):
+            for ptr in pointer.pointers:
+                self.execute(ptr, storage, reply_callback)
+            return
+        keyed = self.memo.key(self.module_name, pointer)
+        if keyed is None:
+            self.memo.invalidate(written_ids(pointer))
+            super().execute(pointer, storage, reply_callback)
+            return
+        key, inputs = keyed
+        if self.memo.serve(key, pointer.id, storage):
+            return
+        super().execute(pointer, storage, reply_callback)
+        self.memo.remember(key, inputs, pointer.id, storage)
@@ -35,6 +35,11 @@ class ReflectedModule:
         """
         self._original_module = lib
 
+    @property
+    def module_name(self) -> str:
+        """Name of the original module, prefixing the module paths."""
+        return self._original_module.__name__
+
     def execute(
         self,
         pointer: Pointer,
@@ -58,11 +63,23 @@ class ReflectedModule:
             pointer,
             CallablePointer,
         ):
+            original = pointer.args, pointer.kwargs
             pointer.args, pointer.kwargs = self._resolve_pointer_args(
                 pointer,
                 storage,
                 reply_callback,
             )
+            try:
+                pointer.solve(
+                    lib=self._original_module,
+                    storage=storage,
+                    reply_callback=reply_callback,
+                )
+            finally:
+                # Pointers kept by a graph must not hold the resolved
+                # objects once the storage deleted them.
+                pointer.args, pointer.kwargs = original
+            return
         pointer.solve(
             lib=self._original_module,
             storage=storage,
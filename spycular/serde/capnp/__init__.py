@@ -4,29 +4,27 @@ Note: Each capnp message format should have unique hex identifier
 (ex: @0xcd0709e35fffa8d8)
 These can be generated in terminal by the command `capnp id`
 after pycapnp installation.
+
+The numpy and torch serde are registered lazily, the first time one of
+their types is (de)serialized, so importing spycular doesn't import them.
 """
 from .primitives import load_primitives_serde
+from .recursive import register_lazy_serde
 
 load_primitives_serde()
 
-try:
-    import numpy  # noqa: F401
-    import pyarrow  # noqa: F401
 
+def _load_numpy_serde() -> None:
     from .numpy import load_numpy_serde
 
     load_numpy_serde()
-except ImportError:
-    pass
-
 
-try:
-    import numpy  # noqa: F401, F811
-    import pyarrow  # noqa: F401, F811
-    import torch  # noqa: F401
 
+def _load_torch_serde() -> None:
     from .torch import load_torch_serde
 
     load_torch_serde()
-except ImportError:
-    pass
+
+
+register_lazy_serde("numpy", _load_numpy_serde)
+register_lazy_serde("torch", _load_torch_serde)
@@ -0,0 +1,228 @@
+"""Serialization cache for arguments sent over and over again.
+
+The producer keeps a `SerdeCache` of the arrays it already sent. The first
+time an array is sent it travels as usual, tagged with its cache key; later
+sends only carry the key. The consumer keeps a `CacheMirror` per connection,
+driven by the producer: every put also lists the keys the producer evicted,
+so both sides always agree on the cached values.
+
+Payloads:
+    ("cache_put", key, evicted keys, serialized value)
+    ("cache_ref", key)
+"""
+# stdlib
+import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, cast
+
+# relative
+from .context import current_context
+from .hashing import new_hasher
+from .serialize import _serialize
+
+CACHE_PUT = "cache_put"
+CACHE_REF = "cache_ref"
+CACHE_TAGS = (CACHE_PUT, CACHE_REF)
+
+
+class SerdeCache:
+    """Producer side LRU of the values held by the consumer.
+
+    Values are keyed by a hash of their content, or by identity when they
+    were declared immutable with `mark_immutable`, which skips hashing.
+    A cache mirrors the state of a single consumer connection, so it must
+    not be shared between producers.
+
+    Example:
+        >>> cache = SerdeCache(max_bytes=2**30)
+        >>> cache.mark_immutable(embeddings)
+        >>> producer = WebSocketsProducer(url, cache=cache)
+
+    Attributes:
+        max_bytes (int): Budget of the cached values, in bytes.
+        min_size (int): Values smaller than this are never cached.
+        by_content (bool): Key values not declared immutable by their
+        content hash. When False only immutable values are cached.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 2**28,
+        min_size: int = 2**16,
+        by_content: bool = True,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.min_size = min_size
+        self.by_content = by_content
+        self.nbytes = 0
+        # key -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        # id(obj) -> (weak reference, key)
+        self._immutable: Dict[int, Tuple[weakref.ref, str]] = {}
+
+    def mark_immutable(self, obj: Any) -> None:
+        """Declare that an object won't be modified anymore, so it's cached
+        by identity instead of by content.
+
+        Args:
+            obj (Any): A numpy array or a torch tensor.
+        """
+        obj_id = id(obj)
+
+        def forget(_: weakref.ref) -> None:
+            self._immutable.pop(obj_id, None)
+
+        self._immutable[obj_id] = (weakref.ref(obj, forget), uuid.uuid4().hex)
+
+    def key_of(
+        self,
+        obj: Any,
+        buffer: Callable[[], Optional[memoryview]],
+        descriptor: str,
+    ) -> Optional[str]:
+        """Return the cache key of a value, None if it can't be cached.
+
+        Args:
+            obj (Any): The value.
+            buffer (Callable): Returns the raw bytes of the value, None if
+            they aren't contiguous.
+            descriptor (str): Type, dtype and shape of the value, hashed with
+            its bytes.
+        """
+        immutable = self._immutable.get(id(obj), None)
+        if immutable is not None and immutable[0]() is obj:
+            return f"id:{immutable[1]}"
+        if not self.by_content:
+            return None
+
+        raw = buffer()
+        if raw is None:
+            return None
+        hasher = new_hasher()
+        hasher.update(descriptor.encode())
+        hasher.update(raw)
+        return f"content:{hasher.hexdigest()}"
+
+    def _insert(self, key: str, size: int) -> List[str]:
+        evicted = []
+        while self._entries and self.nbytes + size > self.max_bytes:
+            old_key, old_size = self._entries.popitem(last=False)
+            self.nbytes -= old_size
+            evicted.append(old_key)
+        self._entries[key] = size
+        self.nbytes += size
+        return evicted
+
+    def serialize(
+        self,
+        obj: Any,
+        nbytes: int,
+        buffer: Callable[[], Optional[memoryview]],
+        descriptor: str,
+        serialize: Callable[[Any], bytes],
+    ) -> Optional[bytes]:
+        """Serialize a value as a cache payload.
+
+        Args:
+            obj (Any): The value.
+            nbytes (int): Size of the value.
+            buffer (Callable): See `key_of`.
+            descriptor (str): See `key_of`.
+            serialize (Callable): Serializer of the value itself.
+
+        Returns:
+            Optional[bytes]: The payload, None if the value isn't cached and
+            must be serialized as usual.
+        """
+        if nbytes < self.min_size or nbytes > self.max_bytes:
+            return None
+        key = self.key_of(obj, buffer, descriptor)
+        if key is None:
+            return None
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            payload: tuple = (CACHE_REF, key)
+        else:
+            evicted = self._insert(key, nbytes)
+            payload = (CACHE_PUT, key, tuple(evicted), serialize(obj))
+        return cast(bytes, _serialize(payload, to_bytes=True))
+
+    @contextmanager
+    def transaction(self) -> Iterator["SerdeCache"]:
+        """Keep the puts and evictions of a message only if it was fully
+        serialized and sent.
+
+        A message that fails, or a frame generator closed before its last
+        frame, never reaches the consumer, whose mirror must not be
+        assumed to hold its values.
+        """
+        entries, nbytes = self._entries.copy(), self.nbytes
+        try:
+            yield self
+        except BaseException:
+            self._entries, self.nbytes = entries, nbytes
+            raise
+
+    def clear(self) -> None:
+        """Forget every cached value. The consumer must forget them too,
+        e.g. by reconnecting."""
+        self._entries.clear()
+        self.nbytes = 0
+
+
+class CacheMirror:
+    """Consumer side copy of the values cached by a producer."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def resolve(
+        self,
+        payload: tuple,
+        deserialize: Callable[[bytes], Any],
+    ) -> Any:
+        """Return the value of a cache payload.
+
+        Args:
+            payload (tuple): A ("cache_put", ...) or ("cache_ref", ...)
+            payload.
+            deserialize (Callable): Deserializer of the value itself.
+
+        Returns:
+            Any: The cached value, shared by every payload referencing it.
+        """
+        if payload[0] == CACHE_PUT:
+            _, key, evicted, blob = payload
+            for evicted_key in evicted:
+                self._values.pop(evicted_key, None)
+            value = deserialize(blob)
+            self._values[key] = value
+            return value
+
+        _, key = payload
+        if key not in self._values:
+            raise ValueError(f"Cache entry {key} is missing.")
+        return self._values[key]
+
+
+def resolve_cached(
+    payload: tuple,
+    deserialize: Callable[[bytes], Any],
+) -> Any:
+    """Return the value of a cache payload using the `cache_mirror` of the
+    current context.
+
+    Without a mirror, put payloads are decoded without being cached.
+    """
+    mirror = current_context().cache_mirror
+    if mirror is None:
+        if payload[0] == CACHE_PUT:
+            return deserialize(payload[3])
+        raise ValueError("Cache reference received without a cache mirror.")
+    return mirror.resolve(payload, deserialize)
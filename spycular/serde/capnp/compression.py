@@ -0,0 +1,126 @@
+"""Compression of array buffers encoded in-band (numpy and torch serde).
+
+The codec is recorded next to the compressed bytes, so the decoder never
+depends on the policy of the encoder.
+"""
+# stdlib
+from typing import Optional, Tuple, Union
+
+# third party
+import pyarrow as pa
+
+# relative
+from .context import current_context
+
+CODECS = ("none", "lz4", "zstd", "snappy")
+
+Buffer = Union[bytes, bytearray, memoryview, pa.Buffer]
+
+
+class CompressionPolicy:
+    """Decides how array buffers are compressed.
+
+    Example:
+        >>> # Loopback: compression costs more than it saves.
+        >>> with serde_context(compression=CompressionPolicy(codec="none")):
+        ...     blob = _serialize(array, to_bytes=True)
+
+    Attributes:
+        codec (str): One of `CODECS`.
+        min_size (int): Buffers smaller than this (in bytes) are never
+        compressed.
+        adaptive (bool): Compress a sample of the buffer first and skip
+        compression when it doesn't shrink below `max_ratio`.
+        sample_size (int): Size of the adaptive sample, in bytes.
+        max_ratio (float): Highest compressed/original size ratio of the
+        sample for compression to be worth it.
+    """
+
+    def __init__(
+        self,
+        codec: str = "snappy",
+        min_size: int = 2**10,
+        adaptive: bool = True,
+        sample_size: int = 2**16,
+        max_ratio: float = 0.9,
+    ) -> None:
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unknown codec: {codec}, expected one of {CODECS}",
+            )
+        if codec != "none" and not pa.Codec.is_available(codec):
+            raise ValueError(f"Codec {codec} isn't available in pyarrow.")
+        self.codec = codec
+        self.min_size = min_size
+        self.adaptive = adaptive
+        self.sample_size = sample_size
+        self.max_ratio = max_ratio
+
+    def choose_codec(self, buffer: Buffer) -> str:
+        """Return the codec to be used for a buffer."""
+        size = memoryview(buffer).nbytes
+        if self.codec == "none" or size < self.min_size:
+            return "none"
+
+        if self.adaptive:
+            sample = memoryview(buffer)[: self.sample_size]
+            compressed = pa.compress(sample, codec=self.codec)
+            if compressed.size > self.max_ratio * sample.nbytes:
+                return "none"
+        return self.codec
+
+    def __repr__(self) -> str:
+        return (
+            f"CompressionPolicy(codec={self.codec!r}, "
+            f"min_size={self.min_size}, adaptive={self.adaptive})"
+        )
+
+
+DEFAULT_COMPRESSION = CompressionPolicy()
+
+
+def current_policy() -> CompressionPolicy:
+    """Return the compression policy of the running serialization call."""
+    policy: Optional[CompressionPolicy] = current_context().compression
+    return DEFAULT_COMPRESSION if policy is None else policy
+
+
+def compress_buffer(buffer: Buffer) -> Tuple[str, bytes]:
+    """Compress a buffer following the current policy.
+
+    Args:
+        buffer (Buffer): Buffer to be compressed.
+
+    Returns:
+        Tuple[str, bytes]: The codec used and the (compressed) bytes.
+    """
+    codec = current_policy().choose_codec(buffer)
+    if codec == "none":
+        return codec, memoryview(buffer).tobytes()
+    return codec, pa.compress(buffer, asbytes=True, codec=codec)
+
+
+def decompress_buffer(
+    codec: str,
+    data: Buffer,
+    decompressed_size: int,
+) -> pa.Buffer:
+    """Revert `compress_buffer`.
+
+    Args:
+        codec (str): Codec recorded by `compress_buffer`.
+        data (Buffer): (Compressed) bytes.
+        decompressed_size (int): Size of the original buffer.
+
+    Returns:
+        pa.Buffer: The original buffer.
+    """
+    if codec == "none":
+        return pa.py_buffer(data)
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec}")
+    return pa.decompress(
+        data,
+        decompressed_size=decompressed_size,
+        codec=codec,
+    )
@@ -0,0 +1,130 @@
+# stdlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AbstractSet, Any, Callable, Iterator, Optional, Sequence
+
+# Arrays smaller than this are cheaper to carry inside the capnp message.
+DEFAULT_OOB_THRESHOLD = 2**16
+
+# Wire format written by `_serialize`, see `flat.py`.
+DEFAULT_WIRE_VERSION = 2
+
+
+class SerdeContext:
+    """Options shared by every serializer taking part in a single
+    (de)serialization call.
+
+    Serializers registered in TYPE_BANK only receive the object (or the
+    bytes) they handle, so options that must reach nested serializers travel
+    through a context variable instead of function arguments.
+
+    Attributes:
+        buffer_callback (Callable, optional): Called with a memoryview for
+        every buffer carried out-of-band. When None, everything is encoded
+        in-band.
+        buffers (Sequence, optional): Out-of-band buffers, indexed in the
+        order they were handed to `buffer_callback`.
+        oob_threshold (int): Minimum buffer size (in bytes) to be carried
+        out-of-band.
+        wire_version (int): Wire format written by `_serialize`, 1 for the
+        nested format and 2 for the flat format.
+        type_ids (AbstractSet[int], optional): Registry IDs the reader is
+        known to share with us, see `type_registry`. Other types are written
+        with their fully qualified name. None uses every local ID.
+        compression (CompressionPolicy, optional): Compression of arrays
+        encoded in-band, None for `DEFAULT_COMPRESSION`.
+        readonly (bool): Deserialize numpy arrays as read-only views over
+        the received buffers, without copies. Torch tensors are always
+        writable.
+        cache (SerdeCache, optional): Values already held by the reader,
+        sent as references, see `cache.py`.
+        cache_mirror (CacheMirror, optional): Values cached by the writer,
+        resolving the references it sends.
+    """
+
+    def __init__(
+        self,
+        buffer_callback: Optional[Callable[[memoryview], Any]] = None,
+        buffers: Optional[Sequence[Any]] = None,
+        oob_threshold: int = DEFAULT_OOB_THRESHOLD,
+        wire_version: int = DEFAULT_WIRE_VERSION,
+        type_ids: Optional[AbstractSet[int]] = None,
+        compression: Optional[Any] = None,
+        readonly: bool = False,
+        cache: Optional[Any] = None,
+        cache_mirror: Optional[Any] = None,
+    ) -> None:
+        self.buffer_callback = buffer_callback
+        self.buffers = buffers
+        self.oob_threshold = oob_threshold
+        self.wire_version = wire_version
+        self.type_ids = type_ids
+        self.compression = compression
+        self.readonly = readonly
+        self.cache = cache
+        self.cache_mirror = cache_mirror
+        self.buffer_count = 0
+
+    def copy(self, **options: Any) -> "SerdeContext":
+        ctx = SerdeContext.__new__(SerdeContext)
+        vars(ctx).update(vars(self))
+        for name, value in options.items():
+            if not hasattr(ctx, name):
+                raise TypeError(f"Unknown serde option: {name}")
+            setattr(ctx, name, value)
+        if "buffer_callback" in options:
+            ctx.buffer_count = 0
+        return ctx
+
+    def add_buffer(self, buffer: memoryview) -> int:
+        """Hand a buffer to the out-of-band channel.
+
+        Args:
+            buffer (memoryview): Raw bytes to be shipped next to the message.
+
+        Returns:
+            int: Index of the buffer in the out-of-band channel.
+        """
+        if self.buffer_callback is None:
+            raise ValueError("No out-of-band channel available.")
+        index = self.buffer_count
+        self.buffer_callback(buffer)
+        self.buffer_count += 1
+        return index
+
+    def get_buffer(self, index: int) -> Any:
+        """Retrieve an out-of-band buffer by its index."""
+        if self.buffers is None or index >= len(self.buffers):
+            raise ValueError(f"Out-of-band buffer {index} is missing.")
+        return self.buffers[index]
+
+
+_DEFAULT_CONTEXT = SerdeContext()
+_CURRENT_CONTEXT: ContextVar[SerdeContext] = ContextVar(
+    "spycular_serde_context",
+    default=_DEFAULT_CONTEXT,
+)
+
+
+def current_context() -> SerdeContext:
+    """Return the options of the running (de)serialization call."""
+    return _CURRENT_CONTEXT.get()
+
+
+@contextmanager
+def serde_context(**options: Any) -> Iterator[SerdeContext]:
+    """Run (de)serialization calls with the given options.
+
+    Options not provided are inherited from the enclosing context.
+
+    Example:
+        >>> buffers = []
+        >>> with serde_context(buffer_callback=buffers.append):
+        ...     blob = _serialize(array, to_bytes=True)
+    """
+    ctx = current_context().copy(**options)
+    token = _CURRENT_CONTEXT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _CURRENT_CONTEXT.reset(token)
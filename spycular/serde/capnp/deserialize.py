@@ -1,20 +1,27 @@
 # stdlib
-from typing import Any
+from typing import Any, Optional, Sequence
 
 # third party
 from capnp.lib.capnp import _DynamicStructBuilder
 
+from .context import serde_context
+
 
 def _deserialize(
     blob: Any,
     from_proto: bool = True,
     from_bytes: bool = False,
+    buffers: Optional[Sequence[Any]] = None,
 ) -> Any:
+    if buffers is not None:
+        with serde_context(buffers=buffers):
+            return _deserialize(blob, from_proto, from_bytes)
+
     # relative
     from .recursive import rs_bytes2object, rs_proto2object
 
     if (
-        (from_bytes and not isinstance(blob, bytes))
+        (from_bytes and not isinstance(blob, (bytes, bytearray, memoryview)))
         or (
             from_proto
             and not from_bytes
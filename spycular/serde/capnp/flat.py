@@ -0,0 +1,213 @@
+"""Flat (v2) wire format.
+
+The nested format serializes every attribute into a standalone capnp message
+and embeds its bytes in the parent message, so deep objects get re-framed
+and re-copied at every nesting level. The flat format writes a single capnp
+message per top-level object: every object becomes a `FlatNode` of
+`RecursiveSerde.nodes` and references its attributes (or its items, for
+builtin containers) by index. Objects referenced more than once are written
+once, except when hashing, where a shared object hashes like its copies.
+Containers of primitives are packed into capnp lists instead.
+
+Types are written as their registry ID (see `type_registry`) when the reader
+shares it, and as their fully qualified name otherwise.
+
+Nested messages are tagged with version 0 (the field didn't exist), so both
+formats are decoded by `rs_proto2object`.
+"""
+# stdlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+
+# third party
+from capnp.lib.capnp import _DynamicStructBuilder
+
+from .primitives.serde import (
+    get_packed_field,
+    get_packed_kv_field,
+    read_packed,
+    write_packed,
+)
+from .recursive import (
+    TYPE_IDS,
+    chunk_bytes,
+    combine_bytes,
+    construct_object,
+    get_plan,
+    get_wire_type_id,
+    recursive_scheme,
+    resolve_plan,
+    writable_type_ids,
+)
+
+NESTED_WIRE_VERSION = 1
+FLAT_WIRE_VERSION = 2
+
+# Builtin containers encoded natively, as nodes referencing their items.
+FLAT_SEQUENCES = (list, tuple, set, frozenset)
+FLAT_MAPPINGS = (dict, OrderedDict)
+
+# (fqn, type id, fields name, children, nonrecursive blob, packed)
+_Node = Tuple[str, int, List, List, Any, Any]
+
+
+class _FlatEncoder:
+    def __init__(self, for_hashing: bool = False) -> None:
+        self.for_hashing = for_hashing
+        self.type_ids = writable_type_ids(for_hashing)
+        # Nodes are None until their children are encoded.
+        self.nodes: List[Optional[_Node]] = []
+        self.memo: Dict[int, int] = {}
+        # Keeps temporary objects alive so their id() can't be reused.
+        self.keep_alive: List[Any] = []
+        # IDs of the objects being hashed, to detect cycles.
+        self.in_progress: Set[int] = set()
+
+    def encode(self, obj: Any) -> int:
+        if self.for_hashing:
+            # Shared objects are hashed like equal copies, every time.
+            if id(obj) in self.in_progress:
+                raise ValueError("Cyclic references can't be hashed.")
+            self.in_progress.add(id(obj))
+            try:
+                return self._encode(obj)
+            finally:
+                self.in_progress.discard(id(obj))
+
+        index = self.memo.get(id(obj), None)
+        if index is not None:
+            return index
+        self.memo[id(obj)] = len(self.nodes)
+        self.keep_alive.append(obj)
+        return self._encode(obj)
+
+    def _encode(self, obj: Any) -> int:
+        plan = get_plan(obj)
+
+        index = len(self.nodes)
+        self.nodes.append(None)
+
+        names: List[str] = []
+        children: List[int] = []
+        blob = None
+        # (packed list, items, mapping keys)
+        packed = None
+        if type(obj) in FLAT_SEQUENCES:
+            packed_field = get_packed_field(obj)
+            if packed_field is not None:
+                packed = (packed_field, obj, None)
+            else:
+                children = [self.encode(item) for item in obj]
+        elif type(obj) in FLAT_MAPPINGS:
+            packed_field = get_packed_kv_field(obj)
+            if packed_field is not None:
+                packed = (packed_field, obj.values(), obj.keys())
+            else:
+                for key, value in obj.items():
+                    children.append(self.encode(key))
+                    children.append(self.encode(value))
+        elif plan.nonrecursive or isinstance(obj, type):
+            if plan.serialize is None:
+                raise Exception(
+                    f"Cant serialize {type(obj)} nonrecursive without "
+                    "serialize.",
+                )
+            blob = plan.serialize(obj)
+        else:
+            for attr_name, field_obj in plan.get_fields(obj, self.for_hashing):
+                names.append(attr_name)
+                children.append(self.encode(field_obj))
+
+        type_id = get_wire_type_id(plan, self.type_ids)
+        self.nodes[index] = (plan.fqn, type_id, names, children, blob, packed)
+        return index
+
+    def to_proto(self) -> _DynamicStructBuilder:
+        msg = recursive_scheme.new_message()
+        msg.version = FLAT_WIRE_VERSION
+        nodes = msg.init("nodes", len(self.nodes))
+        # Every node is filled once the encoding returned.
+        encoded = cast(List[_Node], self.nodes)
+        for node, (fqn, type_id, names, children, blob, packed) in zip(
+            nodes,
+            encoded,
+        ):
+            if type_id:
+                node.typeId = type_id
+            else:
+                node.fullyQualifiedName = fqn
+            if names:
+                node.fieldsName = names
+            if children:
+                node.children = children
+            if blob is not None:
+                chunk_bytes(blob, "nonrecursiveBlob", node)
+            if packed is not None:
+                write_packed(node.init("packed"), *packed)
+        return msg
+
+
+def rs_object2flat_proto(
+    obj: Any,
+    for_hashing: bool = False,
+) -> _DynamicStructBuilder:
+    """Serialize an object and everything it references into a single
+    flat capnp message."""
+    encoder = _FlatEncoder(for_hashing=for_hashing)
+    encoder.encode(obj)
+    return encoder.to_proto()
+
+
+def rs_flat_proto2object(proto: _DynamicStructBuilder) -> Any:
+    """Rebuild an object from a flat capnp message."""
+    nodes = proto.nodes
+    objects: Dict[int, Any] = {}
+    in_progress = set()
+
+    def decode(index: int) -> Any:
+        if index in objects:
+            return objects[index]
+        if index in in_progress:
+            raise ValueError("Cyclic references can't be deserialized.")
+        in_progress.add(index)
+
+        node = nodes[index]
+        type_id = node.typeId
+        plan = TYPE_IDS.get(type_id, None) if type_id else None
+        if plan is None:
+            plan = resolve_plan(type_id, node.fullyQualifiedName)
+        cls = plan.cls
+
+        if cls in FLAT_SEQUENCES:
+            if node.which() == "packed":
+                obj = cls(read_packed(node.packed)[1])
+            else:
+                obj = cls(decode(child) for child in node.children)
+        elif cls in FLAT_MAPPINGS:
+            if node.which() == "packed":
+                obj = cls(zip(*read_packed(node.packed)))
+            else:
+                children = [decode(child) for child in node.children]
+                obj = cls(zip(children[::2], children[1::2]))
+        elif plan.nonrecursive:
+            if plan.deserialize is None:
+                raise Exception(
+                    f"Cant deserialize {plan.fqn} nonrecursive without "
+                    "deserialize.",
+                )
+            obj = plan.deserialize(combine_bytes(node.nonrecursiveBlob))
+        else:
+            kwargs = {}
+            for attr_name, child in zip(node.fieldsName, node.children):
+                attr_value = decode(child)
+                transform = plan.deserialize_transforms.get(attr_name, None)
+                if transform is not None:
+                    attr_value = transform(attr_value)
+                kwargs[attr_name] = attr_value
+            obj = construct_object(cls, kwargs)
+
+        in_progress.discard(index)
+        objects[index] = obj
+        return obj
+
+    return decode(0)
@@ -0,0 +1,362 @@
+"""Multi-frame wire format used by the network producers and consumers.
+
+A message without out-of-band buffers is sent as a single frame holding the
+capnp bytes, exactly like `_serialize(obj, to_bytes=True)`. When large
+buffers are carried out-of-band, or the message exceeds the chunk size, the
+object is sent as:
+
+    header | capnp message | buffer 0 | ... | buffer N-1
+
+The header holds a magic prefix, the number of buffers and every part size.
+Its length is never a multiple of 8, so it can't be mistaken for a capnp
+message. Every part may be split in several frames of at most `chunk_size`
+bytes, so neither side ever holds a frame the size of the payload.
+"""
+# stdlib
+import struct
+from contextlib import nullcontext
+from typing import (
+    IO,
+    AbstractSet,
+    Any,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .cache import CacheMirror, SerdeCache
+from .context import DEFAULT_OOB_THRESHOLD, serde_context
+from .deserialize import _deserialize
+from .serialize import _serialize
+
+FRAME_MAGIC = b"SPYF"
+FRAME_VERSION = 1
+
+# magic, version, number of out-of-band buffers, message size
+_HEADER = struct.Struct("<4sBIQ")
+_SIZE = struct.Struct("<Q")
+
+# Default websockets max_size, frames above it are rejected by the peer.
+DEFAULT_CHUNK_SIZE = 2**20
+
+Frame = Union[bytes, bytearray, memoryview]
+
+
+def _is_header(frame: Frame) -> bool:
+    return (
+        len(frame) >= _HEADER.size
+        and (len(frame) - _HEADER.size) % _SIZE.size == 0
+        and bytes(frame[: len(FRAME_MAGIC)]) == FRAME_MAGIC
+    )
+
+
+def _serialize_parts(
+    obj: object,
+    oob_threshold: int,
+    type_ids: Optional[AbstractSet[int]],
+    cache: Optional[SerdeCache] = None,
+) -> Tuple[bytes, List[memoryview]]:
+    buffers: List[memoryview] = []
+    with serde_context(
+        oob_threshold=oob_threshold,
+        type_ids=type_ids,
+        cache=cache,
+    ):
+        msg = _serialize(obj, to_bytes=True, buffer_callback=buffers.append)
+    return msg, buffers
+
+
+def _header(msg: bytes, buffers: List[memoryview]) -> bytes:
+    header = _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, len(buffers), len(msg))
+    return header + b"".join(_SIZE.pack(buffer.nbytes) for buffer in buffers)
+
+
+def _chunks(part: Frame, chunk_size: Optional[int]) -> Iterator[Frame]:
+    view = memoryview(part).cast("B")
+    if chunk_size is None or view.nbytes <= chunk_size:
+        if view.nbytes:
+            yield part
+        return
+    for start in range(0, view.nbytes, chunk_size):
+        yield view[start : start + chunk_size]  # noqa: E203
+
+
+def iter_frames(
+    obj: object,
+    chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+    oob_threshold: int = DEFAULT_OOB_THRESHOLD,
+    type_ids: Optional[AbstractSet[int]] = None,
+    cache: Optional[SerdeCache] = None,
+) -> Generator[Frame, None, None]:
+    """Serialize an object into frames of at most `chunk_size` bytes.
+
+    Out-of-band buffers are sliced as memoryviews over the original object
+    memory, so the only copy held at once is the frame being sent.
+
+    With a cache, callers must close the generator when sending a frame
+    fails, so the values of the message aren't assumed to be cached.
+
+    Args:
+        obj (object): Object to be serialized.
+        chunk_size (int, optional): Maximum frame size, None to send every
+        part in a single frame.
+        oob_threshold (int): Minimum buffer size to be sent out-of-band.
+        type_ids (AbstractSet[int], optional): Registry IDs shared with the
+        reader, None to use every local ID.
+        cache (SerdeCache, optional): Arrays held by the reader, sent as
+        references. The reader must use a `CacheMirror`.
+
+    Yields:
+        Frame: Frames to be sent in order.
+    """
+    # Cached values count as sent once the caller asked for the frame
+    # after the last one, closing the generator earlier rolls them back.
+    with cache.transaction() if cache is not None else nullcontext():
+        msg, buffers = _serialize_parts(obj, oob_threshold, type_ids, cache)
+        if not buffers and (chunk_size is None or len(msg) <= chunk_size):
+            yield msg
+            return
+
+        yield _header(msg, buffers)
+        for part in [msg, *buffers]:
+            yield from _chunks(part, chunk_size)
+
+
+def serialize_frames(
+    obj: object,
+    oob_threshold: int = DEFAULT_OOB_THRESHOLD,
+    type_ids: Optional[AbstractSet[int]] = None,
+    chunk_size: Optional[int] = None,
+) -> List[Frame]:
+    """Serialize an object into a list of frames, carrying large array
+    buffers out-of-band.
+
+    Buffers are memoryviews over the original object memory, no copy is
+    made.
+
+    Args:
+        obj (object): Object to be serialized.
+        oob_threshold (int): Minimum buffer size to be sent out-of-band.
+        type_ids (AbstractSet[int], optional): Registry IDs shared with the
+        reader, None to use every local ID.
+        chunk_size (int, optional): Maximum frame size, None to send every
+        part in a single frame.
+
+    Returns:
+        List[Frame]: Frames to be sent in order.
+    """
+    return list(iter_frames(obj, chunk_size, oob_threshold, type_ids))
+
+
+class FrameReader:
+    """Incrementally rebuilds objects from frames produced by
+    `iter_frames` or `serialize_frames`.
+
+    Parts received in a single frame are used as they are. Chunked parts
+    are copied once into a preallocated bytearray, so arrays decoded from
+    them are writable without any further copy.
+
+    Args:
+        readonly (bool): Rebuild numpy arrays as read-only views over the
+        received frames, without copies. Suited to consumers that only read
+        their arguments.
+        cache_mirror (CacheMirror, optional): Arrays cached by the writer,
+        required to read frames written with a `SerdeCache`.
+
+    Example:
+        >>> reader = FrameReader()
+        >>> for frame in frames:
+        ...     if reader.feed(frame):
+        ...         obj = reader.result()
+    """
+
+    def __init__(
+        self,
+        readonly: bool = False,
+        cache_mirror: Optional[CacheMirror] = None,
+    ) -> None:
+        self.readonly = readonly
+        self.cache_mirror = cache_mirror
+        self._sizes: Optional[List[int]] = None
+        self._frames: List[Frame] = []
+        # Part being reassembled from chunks, and the bytes received so far.
+        self._partial: Optional[bytearray] = None
+        self._received = 0
+        self._ready = False
+        self._result: Any = None
+
+    def feed(self, frame: Frame) -> bool:
+        """Consume the next frame.
+
+        Args:
+            frame (Frame): Frame received from the wire.
+
+        Returns:
+            bool: True when an object is complete and can be fetched with
+            `result()`.
+        """
+        if self._ready:
+            raise ValueError("Fetch the previous result before feeding.")
+
+        if self._sizes is None:
+            if not _is_header(frame):
+                self._complete(self._deserialize(frame))
+                return True
+            magic, version, count, msg_size = _HEADER.unpack_from(frame)
+            if version != FRAME_VERSION:
+                raise ValueError(f"Unsupported frame version: {version}")
+            self._sizes = [msg_size] + [
+                _SIZE.unpack_from(frame, _HEADER.size + idx * _SIZE.size)[0]
+                for idx in range(count)
+            ]
+            return self._advance()
+
+        expected = self._sizes[len(self._frames)]
+        size = memoryview(frame).nbytes
+        if self._partial is None and size == expected:
+            self._frames.append(frame)
+            return self._advance()
+
+        if self._partial is None:
+            self._partial = bytearray(expected)
+            self._received = 0
+        if self._received + size > expected:
+            raise ValueError(
+                f"Frame size mismatch: expected {expected - self._received}"
+                f" bytes at most, got {size}",
+            )
+        end = self._received + size
+        self._partial[self._received : end] = frame  # noqa: E203
+        self._received += size
+        if self._received == expected:
+            self._frames.append(self._partial)
+            self._partial = None
+        return self._advance()
+
+    def _advance(self) -> bool:
+        sizes = self._sizes or []
+        # Empty parts aren't sent.
+        while len(self._frames) < len(sizes) and sizes[len(self._frames)] == 0:
+            self._frames.append(b"")
+
+        if len(self._frames) < len(sizes):
+            return False
+        msg, *buffers = self._frames
+        self._complete(self._deserialize(msg, buffers))
+        return True
+
+    def _deserialize(
+        self,
+        msg: Frame,
+        buffers: Optional[List[Frame]] = None,
+    ) -> Any:
+        with serde_context(
+            readonly=self.readonly,
+            cache_mirror=self.cache_mirror,
+        ):
+            return _deserialize(msg, from_bytes=True, buffers=buffers)
+
+    def _complete(self, obj: Any) -> None:
+        self._sizes = None
+        self._frames = []
+        self._partial = None
+        self._ready = True
+        self._result = obj
+
+    def result(self) -> Any:
+        """Return the last complete object and reset the reader."""
+        if not self._ready:
+            raise ValueError("No complete object available.")
+        obj = self._result
+        self._ready = False
+        self._result = None
+        return obj
+
+
+def deserialize_frames(frames: List[Frame]) -> Any:
+    """Rebuild an object from the full list of its frames."""
+    reader = FrameReader()
+    for frame in frames:
+        if reader.feed(frame):
+            return reader.result()
+    raise ValueError("Incomplete frame sequence.")
+
+
+def write_stream(
+    obj: object,
+    stream: IO[bytes],
+    chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+    oob_threshold: int = DEFAULT_OOB_THRESHOLD,
+) -> int:
+    """Serialize an object into a binary file-like object.
+
+    The header is always written, so `read_stream` knows where the object
+    ends. Out-of-band buffers are written from the object memory, at most
+    `chunk_size` bytes at a time.
+
+    Args:
+        obj (object): Object to be serialized.
+        stream (IO[bytes]): Writable binary stream, e.g. a file or a socket
+        file.
+        chunk_size (int, optional): Maximum write size, None to write every
+        part at once.
+        oob_threshold (int): Minimum buffer size to be written out-of-band.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    msg, buffers = _serialize_parts(obj, oob_threshold, None)
+    header = _header(msg, buffers)
+    stream.write(header)
+    written = len(header)
+    for part in [msg, *buffers]:
+        for frame in _chunks(part, chunk_size):
+            stream.write(frame)
+            written += memoryview(frame).nbytes
+    return written
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = stream.readinto(view[received:])  # type: ignore
+        if not count:
+            raise ValueError(
+                f"Stream ended after {received} of {size} bytes.",
+            )
+        received += count
+    return buffer
+
+
+def read_stream(stream: IO[bytes], readonly: bool = False) -> Any:
+    """Rebuild an object written by `write_stream`.
+
+    Every part is read straight into its final buffer, so the peak memory
+    is the size of the object.
+
+    Args:
+        stream (IO[bytes]): Readable binary stream.
+        readonly (bool): Rebuild numpy arrays as read-only arrays.
+
+    Returns:
+        Any: The deserialized object.
+    """
+    header = _read_exactly(stream, _HEADER.size)
+    magic, version, count, msg_size = _HEADER.unpack_from(header)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Invalid frame header.")
+    sizes = _read_exactly(stream, count * _SIZE.size)
+
+    reader = FrameReader(readonly=readonly)
+    reader.feed(header + sizes)
+    for size in [msg_size] + [
+        _SIZE.unpack_from(sizes, idx * _SIZE.size)[0] for idx in range(count)
+    ]:
+        if size and reader.feed(_read_exactly(stream, size)):
+            break
+    return reader.result()
@@ -0,0 +1,84 @@
+"""Content hashes of serializable objects.
+
+`content_hash` serializes the object with `for_hashing=True`, so attributes
+listed in `__hash_exclude_attrs__` are ignored, while every large array
+buffer is handed to the hash function in place instead of being encoded
+into the message.
+
+xxhash (XXH3-128) is used when installed, SHA-256 otherwise (hardware
+accelerated on most CPUs, about twice as fast as blake2b). Hashes are
+only comparable between processes using the same hash function.
+"""
+# stdlib
+import functools
+import hashlib
+import struct
+from typing import Any
+
+# relative
+from .context import DEFAULT_WIRE_VERSION, serde_context
+from .serialize import _serialize
+
+try:
+    import xxhash
+
+    def new_hasher() -> Any:
+        """Return a fresh incremental hasher (hashlib interface)."""
+        return xxhash.xxh3_128()
+
+except ImportError:
+
+    def new_hasher() -> Any:
+        """Return a fresh incremental hasher (hashlib interface)."""
+        return hashlib.sha256()
+
+
+_LENGTH = struct.Struct("<Q")
+
+
+@functools.lru_cache(maxsize=None)
+def _no_compression() -> Any:
+    """Compression policy of hashed messages: in-band arrays are hashed
+    as they are, compressing them is wasted work.
+
+    Built on first use, compression needs pyarrow. Without it arrays
+    can't be serialized, so there's nothing to compress and it's None.
+    """
+    try:
+        # relative
+        from .compression import CompressionPolicy
+    except ImportError:
+        return None
+    return CompressionPolicy(codec="none")
+
+
+def content_hash(obj: Any) -> str:
+    """Hash an object by its serialized content.
+
+    Equal objects have equal hashes, as long as their containers are
+    ordered the same way and their arrays share the same memory layout.
+
+    Args:
+        obj (Any): Any serializable object.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    hasher = new_hasher()
+
+    def hash_buffer(buffer: memoryview) -> None:
+        # Sizes keep the boundaries between buffers.
+        hasher.update(_LENGTH.pack(buffer.nbytes))
+        hasher.update(buffer)
+
+    with serde_context(
+        buffer_callback=hash_buffer,
+        oob_threshold=0,
+        wire_version=DEFAULT_WIRE_VERSION,
+        compression=_no_compression(),
+        cache=None,
+    ):
+        msg = _serialize(obj, to_bytes=True, for_hashing=True)
+    hasher.update(_LENGTH.pack(len(msg)))
+    hasher.update(msg)
+    return hasher.hexdigest()
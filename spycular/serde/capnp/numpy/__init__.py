@@ -1,3 +1,6 @@
+# stdlib
+from typing import Callable
+
 # third party
 import numpy as np
 from numpy import frombuffer
@@ -7,99 +10,48 @@ from ..recursive import recursive_serde_register
 # relative
 from .serde import numpy_deserialize, numpy_serialize
 
+SCALAR_TYPES = [
+    np.bool_,
+    np.int8,
+    np.int16,
+    np.int32,
+    np.int64,
+    np.uint8,
+    np.uint16,
+    np.uint32,
+    np.uint64,
+    np.float16,
+    np.float32,
+    np.float64,
+]
 
-def load_numpy_serde():
-    recursive_serde_register(
-        np.ndarray,
-        serialize=numpy_serialize,
-        deserialize=numpy_deserialize,
-    )
-
-    recursive_serde_register(
-        np._globals._NoValueType,
-    )
-    #  serialize=numpy_serialize, deserialize=numpy_deserialize
-
-    recursive_serde_register(
-        np.bool_,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.bool_)[0],
-    )
-
-    recursive_serde_register(
-        np.int8,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.int8)[0],
-    )
-
-    recursive_serde_register(
-        np.int16,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.int16)[0],
-    )
-
-    recursive_serde_register(
-        np.int32,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.int32)[0],
-    )
-
-    recursive_serde_register(
-        np.int64,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.int64)[0],
-    )
-
-    recursive_serde_register(
-        np.uint8,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.uint8)[0],
-    )
 
-    recursive_serde_register(
-        np.uint16,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.uint16)[0],
-    )
+def scalar_serialize(obj: np.generic) -> bytes:
+    return obj.tobytes()
 
-    recursive_serde_register(
-        np.uint32,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.uint32)[0],
-    )
 
-    recursive_serde_register(
-        np.uint64,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.uint64)[0],
-    )
+def scalar_deserializer(scalar_type: type) -> Callable[[bytes], np.generic]:
+    def deserialize(buffer: bytes) -> np.generic:
+        return frombuffer(buffer, dtype=scalar_type)[0]
 
-    recursive_serde_register(
-        np.single,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.single)[0],
-    )
+    return deserialize
 
-    recursive_serde_register(
-        np.double,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.double)[0],
-    )
 
+def load_numpy_serde():
     recursive_serde_register(
-        np.float16,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.float16)[0],
+        np.ndarray,
+        serialize=numpy_serialize,
+        deserialize=numpy_deserialize,
     )
 
     recursive_serde_register(
-        np.float32,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.float32)[0],
+        np._globals._NoValueType,
     )
+    #  serialize=numpy_serialize, deserialize=numpy_deserialize
 
-    recursive_serde_register(
-        np.float64,
-        serialize=lambda x: x.tobytes(),
-        deserialize=lambda buffer: frombuffer(buffer, dtype=np.float64)[0],
-    )
+    for scalar_type in SCALAR_TYPES:
+        recursive_serde_register(
+            scalar_type,
+            serialize=scalar_serialize,
+            deserialize=scalar_deserializer(scalar_type),
+        )
@@ -1,11 +1,14 @@
 # stdlib
-from typing import Union, cast
+from typing import Any, Optional, Tuple, Union, cast
 
 # third party
 import numpy as np
 import pyarrow as pa
 
 # relative
+from ..cache import CACHE_TAGS, resolve_cached
+from ..compression import compress_buffer, decompress_buffer
+from ..context import current_context, serde_context
 from ..deserialize import _deserialize
 from ..serialize import _serialize
 
@@ -31,6 +34,9 @@ SUPPORTED_DTYPES = (
     SUPPORTED_BOOL_TYPES + SUPPORTED_INT_TYPES + SUPPORTED_FLOAT_TYPES
 )
 
+# Encoded as raw memory, Arrow tensors don't support them.
+RAW_DTYPE_KINDS = "cmM"
+
 DTYPE_REFACTOR = {
     np.dtype("uint16"): np.int16,
     np.dtype("uint32"): np.int32,
@@ -44,12 +50,15 @@ def arrow_serialize(obj: np.ndarray) -> bytes:
     sink = pa.BufferOutputStream()
     pa.ipc.write_tensor(apache_arrow, sink)
     buffer = sink.getvalue()
-    numpy_bytes = pa.compress(buffer, asbytes=True, codec="snappy")
+    codec, numpy_bytes = compress_buffer(buffer)
     dtype = original_dtype.name
 
     return cast(
         bytes,
-        _serialize((numpy_bytes, buffer.size, dtype), to_bytes=True),
+        _serialize(
+            ("arrow", numpy_bytes, buffer.size, dtype, codec),
+            to_bytes=True,
+        ),
     )
 
 
@@ -57,23 +66,233 @@ def arrow_deserialize(
     numpy_bytes: bytes,
     decompressed_size: int,
     dtype: str,
+    codec: str = "snappy",
 ) -> np.ndarray:
     original_dtype = np.dtype(dtype)
-    numpy_bytes = pa.decompress(
-        numpy_bytes,
-        decompressed_size=decompressed_size,
-        codec="snappy",
+    # Payloads without codec predate the compression policy.
+    buffer = decompress_buffer(codec, numpy_bytes, decompressed_size)
+
+    # The array views the Arrow buffer, which stays alive as its base.
+    np_array = pa.ipc.read_tensor(buffer).to_numpy()
+    return finalize_array(np_array, original_dtype, buffer.is_mutable)
+
+
+def finalize_array(
+    np_array: np.ndarray,
+    dtype: np.dtype,
+    writable_buffer: bool,
+    readonly: Optional[bool] = None,
+) -> np.ndarray:
+    """Give a decoded array its original dtype and writability, copying
+    it only when that can't be done in place.
+
+    Args:
+        np_array (np.ndarray): Array viewing the decoded buffer.
+        dtype (np.dtype): Original dtype of the array.
+        writable_buffer (bool): Whether the decoded buffer can be written.
+        readonly (bool, optional): Return a read-only view instead of a
+        writable array. Defaults to the `readonly` serde option.
+
+    Returns:
+        np.ndarray: The decoded array.
+    """
+    if readonly is None:
+        readonly = current_context().readonly
+
+    if np_array.dtype != dtype:
+        if np_array.dtype.itemsize == dtype.itemsize:
+            # e.g. bool arrays are stored by Arrow as uint8.
+            np_array = np_array.view(dtype)
+        else:
+            np_array = np_array.astype(dtype)
+            writable_buffer = True
+
+    if readonly:
+        np_array.setflags(write=False)
+    elif writable_buffer:
+        np_array.setflags(write=True)
+    else:
+        np_array = np_array.copy(order="K")
+    return np_array
+
+
+def can_serialize_out_of_band(obj: np.ndarray) -> bool:
+    """Check whether an array can travel in the out-of-band channel.
+
+    Args:
+        obj (np.ndarray): Array to be serialized.
+
+    Returns:
+        bool: True if an out-of-band channel is available and the array is
+        large, contiguous and made of plain (non object) elements.
+    """
+    ctx = current_context()
+    return (
+        ctx.buffer_callback is not None
+        and obj.nbytes >= ctx.oob_threshold
+        and not obj.dtype.hasobject
+        and obj.dtype.fields is None
+        and (obj.flags.c_contiguous or obj.flags.f_contiguous)
+    )
+
+
+def raw_buffer(obj: np.ndarray) -> Optional[memoryview]:
+    """Return the memory of a C or F contiguous array as bytes, None for
+    other arrays and arrays of Python objects."""
+    if obj.dtype.hasobject or not (
+        obj.flags.c_contiguous or obj.flags.f_contiguous
+    ):
+        return None
+    # ravel(order="A") is a view for both C and F contiguous arrays.
+    return obj.ravel(order="A").view(np.uint8).data
+
+
+def oob_serialize(obj: np.ndarray) -> bytes:
+    """Hand the array memory to the out-of-band channel and serialize
+    only its descriptor (dtype, shape, strides and offset).
+
+    Args:
+        obj (np.ndarray): C or F contiguous array.
+
+    Returns:
+        bytes: serialized array descriptor.
+    """
+    index = current_context().add_buffer(cast(memoryview, raw_buffer(obj)))
+    return cast(
+        bytes,
+        _serialize(
+            ("oob", index, obj.dtype.str, obj.shape, obj.strides, 0),
+            to_bytes=True,
+        ),
+    )
+
+
+def oob_deserialize(
+    index: int,
+    dtype: str,
+    shape: tuple,
+    strides: tuple,
+    offset: int,
+    readonly: Optional[bool] = None,
+) -> np.ndarray:
+    """Rebuild an array on top of an out-of-band buffer.
+
+    The buffer is used in place whenever it is writable or a read-only
+    array is requested, otherwise the array is copied once so callers still
+    receive a writable array.
+    """
+    buffer = current_context().get_buffer(index)
+    np_array: np.ndarray = np.ndarray(
+        shape=shape,
+        dtype=np.dtype(dtype),
+        buffer=buffer,
+        offset=offset,
+        strides=strides,
+    )
+    return finalize_array(
+        np_array,
+        np_array.dtype,
+        np_array.flags.writeable,
+        readonly,
+    )
+
+
+# Arrow variable-length types of string arrays, by (binary, 64-bit offsets).
+STRING_ARRAY_TYPES = {
+    (False, False): "string",
+    (False, True): "large_string",
+    (True, False): "binary",
+    (True, True): "large_binary",
+}
+
+
+def string_array_serialize(obj: np.ndarray) -> bytes:
+    """Encode str (`U`), bytes (`S`) and object arrays of str or bytes as
+    Arrow variable-length binary: one contiguous buffer with the bytes of
+    every element and the offsets where each element starts.
+
+    Args:
+        obj (np.ndarray): Array to be serialized.
+
+    Returns:
+        bytes: serialized ("utf8", arrow type, data, data size, codec,
+        offsets, dtype, shape) payload.
+    """
+    flat = obj.ravel()
+    if obj.dtype.kind == "O":
+        binary = bool(flat.size) and isinstance(flat[0], bytes)
+    else:
+        binary = obj.dtype.kind == "S"
+
+    # pyarrow truncates fixed-width numpy strings at the first NUL, numpy
+    # only strips the trailing ones: convert through Python objects.
+    values = flat.astype(object, copy=False)
+    arrow_type = STRING_ARRAY_TYPES[(binary, False)]
+    arrow_array = pa.array(values, type=getattr(pa, arrow_type)())
+    if isinstance(arrow_array, pa.ChunkedArray):
+        # More than 2GB of data, 32-bit offsets overflow.
+        arrow_type = STRING_ARRAY_TYPES[(binary, True)]
+        arrow_array = pa.array(values, type=getattr(pa, arrow_type)())
+
+    if arrow_array.null_count:
+        raise ValueError("String arrays with None elements aren't supported.")
+    _, offsets, data = arrow_array.buffers()
+    data = data if data is not None else pa.py_buffer(b"")
+    codec, data_bytes = compress_buffer(data)
+
+    return cast(
+        bytes,
+        _serialize(
+            (
+                "utf8",
+                arrow_type,
+                data_bytes,
+                data.size,
+                codec,
+                offsets.to_pybytes(),
+                obj.dtype.str,
+                obj.shape,
+            ),
+            to_bytes=True,
+        ),
     )
 
-    result = pa.ipc.read_tensor(numpy_bytes)
-    np_array = result.to_numpy()
-    np_array.setflags(write=True)
-    return np_array.astype(original_dtype)
+
+def string_array_deserialize(
+    arrow_type: str,
+    data: bytes,
+    data_size: int,
+    codec: str,
+    offsets: bytes,
+    dtype: str,
+    shape: tuple,
+) -> np.ndarray:
+    if arrow_type not in STRING_ARRAY_TYPES.values():
+        raise ValueError(f"Invalid string array type: {arrow_type}")
+    original_dtype = np.dtype(dtype)
+    offsets_buffer = pa.py_buffer(offsets)
+    offset_size = 8 if arrow_type.startswith("large") else 4
+
+    arrow_array = pa.Array.from_buffers(
+        getattr(pa, arrow_type)(),
+        offsets_buffer.size // offset_size - 1,
+        [
+            None,
+            offsets_buffer,
+            decompress_buffer(codec, data, data_size),
+        ],
+    )
+    values = arrow_array.to_numpy(zero_copy_only=False)
+    if original_dtype.kind != "O":
+        values = values.astype(original_dtype)
+    return values.reshape(shape)
 
 
 def numpyutf8toarray(input_index: np.ndarray) -> np.ndarray:
     """Decodes utf-8 encoded numpy array to string numpy array.
 
+    Legacy format, written by `arraytonumpyutf8`.
+
     Args:
         input_index (np.ndarray): utf-8 encoded array
 
@@ -100,6 +319,8 @@ def numpyutf8toarray(input_index: np.ndarray) -> np.ndarray:
 def arraytonumpyutf8(string_list: Union[str, np.ndarray]) -> bytes:
     """Encodes string Numpyarray  to utf-8 encoded numpy array.
 
+    Legacy format, superseded by `string_array_serialize`.
+
     Args:
         string_list (np.ndarray): NumpyArray to be encoded
 
@@ -132,15 +353,148 @@ def arraytonumpyutf8(string_list: Union[str, np.ndarray]) -> bytes:
 
 
 def numpy_serialize(obj: np.ndarray) -> bytes:
-    if obj.dtype.type != np.str_:
-        return arrow_serialize(obj)
+    cache = current_context().cache
+    if cache is not None and not obj.dtype.hasobject:
+        payload = cache.serialize(
+            obj,
+            obj.nbytes,
+            lambda: raw_buffer(obj),
+            f"numpy {obj.dtype.str} {obj.shape} {obj.strides}",
+            array_serialize,
+        )
+        if payload is not None:
+            return payload
+    return array_serialize(obj)
+
+
+def compact_array(obj: np.ndarray) -> Tuple[np.ndarray, Optional[tuple]]:
+    """Reduce an array view to the elements it references.
+
+    Broadcast axes (stride 0) are collapsed to a single element, and other
+    non-contiguous views are copied element by element, never the whole
+    base they view.
+
+    Args:
+        obj (np.ndarray): Array to be serialized.
+
+    Returns:
+        Tuple[np.ndarray, Optional[tuple]]: The compact array, and the shape
+        it must be broadcast to (None if no axis was collapsed).
+    """
+    broadcast_shape = None
+    axes = list(zip(obj.shape, obj.strides))
+    if obj.size > 1 and any(dim > 1 and not stride for dim, stride in axes):
+        broadcast_shape = obj.shape
+        obj = obj[
+            tuple(
+                slice(0, 1) if dim > 1 and not stride else slice(None)
+                for dim, stride in axes
+            )
+        ]
+    if not (obj.flags.c_contiguous or obj.flags.f_contiguous):
+        obj = np.ascontiguousarray(obj)
+    return obj, broadcast_shape
+
+
+def raw_serialize(obj: np.ndarray) -> bytes:
+    """Encode the memory of a contiguous array as it is, for dtypes Arrow
+    tensors don't support (complex, datetime and timedelta).
+
+    Returns:
+        bytes: serialized ("raw", data, size, codec, dtype, shape, fortran)
+        payload.
+    """
+    fortran = not obj.flags.c_contiguous
+    buffer = pa.py_buffer(cast(memoryview, raw_buffer(obj)))
+    codec, data = compress_buffer(buffer)
+    return cast(
+        bytes,
+        _serialize(
+            (
+                "raw",
+                data,
+                buffer.size,
+                codec,
+                obj.dtype.str,
+                obj.shape,
+                fortran,
+            ),
+            to_bytes=True,
+        ),
+    )
+
+
+def raw_deserialize(
+    data: bytes,
+    size: int,
+    codec: str,
+    dtype: str,
+    shape: tuple,
+    fortran: bool,
+) -> np.ndarray:
+    buffer = decompress_buffer(codec, data, size)
+    np_array = np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(
+        shape,
+        order="F" if fortran else "C",
+    )
+    return finalize_array(np_array, np_array.dtype, buffer.is_mutable)
+
+
+def broadcast_deserialize(shape: tuple, compact: bytes) -> np.ndarray:
+    # The compact array is only read, the broadcast is copied if needed.
+    with serde_context(readonly=True):
+        np_array = numpy_deserialize(compact)
+    return finalize_array(
+        np.broadcast_to(np_array, shape),
+        np_array.dtype,
+        writable_buffer=False,
+    )
+
+
+def array_serialize(obj: np.ndarray) -> bytes:
+    obj, broadcast_shape = compact_array(obj)
+    if broadcast_shape is not None:
+        return cast(
+            bytes,
+            _serialize(
+                ("broadcast", broadcast_shape, array_serialize(obj)),
+                to_bytes=True,
+            ),
+        )
+
+    if can_serialize_out_of_band(obj):
+        return oob_serialize(obj)
+    elif obj.dtype.kind in "USO":
+        return string_array_serialize(obj)
+    elif obj.dtype.kind in RAW_DTYPE_KINDS:
+        return raw_serialize(obj)
     else:
-        return arraytonumpyutf8(obj)
+        return arrow_serialize(obj)
+
+
+def numpy_deserialize(buf: Union[bytes, memoryview]) -> np.ndarray:
+    return array_from_payload(_deserialize(buf, from_bytes=True))
 
 
-def numpy_deserialize(buf: bytes) -> np.ndarray:
-    deser = _deserialize(buf, from_bytes=True)
-    if isinstance(deser, tuple):
+def array_from_payload(deser: Any) -> np.ndarray:
+    """Rebuild an array from any payload written by `numpy_serialize`."""
+    if isinstance(deser, tuple) and deser[0] == "oob":
+        return oob_deserialize(*deser[1:])
+    elif isinstance(deser, tuple) and deser[0] == "arrow":
+        return arrow_deserialize(*deser[1:])
+    elif isinstance(deser, tuple) and deser[0] == "utf8":
+        return string_array_deserialize(*deser[1:])
+    elif isinstance(deser, tuple) and deser[0] == "raw":
+        return raw_deserialize(*deser[1:])
+    elif isinstance(deser, tuple) and deser[0] == "broadcast":
+        return broadcast_deserialize(*deser[1:])
+    elif isinstance(deser, tuple) and deser[0] in CACHE_TAGS:
+        # Cached arrays are shared, only read-only views can skip the copy.
+        np_array = resolve_cached(deser, numpy_deserialize)
+        if current_context().readonly:
+            return np_array
+        return np_array.copy(order="K")
+    elif isinstance(deser, tuple):
         return arrow_deserialize(*deser)
     elif isinstance(deser, np.ndarray):
         return numpyutf8toarray(deser)
@@ -0,0 +1,163 @@
+# stdlib
+import types
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+# Field layouts of classes serialized through their __dict__ are cached per
+# set of attribute names. Bound the cache for classes with volatile dicts.
+MAX_DYNAMIC_LAYOUTS = 64
+
+# (names, getters, serialize transforms)
+Layout = Tuple[Tuple[str, ...], Tuple[Callable, ...], Tuple[Any, ...]]
+
+
+class SerdePlan:
+    """Precompiled serialization plan of a class registered in
+    TYPE_BANK.
+
+    Everything that only depends on the class (the sorted attributes, their
+    getters and `__serde_overrides__` transforms) is computed once at
+    registration, so the serialize and deserialize loops only iterate the
+    plan.
+
+    Attributes:
+        fqn (str): Fully qualified name of the class.
+        cls (Type): The registered class.
+        nonrecursive (bool): True if the class has its own serializer.
+        serialize (Callable): Serializer of nonrecursive classes.
+        deserialize (Callable): Deserializer of nonrecursive classes.
+        attributes (List[str], optional): Serialized attributes, None to
+        serialize the object `__dict__`.
+        exclude_attrs (List[str]): Attributes never serialized.
+        serde_overrides (Dict): Per attribute (serialize, deserialize)
+        transforms.
+        hash_exclude_attrs (List[str]): Attributes skipped when hashing.
+        attribute_types (List[Type], optional): Annotated attribute types.
+        type_id (int): Registry ID written instead of the fully qualified
+        name, 0 if the class has none.
+    """
+
+    __slots__ = (
+        "fqn",
+        "cls",
+        "nonrecursive",
+        "serialize",
+        "deserialize",
+        "attributes",
+        "exclude_attrs",
+        "serde_overrides",
+        "hash_exclude_attrs",
+        "attribute_types",
+        "type_id",
+        "deserialize_transforms",
+        "_static_layouts",
+        "_dynamic_layouts",
+        "_excluded",
+        "_hash_excluded",
+    )
+
+    def __init__(
+        self,
+        fqn: str,
+        cls: Type,
+        nonrecursive: bool,
+        serialize: Optional[Callable],
+        deserialize: Optional[Callable],
+        attributes: Optional[List[str]],
+        exclude_attrs: List[str],
+        serde_overrides: Dict[str, Tuple[Callable, Callable]],
+        hash_exclude_attrs: List[str],
+        attribute_types: Optional[List[Type]],
+        type_id: int = 0,
+    ) -> None:
+        self.fqn = fqn
+        self.cls = cls
+        self.nonrecursive = nonrecursive
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.attributes = attributes
+        self.exclude_attrs = exclude_attrs
+        self.serde_overrides = serde_overrides
+        self.hash_exclude_attrs = hash_exclude_attrs
+        self.attribute_types = attribute_types
+        self.type_id = type_id
+        self.deserialize_transforms = {
+            name: transforms[1] for name, transforms in serde_overrides.items()
+        }
+        self._excluded = frozenset(exclude_attrs)
+        self._hash_excluded = self._excluded | frozenset(hash_exclude_attrs)
+        self._dynamic_layouts: Dict[Tuple[str, ...], Tuple[Layout, Layout]]
+        self._dynamic_layouts = {}
+        self._static_layouts = (
+            self._compile(attributes) if attributes is not None else None
+        )
+
+    def _compile_layout(self, names: List[str]) -> Layout:
+        names = sorted(names)
+        return (
+            tuple(names),
+            tuple(attrgetter(name) for name in names),
+            tuple(
+                self.serde_overrides[name][0]
+                if name in self.serde_overrides
+                else None
+                for name in names
+            ),
+        )
+
+    def _compile(self, attributes: Any) -> Tuple[Layout, Layout]:
+        attributes = set(attributes)
+        return (
+            self._compile_layout(list(attributes - self._excluded)),
+            self._compile_layout(list(attributes - self._hash_excluded)),
+        )
+
+    def _layouts_of(self, obj: Any) -> Tuple[Layout, Layout]:
+        if self._static_layouts is not None:
+            return self._static_layouts
+
+        key = tuple(obj.__dict__)
+        layouts = self._dynamic_layouts.get(key, None)
+        if layouts is None:
+            if len(self._dynamic_layouts) >= MAX_DYNAMIC_LAYOUTS:
+                self._dynamic_layouts.clear()
+            layouts = self._compile(key)
+            self._dynamic_layouts[key] = layouts
+        return layouts
+
+    def get_fields(
+        self,
+        obj: Any,
+        for_hashing: bool = False,
+    ) -> List[Tuple[str, Any]]:
+        """List the (name, value) pairs to be serialized, sorted by name.
+
+        Args:
+            obj (Any): Object being serialized.
+            for_hashing (bool): Skip the attributes in
+            `__hash_exclude_attrs__`.
+
+        Returns:
+            List[Tuple[str, Any]]: Attribute names and their (transformed)
+            values.
+        """
+        names, getters, transforms = self._layouts_of(obj)[for_hashing]
+
+        fields = []
+        for name, getter, transform in zip(names, getters, transforms):
+            try:
+                field_obj = getter(obj)
+            except AttributeError:
+                raise ValueError(
+                    f"{name} on {type(obj)} does not exist,\
+                    serialization aborted!",
+                )
+
+            if transform is not None:
+                field_obj = transform(field_obj)
+
+            if isinstance(field_obj, types.FunctionType):
+                continue
+
+            fields.append((name, field_obj))
+        return fields
@@ -7,7 +7,7 @@ from types import MappingProxyType
 from typing import GenericAlias  # type: ignore
 from typing import Any, List, Optional, TypeVar, Union, _SpecialForm
 
-from ..recursive import recursive_serde_register
+from ..recursive import as_bytes, recursive_serde_register
 from .serde import (
     deserialize_defaultdict,
     deserialize_generic_alias,
@@ -43,19 +43,19 @@ def load_primitives_serde():
     recursive_serde_register(
         float,
         serialize=lambda x: x.hex().encode(),
-        deserialize=lambda x: float.fromhex(x.decode()),
+        deserialize=lambda x: float.fromhex(str(x, "utf-8")),
     )
 
     recursive_serde_register(
         bytes,
         serialize=lambda x: x,
-        deserialize=lambda x: x,
+        deserialize=as_bytes,
     )
 
     recursive_serde_register(
         str,
         serialize=lambda x: x.encode(),
-        deserialize=lambda x: x.decode(),
+        deserialize=lambda x: str(x, "utf-8"),
     )
 
     recursive_serde_register(
@@ -11,6 +11,7 @@ from typing import (
     List,
     Mapping,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     cast,
@@ -24,6 +25,121 @@ kv_iterable_schema = get_capnp_schema(
     "kv_iterable.capnp",
 ).KVIterable  # type: ignore
 
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+# PackedPrimitives list holding homogeneous items of each primitive type.
+PACKED_LISTS = {
+    int: "ints",
+    float: "floats",
+    bool: "bools",
+    str: "texts",
+    bytes: "blobs",
+}
+# Scalar field holding an item of each primitive type.
+SCALAR_FIELDS = {
+    type(None): "none",
+    int: "int",
+    float: "float",
+    bool: "bool",
+    str: "text",
+    bytes: "blob",
+}
+
+
+def get_packed_field(values: Collection) -> Optional[str]:
+    """Return the PackedPrimitives list able to hold the values.
+
+    Args:
+        values (Collection): Items of a list, tuple, set or of the values of
+        a mapping.
+
+    Returns:
+        Optional[str]: A typed list for homogeneous items, "scalars" for
+        mixed primitives, None if the values can't be packed.
+    """
+    if not values:
+        return None
+
+    kinds = set(map(type, values))
+    if not kinds <= SCALAR_FIELDS.keys():
+        return None
+    if int in kinds and not all(
+        INT64_MIN <= value <= INT64_MAX
+        for value in values
+        if type(value) is int
+    ):
+        return None
+
+    if len(kinds) == 1 and type(None) not in kinds:
+        return PACKED_LISTS[kinds.pop()]
+    return "scalars"
+
+
+def get_packed_kv_field(mapping: Mapping) -> Optional[str]:
+    """Return the PackedPrimitives list able to hold the values of a
+    mapping with str keys, None if it can't be packed."""
+    if not all(type(key) is str for key in mapping):
+        return None
+    return get_packed_field(mapping.values())
+
+
+def write_packed(
+    builder: Any,
+    field: str,
+    values: Collection,
+    keys: Optional[Collection[str]] = None,
+) -> None:
+    """Pack primitives into a PackedPrimitives builder.
+
+    Args:
+        builder (Any): PackedPrimitives builder.
+        field (str): List returned by `get_packed_field`.
+        values (Collection): Items to be packed.
+        keys (Collection[str], optional): Keys of a mapping.
+    """
+    if keys is not None:
+        builder.keys = [key.encode() for key in keys]
+
+    if field == "texts":
+        builder.texts = [value.encode() for value in values]
+    elif field == "scalars":
+        scalars = builder.init("scalars", len(values))
+        for scalar, value in zip(scalars, values):
+            name = SCALAR_FIELDS[type(value)]
+            if name == "text":
+                value = value.encode()
+            setattr(scalar, name, value)
+    else:
+        setattr(builder, field, list(values))
+
+
+def read_scalar(scalar: Any) -> Any:
+    name = scalar.which()
+    if name == "none":
+        return None
+    if name == "text":
+        return str(scalar.text, "utf-8")
+    return getattr(scalar, name)
+
+
+def read_packed(reader: Any) -> Tuple[List[str], List[Any]]:
+    """Unpack the primitives of a PackedPrimitives reader.
+
+    Returns:
+        Tuple[List[str], List[Any]]: The mapping keys (empty for sequences)
+        and the packed items.
+    """
+    keys = [str(key, "utf-8") for key in reader.keys]
+    field = reader.which()
+    if field == "unset":
+        return keys, []
+    if field == "texts":
+        return keys, [str(value, "utf-8") for value in reader.texts]
+    if field == "scalars":
+        return keys, [read_scalar(scalar) for scalar in reader.scalars]
+    return keys, list(getattr(reader, field))
+
 
 def serialize_iterable(iterable: Collection) -> bytes:
     # relative
@@ -31,6 +147,11 @@ def serialize_iterable(iterable: Collection) -> bytes:
 
     message = iterable_schema.new_message()
 
+    packed_field = get_packed_field(iterable)
+    if packed_field is not None:
+        write_packed(message.packed, packed_field, iterable)
+        return message.to_bytes()
+
     message.init("values", len(iterable))
 
     for idx, it in enumerate(iterable):
@@ -55,6 +176,8 @@ def deserialize_iterable(iterable_type: type, blob: bytes) -> Collection:
             values.append(
                 _deserialize(combine_bytes(element), from_bytes=True),
             )
+        if not values:
+            _, values = read_packed(msg.packed)
 
     return iterable_type(values)
 
@@ -65,6 +188,11 @@ def serialize_kv(map: Mapping) -> bytes:
 
     message = kv_iterable_schema.new_message()
 
+    packed_field = get_packed_kv_field(map)
+    if packed_field is not None:
+        write_packed(message.packed, packed_field, map.values(), map.keys())
+        return message.to_bytes()
+
     message.init("keys", len(map))
     message.init("values", len(map))
 
@@ -94,6 +222,9 @@ def get_deserialized_kv_pairs(blob: bytes) -> List[Any]:
                     _deserialize(combine_bytes(value), from_bytes=True),
                 ),
             )
+        if not pairs:
+            keys, values = read_packed(msg.packed)
+            pairs = list(zip(keys, values))
     return pairs
 
 
@@ -151,7 +282,7 @@ def serialize_type(serialized_type: type) -> bytes:
 
 
 def deserialize_type(type_blob: bytes) -> type:
-    deserialized_type = type_blob.decode()
+    deserialized_type = str(type_blob, "utf-8")
     module_parts = deserialized_type.split(".")
     klass = module_parts.pop()
     klass = "None" if klass == "NoneType" else klass
@@ -1,19 +1,45 @@
 # stdlib
 import sys
-import types
+import threading
+import zlib
 from enum import Enum, EnumMeta
-from typing import Any, Callable, List, Optional, Set, Type, Union
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Type,
+    Union,
+)
 
 # third party
 from capnp.lib.capnp import _DynamicStructBuilder
 from pydantic import BaseModel
 
+from .context import current_context
+from .plan import SerdePlan
 from .serialize import _serialize
 
 # syft absolute
 from .util import get_capnp_schema
 
-TYPE_BANK = {}
+TYPE_BANK: Dict[str, SerdePlan] = {}
+# Plans by class, to skip building the fully qualified name of every object.
+_PLANS_BY_TYPE: Dict[type, SerdePlan] = {}
+# Plans by registry ID. IDs shared by several names are never written.
+TYPE_IDS: Dict[int, SerdePlan] = {}
+_AMBIGUOUS_TYPE_IDS: Set[int] = set()
+# Serde of heavy libraries, registered the first time one of their types
+# is seen. Keyed by the top-level module name of the types.
+LAZY_LOADERS: Dict[str, Callable[[], None]] = {}
+# Loaders run one at a time, the ones running aren't run again by the
+# lookups they make.
+_LAZY_LOCK = threading.RLock()
+_LOADING: Set[str] = set()
 
 recursive_scheme = get_capnp_schema(
     "recursive_serde.capnp",
@@ -139,23 +165,203 @@ def recursive_serde_register(
     serde_overrides = getattr(cls, "__serde_overrides__", {})
 
     # without fqn duplicate class names overwrite
-    serde_attributes = (
-        nonrecursive,
-        _serialize,
-        _deserialize,
-        attributes,
-        exclude_attrs,
-        serde_overrides,
-        hash_exclude_attrs,
-        cls,
-        attribute_types,
+    type_id = register_type_id(fqn)
+    plan = SerdePlan(
+        fqn=fqn,
+        cls=cls,
+        nonrecursive=nonrecursive,
+        serialize=_serialize,
+        deserialize=_deserialize,
+        attributes=attributes,
+        exclude_attrs=exclude_attrs,
+        serde_overrides=serde_overrides,
+        hash_exclude_attrs=hash_exclude_attrs,
+        attribute_types=attribute_types,
+        type_id=type_id,
     )
 
-    TYPE_BANK[fqn] = serde_attributes
+    TYPE_BANK[fqn] = plan
+    if type_id:
+        TYPE_IDS[type_id] = plan
 
     if isinstance(alias_fqn, tuple):
         for alias in alias_fqn:
-            TYPE_BANK[alias] = serde_attributes
+            TYPE_BANK[alias] = plan
+
+    _PLANS_BY_TYPE.clear()
+
+
+def register_lazy_serde(module_name: str, loader: Callable[[], None]) -> None:
+    """Defer the registration of a library serde until one of its types
+    is (de)serialized.
+
+    Args:
+        module_name (str): Top-level module of the types, e.g. "numpy".
+        loader (Callable): Imports the library and registers its types.
+    """
+    LAZY_LOADERS[module_name] = loader
+
+
+def load_lazy_serde(fqn: str) -> bool:
+    """Run the pending loader of the library a fully qualified name
+    belongs to. The loader is removed once it succeeded, threads looking
+    up its types meanwhile wait for it.
+
+    Returns:
+        bool: True if types were registered.
+    """
+    module_name = fqn.split(".", 1)[0]
+    with _LAZY_LOCK:
+        loader = LAZY_LOADERS.get(module_name, None)
+        if loader is None or module_name in _LOADING:
+            return False
+        _LOADING.add(module_name)
+        try:
+            loader()
+        except ImportError:
+            # The library is missing, it isn't tried again.
+            LAZY_LOADERS.pop(module_name, None)
+            return False
+        finally:
+            _LOADING.discard(module_name)
+        # Loaders that failed otherwise are run again by the next lookup.
+        LAZY_LOADERS.pop(module_name, None)
+    return True
+
+
+def load_all_serde(imported_only: bool = False) -> None:
+    """Run every pending loader.
+
+    Args:
+        imported_only (bool): Only load the serde of libraries the process
+        already imported.
+    """
+    for module_name in list(LAZY_LOADERS):
+        if not imported_only or module_name in sys.modules:
+            load_lazy_serde(module_name)
+
+
+def get_type_id(fqn: str) -> int:
+    """Compute the registry ID of a fully qualified name.
+
+    IDs are a hash of the name, so every process registering the same types
+    agrees on them without exchanging anything.
+    """
+    return zlib.crc32(fqn.encode("utf-8")) or 1
+
+
+def register_type_id(fqn: str) -> int:
+    """Reserve the registry ID of a fully qualified name.
+
+    Returns:
+        int: The ID, or 0 if it collides with another registered name. In
+        that case both types are written with their fully qualified name.
+    """
+    type_id = get_type_id(fqn)
+    if type_id in _AMBIGUOUS_TYPE_IDS:
+        return 0
+
+    plan = TYPE_IDS.get(type_id, None)
+    if plan is not None and plan.fqn != fqn:
+        _AMBIGUOUS_TYPE_IDS.add(type_id)
+        TYPE_IDS.pop(type_id)
+        plan.type_id = 0
+        return 0
+    return type_id
+
+
+def type_registry() -> Dict[int, str]:
+    """Return the registry IDs known by this process with their fully
+    qualified names, to be exchanged with a peer.
+
+    Libraries that were never imported are left out, their types are
+    written by name.
+    """
+    load_all_serde(imported_only=True)
+    return {type_id: plan.fqn for type_id, plan in TYPE_IDS.items()}
+
+
+def shared_type_ids(registry: Dict[int, str]) -> FrozenSet[int]:
+    """Intersect a peer registry (see `type_registry`) with ours.
+
+    Args:
+        registry (Dict[int, str]): Registry IDs and names of the peer.
+
+    Returns:
+        FrozenSet[int]: IDs both sides map to the same type.
+    """
+    # The peer uses these types, they will be needed.
+    for fqn in set(registry.values()):
+        load_lazy_serde(fqn)
+    return frozenset(
+        type_id
+        for type_id, fqn in registry.items()
+        if type_id in TYPE_IDS and TYPE_IDS[type_id].fqn == fqn
+    )
+
+
+def writable_type_ids(for_hashing: bool = False) -> Optional[AbstractSet[int]]:
+    """Registry IDs that can be written in the running serialization
+    call, None meaning all of them.
+
+    Hashes must not depend on the peer, so they always use names.
+    """
+    if for_hashing:
+        return frozenset()
+    return current_context().type_ids
+
+
+def get_wire_type_id(
+    plan: SerdePlan,
+    type_ids: Optional[AbstractSet[int]],
+) -> int:
+    """Return the registry ID to write for a plan, 0 to write its fully
+    qualified name instead."""
+    if type_ids is None or plan.type_id in type_ids:
+        return plan.type_id
+    return 0
+
+
+def resolve_plan(type_id: int, fqn: str) -> SerdePlan:
+    """Find the plan of a serialized object from its registry ID, or from
+    its fully qualified name when the ID is missing.
+
+    Raises:
+        Exception: If the type isn't registered in TYPE_BANK.
+    """
+    if type_id:
+        plan = TYPE_IDS.get(type_id, None)
+        if plan is not None:
+            return plan
+        if not fqn:
+            # The ID may belong to a library not loaded yet.
+            load_all_serde()
+            if type_id not in TYPE_IDS:
+                raise Exception(f"Type id {type_id} not in TYPE_BANK")
+            return TYPE_IDS[type_id]
+    if fqn not in TYPE_BANK:
+        load_lazy_serde(fqn)
+    if fqn not in TYPE_BANK:
+        raise Exception(f"{fqn} not in TYPE_BANK")
+    return TYPE_BANK[fqn]
+
+
+def get_plan(obj: Any) -> SerdePlan:
+    """Return the serialization plan of an object.
+
+    Raises:
+        Exception: If the object class isn't registered in TYPE_BANK.
+    """
+    plan = _PLANS_BY_TYPE.get(type(obj), None)
+    if plan is None:
+        fqn = get_fully_qualified_name(obj)
+        if fqn not in TYPE_BANK:
+            load_lazy_serde(fqn)
+        if fqn not in TYPE_BANK:
+            raise Exception(f"{fqn} not in TYPE_BANK")
+        plan = TYPE_BANK[fqn]
+        _PLANS_BY_TYPE[type(obj)] = plan
+    return plan
 
 
 def chunk_bytes(
@@ -166,20 +372,52 @@ def chunk_bytes(
     CHUNK_SIZE = int(5.12e8)  # capnp max for a List(Data) field
     list_size = len(data) // CHUNK_SIZE + 1
     data_lst = builder.init(field_name, list_size)
+    # Slicing a memoryview doesn't copy, capnp copies each chunk only once.
+    view = memoryview(data)
     END_INDEX = CHUNK_SIZE
     for idx in range(list_size):
         START_INDEX = idx * CHUNK_SIZE
         END_INDEX = min(START_INDEX + CHUNK_SIZE, len(data))
-        data_lst[idx] = data[START_INDEX:END_INDEX]
+        data_lst[idx] = view[START_INDEX:END_INDEX]
+
+
+def combine_bytes(capnp_list: List[bytes]) -> Union[memoryview, bytearray]:
+    """Reassemble the chunks written by `chunk_bytes`.
 
+    A single chunk is returned as a memoryview over it, without copies.
+    Several chunks are copied exactly once into a preallocated bytearray.
+
+    Args:
+        capnp_list (List[bytes]): Chunks read from a List(Data) field.
 
-def combine_bytes(capnp_list: List[bytes]) -> bytes:
-    # TODO: make sure this doesn't copy, perhaps allocate a fixed size buffer
-    # and move the bytes into it as we go
-    bytes_value = b""
-    for value in capnp_list:
-        bytes_value += value
-    return bytes_value
+    Returns:
+        Union[memoryview, bytearray]: Buffer-protocol object holding the
+        reassembled bytes.
+    """
+    chunks = list(capnp_list)
+    if len(chunks) == 1:
+        return memoryview(chunks[0])
+
+    buffer = bytearray(sum(len(chunk) for chunk in chunks))
+    offset = 0
+    for chunk in chunks:
+        buffer[offset : offset + len(chunk)] = chunk  # noqa: E203
+        offset += len(chunk)
+    return buffer
+
+
+def as_bytes(buffer: Union[bytes, bytearray, memoryview]) -> bytes:
+    """Return a bytes object holding the buffer content, avoiding the
+    copy when the buffer is already backed by a whole bytes object."""
+    if isinstance(buffer, bytes):
+        return buffer
+    if (
+        isinstance(buffer, memoryview)
+        and isinstance(buffer.obj, bytes)
+        and buffer.nbytes == len(buffer.obj)
+    ):
+        return buffer.obj
+    return bytes(buffer)
 
 
 def rs_object2proto(
@@ -191,59 +429,27 @@ def rs_object2proto(
         is_type = True
 
     msg = recursive_scheme.new_message()
-    fqn = get_fully_qualified_name(self)
-    if fqn not in TYPE_BANK:
-        # third party
-        raise Exception(f"{fqn} not in TYPE_BANK")
-
-    msg.fullyQualifiedName = fqn
-    (
-        nonrecursive,
-        serialize,
-        deserialize,
-        attribute_list,
-        exclude_attrs_list,
-        serde_overrides,
-        hash_exclude_attrs,
-        cls,
-        attribute_types,
-    ) = TYPE_BANK[fqn]
+    plan = get_plan(self)
+    type_id = get_wire_type_id(plan, writable_type_ids(for_hashing))
+    if type_id:
+        msg.typeId = type_id
+    else:
+        msg.fullyQualifiedName = plan.fqn
 
-    if nonrecursive or is_type:
-        if serialize is None:
+    if plan.nonrecursive or is_type:
+        if plan.serialize is None:
             raise Exception(
                 f"Cant serialize {type(self)} nonrecursive without serialize.",
             )
-        chunk_bytes(serialize(self), "nonrecursiveBlob", msg)
+        chunk_bytes(plan.serialize(self), "nonrecursiveBlob", msg)
         return msg
 
-    if attribute_list is None:
-        attribute_list = self.__dict__.keys()
-
-    hash_exclude_attrs_set = set(hash_exclude_attrs) if for_hashing else set()
-    new_attribute_list = (
-        set(attribute_list) - set(exclude_attrs_list) - hash_exclude_attrs_set
-    )
-
-    msg.init("fieldsName", len(new_attribute_list))
-    msg.init("fieldsData", len(new_attribute_list))
+    fields = plan.get_fields(self, for_hashing)
 
-    for idx, attr_name in enumerate(sorted(new_attribute_list)):
-        if not hasattr(self, attr_name):
-            raise ValueError(
-                f"{attr_name} on {type(self)} does not exist,\
-                serialization aborted!",
-            )
-
-        field_obj = getattr(self, attr_name)
-        transforms = serde_overrides.get(attr_name, None)
-
-        if transforms is not None:
-            field_obj = transforms[0](field_obj)
-
-        if isinstance(field_obj, types.FunctionType):
-            continue
+    msg.init("fieldsName", len(fields))
+    msg.init("fieldsData", len(fields))
 
+    for idx, (attr_name, field_obj) in enumerate(fields):
         serialized = _serialize(
             field_obj,
             to_bytes=True,
@@ -268,54 +474,21 @@ def rs_bytes2object(blob: bytes) -> Any:
 def rs_proto2object(proto: _DynamicStructBuilder) -> Any:
     # relative
     from .deserialize import _deserialize
+    from .flat import FLAT_WIRE_VERSION, rs_flat_proto2object
 
-    # clean this mess, Tudor
-    module_parts = proto.fullyQualifiedName.split(".")
-    klass = module_parts.pop()
-    class_type: Type = type(None)
-
-    if klass != "NoneType":
-        try:
-            class_type = getattr(
-                sys.modules[".".join(module_parts)],
-                klass,
-            )
-        except Exception:  # nosec
-            try:
-                class_type = getattr(
-                    sys.modules[".".join(module_parts)],
-                    klass,
-                )
-            except Exception:  # nosec
-                pass
-
-    if proto.fullyQualifiedName not in TYPE_BANK:
-        raise Exception(f"{proto.fullyQualifiedName} not in TYPE_BANK")
-
-    (
-        nonrecursive,
-        serialize,
-        deserialize,
-        attribute_list,
-        exclude_attrs_list,
-        serde_overrides,
-        hash_exclude_attrs,
-        cls,
-        attribute_types,
-    ) = TYPE_BANK[proto.fullyQualifiedName]
+    if proto.version == FLAT_WIRE_VERSION:
+        return rs_flat_proto2object(proto)
 
-    if class_type == type(None):  # noqa: E721
-        # yes this looks stupid but it works and the opposite breaks
-        class_type = cls
+    plan = resolve_plan(proto.typeId, proto.fullyQualifiedName)
 
-    if nonrecursive:
-        if deserialize is None:
+    if plan.nonrecursive:
+        if plan.deserialize is None:
             raise Exception(
                 f"Cant serialize {type(proto)} \
             nonrecursive without serialize.",
             )
 
-        return deserialize(combine_bytes(proto.nonrecursiveBlob))
+        return plan.deserialize(combine_bytes(proto.nonrecursiveBlob))
 
     kwargs = {}
 
@@ -323,12 +496,18 @@ def rs_proto2object(proto: _DynamicStructBuilder) -> Any:
         if attr_name != "":
             attr_bytes = combine_bytes(attr_bytes_list)
             attr_value = _deserialize(attr_bytes, from_bytes=True)
-            transforms = serde_overrides.get(attr_name, None)
+            transform = plan.deserialize_transforms.get(attr_name, None)
 
-            if transforms is not None:
-                attr_value = transforms[1](attr_value)
+            if transform is not None:
+                attr_value = transform(attr_value)
             kwargs[attr_name] = attr_value
 
+    return construct_object(plan.cls, kwargs)
+
+
+def construct_object(class_type: Type, kwargs: Dict[str, Any]) -> Any:
+    """Build an instance of a recursive serializable class from its
+    deserialized attributes."""
     if hasattr(class_type, "serde_constructor"):
         return class_type.serde_constructor(kwargs)
 
@@ -1,5 +1,7 @@
 # stdlib
-from typing import Any
+from typing import Any, Callable, Dict, Optional
+
+from .context import current_context, serde_context
 
 
 def _serialize(
@@ -7,11 +9,28 @@ def _serialize(
     to_proto: bool = True,
     to_bytes: bool = False,
     for_hashing: bool = False,
+    buffer_callback: Optional[Callable[[memoryview], Any]] = None,
+    version: Optional[int] = None,
 ) -> Any:
+    options: Dict[str, Any] = {}
+    if buffer_callback is not None:
+        options["buffer_callback"] = buffer_callback
+    if version is not None:
+        options["wire_version"] = version
+
+    if options:
+        # Nested serializers inherit the options through the context.
+        with serde_context(**options):
+            return _serialize(obj, to_proto, to_bytes, for_hashing)
+
     # relative
+    from .flat import FLAT_WIRE_VERSION, rs_object2flat_proto
     from .recursive import rs_object2proto
 
-    proto = rs_object2proto(obj, for_hashing=for_hashing)
+    if current_context().wire_version == FLAT_WIRE_VERSION:
+        proto = rs_object2flat_proto(obj, for_hashing=for_hashing)
+    else:
+        proto = rs_object2proto(obj, for_hashing=for_hashing)
 
     if to_bytes:
         return proto.to_bytes()
@@ -1,56 +1,160 @@
-from typing import cast
+from typing import Union, cast
 
 import numpy as np
-import pyarrow as pa
 import torch as th
 
+from ..cache import CACHE_TAGS, resolve_cached
+from ..context import current_context, serde_context
 from ..deserialize import _deserialize
+from ..numpy.serde import array_from_payload, array_serialize, raw_buffer
 from ..serialize import _serialize
 
+# Dtypes numpy doesn't support, sent as integers of the same size.
+VIEW_DTYPES = {
+    th.bfloat16: th.int16,
+    th.complex32: th.int32,
+}
 
-def tensor_serialize(obj: th.Tensor) -> bytes:
-    return arrow_serialize(obj)
+# Compressed and plain index accessors of compressed sparse layouts.
+COMPRESSED_INDICES = {
+    th.sparse_csr: ("crow_indices", "col_indices"),
+    th.sparse_bsr: ("crow_indices", "col_indices"),
+    th.sparse_csc: ("ccol_indices", "row_indices"),
+    th.sparse_bsc: ("ccol_indices", "row_indices"),
+}
 
 
-def tensor_deserialize(buf: bytes) -> th.Tensor:
-    deser = _deserialize(buf, from_bytes=True)
-    if isinstance(deser, tuple):
-        return arrow_deserialize(*deser)
-    else:
-        raise ValueError(
-            f"Invalid type:{type(deser)} for numpy deserialization",
+def torch_name(obj: Union[th.dtype, th.layout]) -> str:
+    return str(obj).split(".")[-1]
+
+
+def tensor_array(obj: th.Tensor) -> np.ndarray:
+    """Return a numpy view of a strided tensor, without copies for CPU
+    tensors. Dtypes numpy doesn't support are viewed as integers, and
+    conjugate or negative views are materialized."""
+    tensor = obj.detach().cpu().resolve_conj().resolve_neg()
+    view_dtype = VIEW_DTYPES.get(tensor.dtype, None)
+    if view_dtype is not None:
+        tensor = tensor.view(view_dtype)
+    return th.Tensor.numpy(tensor)
+
+
+def tensor_serialize(obj: th.Tensor) -> bytes:
+    cache = current_context().cache
+    if (
+        cache is not None
+        and obj.device.type == "cpu"
+        and obj.layout == th.strided
+    ):
+        payload = cache.serialize(
+            obj,
+            obj.element_size() * obj.nelement(),
+            lambda: raw_buffer(tensor_array(obj)),
+            f"torch {obj.dtype} {tuple(obj.shape)} {obj.stride()}",
+            tensor_serialize_uncached,
         )
+        if payload is not None:
+            return payload
+    return tensor_serialize_uncached(obj)
+
+
+def tensor_serialize_uncached(obj: th.Tensor) -> bytes:
+    if obj.layout == th.sparse_coo:
+        return sparse_coo_serialize(obj)
+    elif obj.layout != th.strided:
+        return sparse_compressed_serialize(obj)
+
+    # Views are reduced to the elements they reference, see compact_array.
+    payload = array_serialize(tensor_array(obj))
+    if obj.dtype not in VIEW_DTYPES and not obj.requires_grad:
+        return payload
+    return cast(
+        bytes,
+        _serialize(
+            ("torch", torch_name(obj.dtype), obj.requires_grad, payload),
+            to_bytes=True,
+        ),
+    )
 
 
-def arrow_serialize(tensor: th.Tensor) -> bytes:
-    obj = th.Tensor.numpy(tensor)
-    original_dtype = obj.dtype
-    apache_arrow = pa.Tensor.from_numpy(obj=obj)
-    sink = pa.BufferOutputStream()
-    pa.ipc.write_tensor(apache_arrow, sink)
-    buffer = sink.getvalue()
-    numpy_bytes = pa.compress(buffer, asbytes=True, codec="snappy")
-    dtype = original_dtype.name
+def sparse_coo_serialize(obj: th.Tensor) -> bytes:
+    """Encode a COO tensor as its non-zero values and their indices."""
+    tensor = obj.detach().coalesce()
     return cast(
         bytes,
-        _serialize((numpy_bytes, buffer.size, dtype), to_bytes=True),
+        _serialize(
+            (
+                "sparse_coo",
+                tensor.indices(),
+                tensor.values(),
+                tuple(tensor.shape),
+                obj.requires_grad,
+            ),
+            to_bytes=True,
+        ),
     )
 
 
-def arrow_deserialize(
-    numpy_bytes: bytes,
-    decompressed_size: int,
-    dtype: str,
-) -> th.Tensor:
-    original_dtype = np.dtype(dtype)
-    numpy_bytes = pa.decompress(
-        numpy_bytes,
-        decompressed_size=decompressed_size,
-        codec="snappy",
+def sparse_compressed_serialize(obj: th.Tensor) -> bytes:
+    """Encode a CSR, CSC, BSR or BSC tensor as its values and their
+    compressed and plain indices."""
+    if obj.layout not in COMPRESSED_INDICES:
+        raise ValueError(f"Unsupported tensor layout: {obj.layout}")
+    compressed, plain = COMPRESSED_INDICES[obj.layout]
+    tensor = obj.detach()
+    return cast(
+        bytes,
+        _serialize(
+            (
+                "sparse_compressed",
+                torch_name(obj.layout),
+                getattr(tensor, compressed)(),
+                getattr(tensor, plain)(),
+                tensor.values(),
+                tuple(tensor.shape),
+                obj.requires_grad,
+            ),
+            to_bytes=True,
+        ),
     )
 
-    result = pa.ipc.read_tensor(numpy_bytes)
-    np_array = result.to_numpy()
-    np_array.setflags(write=True)
-    array = np_array.astype(original_dtype)
-    return th.from_numpy(array)
+
+def tensor_deserialize(buf: Union[bytes, memoryview]) -> th.Tensor:
+    deser = _deserialize(buf, from_bytes=True)
+    if isinstance(deser, tuple) and deser[0] == "torch":
+        _, dtype, requires_grad, payload = deser
+        tensor = tensor_deserialize(payload)
+        if torch_name(tensor.dtype) != dtype:
+            tensor = tensor.view(getattr(th, dtype))
+        return tensor.requires_grad_(requires_grad)
+    elif isinstance(deser, tuple) and deser[0] == "sparse_coo":
+        _, indices, values, size, requires_grad = deser
+        return th.sparse_coo_tensor(
+            indices,
+            values,
+            size,
+            is_coalesced=True,
+            requires_grad=requires_grad,
+        )
+    elif isinstance(deser, tuple) and deser[0] == "sparse_compressed":
+        _, layout, compressed, plain, values, size, requires_grad = deser
+        return th.sparse_compressed_tensor(
+            compressed,
+            plain,
+            values,
+            size,
+            layout=getattr(th, layout),
+            requires_grad=requires_grad,
+        )
+    elif isinstance(deser, tuple) and deser[0] in CACHE_TAGS:
+        # Cached tensors are shared, callers receive a copy.
+        return resolve_cached(deser, tensor_deserialize).clone()
+    elif isinstance(deser, tuple):
+        # Tensors can't be read-only, arrays are copied only if their
+        # buffer can't be written.
+        with serde_context(readonly=False):
+            return th.from_numpy(array_from_payload(deser))
+    else:
+        raise ValueError(
+            f"Invalid type:{type(deser)} for numpy deserialization",
+        )
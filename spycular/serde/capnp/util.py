@@ -1,4 +1,5 @@
 # stdlib
+import functools
 import os
 from pathlib import Path
 
@@ -6,7 +7,9 @@ from pathlib import Path
 import capnp
 
 
+@functools.lru_cache(maxsize=None)
 def get_capnp_schema(schema_file: str) -> type:
+    """Compile a schema of the `schemas` folder, once per process."""
     here = os.path.dirname(__file__)
     root_dir = Path(here) / "schemas"
     capnp_path = os.path.abspath(root_dir / schema_file)
@@ -0,0 +1,385 @@
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Literal, Tuple
+
+from .abstract import AbstractStore
+
+# How each object is kept.
+_FILE = "file"  # numpy array in a .npy file, memory-mapped by get
+_TENSOR = "tensor"  # torch tensor in a .npy file, memory-mapped by get
+_SCALAR = "scalar"  # numpy scalar in the database, .npy format
+_SERDE = "serde"  # serialized in the database
+_MEMORY = "memory"  # not serializable, kept in memory for the session
+
+# Modes of the arrays returned by `get`, see `numpy.load`.
+MmapMode = Literal["r+", "r", "w+", "c"]
+
+
+class _StoredObjects(Mapping):
+    """Read-only mapping view of a DiskStore, in insertion order."""
+
+    def __init__(self, store: "DiskStore") -> None:
+        self._store = store
+
+    def __getitem__(self, obj_id: str) -> Any:
+        if not self._store.has(obj_id):
+            raise KeyError(obj_id)
+        return self._store.get(obj_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids())
+
+    def __len__(self) -> int:
+        return self._store.count()
+
+
+class DiskStore(AbstractStore):
+    """A concrete implementation of the AbstractStore persisting objects
+    in a directory, so it survives restarts and its arrays don't have to
+    fit in memory.
+
+    Arrays and CPU tensors of at least `mmap_threshold` bytes are saved in
+    .npy files, and `get` returns arrays memory-mapped on them: their pages
+    are read when used, and the kernel drops them under memory pressure.
+    With the default `r+` mode, changes made in place are written to the
+    file. Other objects are serialized in an sqlite database, and the
+    `cache_size` last saved or read are kept in memory: changes made in
+    place to them are seen by the next `get`, and written by `flush` or
+    when they leave the cache. Objects that can't be serialized are only
+    kept in memory, and lost on restart.
+
+    Attributes:
+        store (Mapping): Read-only view of the stored objects.
+        path (str): Directory of the database and the array files.
+        mmap_mode (str): Mode of the arrays returned by `get`, see
+        `numpy.load`. None reads them in memory.
+        mmap_threshold (int): Size of the smallest array saved in a file,
+        in bytes.
+        cache_size (int): Number of serialized objects kept in memory.
+
+    Methods:
+        get: Retrieve an object by its ID from the store.
+        save: Store an object with a given ID.
+        delete: Remove an object using its ID from the store.
+        has: Check if an object with a given ID exists in the store.
+        flush: Write the objects changed in place to the database.
+        close: Flush and close the database.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mmap_mode: MmapMode | None = "r+",
+        mmap_threshold: int = 1 << 16,
+        cache_size: int = 1024,
+    ) -> None:
+        """Initialize the DiskStore, with the objects already saved in
+        `path`.
+
+        Args:
+            path (str): Directory of the store, created if missing.
+            mmap_mode (str, optional): Mode of the arrays returned by
+            `get`, see `numpy.load`. None reads them in memory.
+            mmap_threshold (int): Size of the smallest array saved in a
+            file, in bytes. Smaller ones are serialized in the database.
+            cache_size (int): Number of serialized objects kept in memory,
+            least recently used first out.
+        """
+        super().__init__(store=_StoredObjects(self))
+        self.path = os.fspath(path)
+        self.mmap_mode = mmap_mode
+        self.mmap_threshold = mmap_threshold
+        self.cache_size = cache_size
+        self.lock = threading.RLock()
+        self._arrays = os.path.join(self.path, "arrays")
+        os.makedirs(self._arrays, exist_ok=True)
+        for name in os.listdir(self._arrays):
+            # Files of a save interrupted before it completed.
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self._arrays, name))
+
+        self._db = sqlite3.connect(
+            os.path.join(self.path, "store.sqlite"),
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects "
+            "(id TEXT PRIMARY KEY, kind TEXT NOT NULL, data BLOB)",
+        )
+        self._db.execute("DELETE FROM objects WHERE kind = ?", (_MEMORY,))
+        # Serialized objects by ID, least recently used first.
+        self._objects: "OrderedDict[str, Any]" = OrderedDict()
+        # Objects that can't be serialized, by ID.
+        self._memory: Dict[str, Any] = {}
+
+    def get(self, obj_id: str) -> Any:
+        """Retrieve an object from the store by its ID.
+
+        Args:
+            obj_id: The unique identifier for the object.
+
+        Returns:
+            The object associated with the provided ID or None. Arrays
+            saved in files are memory-mapped.
+        """
+        with self.lock:
+            if obj_id in self._memory:
+                return self._memory[obj_id]
+            if obj_id in self._objects:
+                self._objects.move_to_end(obj_id)
+                return self._objects[obj_id]
+            row = self._db.execute(
+                "SELECT kind, data FROM objects WHERE id = ?",
+                (obj_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            kind, data = row
+            if kind in (_FILE, _TENSOR):
+                return self._load_array(obj_id, kind)
+            obj = self._decode(kind, data)
+            self._cache(obj_id, obj)
+            return obj
+
+    def get_all(self, page_index: int = 0, page_size: int = 0) -> Any:
+        """Retrieve the entire store.
+
+        Args:
+            page_index: The index of the page to retrieve.
+            page_size: The number of items on each page.
+        """
+        with self.lock:
+            if not page_size:
+                return {obj_id: self.get(obj_id) for obj_id in self.ids()}
+            if not AbstractStore.validate_pagination(
+                page_index=page_index,
+                page_size=page_size,
+                store_size=self.count(),
+            ):
+                return {}
+            return {
+                obj_id: self.get(obj_id)
+                for obj_id in self.ids(page_index * page_size, page_size)
+            }
+
+    def save(self, obj_id: str, obj: Any) -> None:
+        """Store an object in the store with a given ID.
+
+        Args:
+            obj_id: The unique identifier for the object.
+            obj: The actual object to store.
+        """
+        kind, data, array = self._encode(obj)
+        with self.lock:
+            if array is not None:
+                self._write_array(obj_id, array)
+            elif self._kind(obj_id) in (_FILE, _TENSOR):
+                os.remove(self._array_path(obj_id))
+            # Updating the row keeps the position of the ID.
+            self._db.execute(
+                "INSERT INTO objects (id, kind, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "kind = excluded.kind, data = excluded.data",
+                (obj_id, kind, data),
+            )
+            self._objects.pop(obj_id, None)
+            self._memory.pop(obj_id, None)
+            if kind == _MEMORY:
+                self._memory[obj_id] = obj
+            elif array is None:
+                self._cache(obj_id, obj)
+
+    def delete(self, obj_id: str) -> None:
+        """Remove an object from the store using its ID.
+
+        Args:
+            obj_id: The unique identifier for the object.
+
+        Raises:
+            KeyError: If the object with the provided ID does not exist.
+        """
+        with self.lock:
+            kind = self._kind(obj_id)
+            if kind is None:
+                raise KeyError(obj_id)
+            self._db.execute("DELETE FROM objects WHERE id = ?", (obj_id,))
+            self._objects.pop(obj_id, None)
+            self._memory.pop(obj_id, None)
+            # Arrays already mapped stay readable until they're released.
+            if kind in (_FILE, _TENSOR):
+                os.remove(self._array_path(obj_id))
+
+    def has(self, obj_id: str) -> bool:
+        """Check if the store contains an object with the provided ID.
+
+        Args:
+            obj_id: The unique identifier for the object.
+
+        Returns:
+            bool: True if the object exists in the store, otherwise False.
+        """
+        with self.lock:
+            return (
+                obj_id in self._objects
+                or obj_id in self._memory
+                or self._kind(obj_id) is not None
+            )
+
+    def ids(self, offset: int = 0, limit: int = -1) -> List[str]:
+        """IDs of the stored objects, in insertion order.
+
+        Args:
+            offset (int): Number of IDs skipped.
+            limit (int): Largest number of IDs returned, -1 for all.
+        """
+        with self.lock:
+            rows = self._db.execute(
+                "SELECT id FROM objects ORDER BY rowid LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        """Number of stored objects."""
+        with self.lock:
+            row = self._db.execute("SELECT COUNT(*) FROM objects").fetchone()
+        return row[0]
+
+    def flush(self) -> None:
+        """Write the serialized objects in memory again, with the changes
+        made to them in place since they were saved."""
+        with self.lock:
+            for obj_id, obj in list(self._objects.items()):
+                self._write_back(obj_id, obj)
+
+    def close(self) -> None:
+        """Flush the objects and close the database."""
+        with self.lock:
+            self.flush()
+            self._db.close()
+
+    def _cache(self, obj_id: str, obj: Any) -> None:
+        """Keep a serialized object in memory, writing the least recently
+        used ones back to the database past `cache_size`."""
+        if self.cache_size <= 0:
+            return
+        self._objects[obj_id] = obj
+        while len(self._objects) > self.cache_size:
+            self._write_back(*self._objects.popitem(last=False))
+
+    def _write_back(self, obj_id: str, obj: Any) -> None:
+        kind, data, array = self._encode(obj)
+        if kind == _MEMORY:
+            # Changed in place into an object that can't be serialized.
+            self._objects.pop(obj_id, None)
+            self._memory[obj_id] = obj
+        elif array is not None:
+            return
+        self._db.execute(
+            "UPDATE objects SET kind = ?, data = ? WHERE id = ?",
+            (kind, data, obj_id),
+        )
+
+    def _kind(self, obj_id: str) -> str | None:
+        row = self._db.execute(
+            "SELECT kind FROM objects WHERE id = ?",
+            (obj_id,),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _encode(self, obj: Any) -> Tuple[str, bytes | None, Any]:
+        """How an object is kept: (kind, database data, array to save in a
+        file)."""
+        numpy = sys.modules.get("numpy", None)
+        torch = sys.modules.get("torch", None)
+        array, kind = None, _FILE
+        if numpy is not None and isinstance(obj, numpy.ndarray):
+            array = obj if not obj.dtype.hasobject else None
+        elif (
+            torch is not None
+            and isinstance(obj, torch.Tensor)
+            and obj.device.type == "cpu"
+            and obj.layout == torch.strided
+            and not obj.requires_grad
+        ):
+            kind = _TENSOR
+            try:
+                # Conjugate and negative views are materialized first.
+                array = obj.resolve_conj().resolve_neg().numpy()
+            except TypeError:
+                # Types numpy doesn't have, like bfloat16.
+                array = None
+        if (
+            array is not None
+            and array.size
+            and array.nbytes >= self.mmap_threshold
+        ):
+            return kind, None, array
+
+        if numpy is not None and isinstance(obj, numpy.generic):
+            if not obj.dtype.hasobject:
+                buffer = io.BytesIO()
+                numpy.save(buffer, obj, allow_pickle=False)
+                return _SCALAR, buffer.getvalue(), None
+
+        # relative
+        from ..serde.capnp.serialize import _serialize
+
+        try:
+            return _SERDE, _serialize(obj, to_bytes=True), None
+        except Exception:
+            return _MEMORY, None, None
+
+    @staticmethod
+    def _decode(kind: str, data: bytes) -> Any:
+        if kind == _SCALAR:
+            import numpy
+
+            return numpy.load(io.BytesIO(data), allow_pickle=False)[()]
+
+        # relative
+        from ..serde.capnp.deserialize import _deserialize
+
+        return _deserialize(data, from_bytes=True)
+
+    def _array_path(self, obj_id: str) -> str:
+        # IDs may hold any character, file names don't.
+        name = hashlib.sha1(obj_id.encode("utf-8")).hexdigest()
+        return os.path.join(self._arrays, f"{name}.npy")
+
+    def _write_array(self, obj_id: str, array: Any) -> None:
+        import numpy
+
+        path = self._array_path(obj_id)
+        # Arrays mapped on the previous file keep it, the new one replaces
+        # it once written.
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            numpy.save(f, array, allow_pickle=False)
+        os.replace(tmp, path)
+
+    def _load_array(self, obj_id: str, kind: str) -> Any:
+        import numpy
+
+        array = numpy.load(
+            self._array_path(obj_id),
+            mmap_mode=self.mmap_mode,
+            allow_pickle=False,
+        )
+        if self.mmap_mode is not None:
+            # Plain arrays for the serializers, still mapped on the file.
+            array = array.view(numpy.ndarray)
+        if kind == _TENSOR:
+            import torch
+
+            return torch.from_numpy(array)
+        return array
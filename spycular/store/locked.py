@@ -0,0 +1,48 @@
+import threading
+from typing import Any
+
+from .abstract import AbstractStore
+
+
+class LockedStore(AbstractStore):
+    """A thread-safe view of another store, serializing every call with
+    a lock.
+
+    Used while pointers run concurrently in a thread pool. The objects
+    themselves aren't locked, only the store bookkeeping.
+
+    Methods:
+        get: Retrieve an object by its ID from the wrapped store.
+        save: Store an object with a given ID in the wrapped store.
+        delete: Remove an object using its ID from the wrapped store.
+        has: Check if the wrapped store has an object with a given ID.
+    """
+
+    def __init__(self, store: AbstractStore) -> None:
+        """Initialize the LockedStore.
+
+        Args:
+            store (AbstractStore): The store to wrap.
+        """
+        super().__init__(store=store)
+        self.lock = threading.RLock()
+
+    def save(self, obj_id: str, obj: Any) -> None:
+        with self.lock:
+            self.store.save(obj_id, obj)
+
+    def get_all(self, page_index: int = 0, page_size: int = 0) -> Any:
+        with self.lock:
+            return self.store.get_all(page_index, page_size)
+
+    def get(self, obj_id: str) -> Any:
+        with self.lock:
+            return self.store.get(obj_id)
+
+    def delete(self, obj_id: str) -> None:
+        with self.lock:
+            self.store.delete(obj_id)
+
+    def has(self, obj_id: str) -> bool:
+        with self.lock:
+            return self.store.has(obj_id)
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 
 from .abstract import AbstractStore
 
@@ -8,6 +8,10 @@ class VirtualStore(AbstractStore):
     memory dictionary as its storage backend. This provides quick
     storage and retrieval but lacks persistence across sessions.
 
+    With `dedupe=True`, objects with the same `content_hash` are stored
+    once: every ID saved with an identical object shares the first one.
+    Only suited to workloads that don't modify stored objects in place.
+
     Methods:
         get: Retrieve an object by its ID from the store.
         save: Store an object with a given ID.
@@ -15,10 +19,30 @@ class VirtualStore(AbstractStore):
         has: Check if an object with a given ID exists in the store.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, dedupe: bool = False) -> None:
         """Initialize the VirtualStore with an empty dictionary as its
-        storage backend."""
+        storage backend.
+
+        Args:
+            dedupe: Share a single copy of identical objects.
+        """
         super().__init__(store={})
+        self.dedupe = dedupe
+        # content hash -> (object, number of IDs sharing it)
+        self.contents: Dict[str, Tuple[Any, int]] = {}
+        # ID -> content hash of its object
+        self.hashes: Dict[str, str] = {}
+
+    def content_hash(self, obj: Any) -> Optional[str]:
+        """Return the content hash of an object, None if it can't be
+        serialized."""
+        # relative
+        from ..serde.capnp.hashing import content_hash
+
+        try:
+            return content_hash(obj)
+        except Exception:
+            return None
 
     def get(self, obj_id: str) -> Any:
         """Retrieve an object from the store by its ID.
@@ -60,8 +84,25 @@ class VirtualStore(AbstractStore):
             obj_id: The unique identifier for the object.
             obj: The actual object to store.
         """
+        if obj_id in self.hashes:
+            self._release(obj_id)
+        if self.dedupe:
+            obj_hash = self.content_hash(obj)
+            if obj_hash is not None:
+                shared, count = self.contents.get(obj_hash, (obj, 0))
+                self.contents[obj_hash] = (shared, count + 1)
+                self.hashes[obj_id] = obj_hash
+                obj = shared
         self.store[obj_id] = obj
 
+    def _release(self, obj_id: str) -> None:
+        obj_hash = self.hashes.pop(obj_id)
+        shared, count = self.contents[obj_hash]
+        if count == 1:
+            del self.contents[obj_hash]
+        else:
+            self.contents[obj_hash] = (shared, count - 1)
+
     def delete(self, obj_id: str) -> None:
         """Remove an object from the store using its ID.
 
@@ -72,6 +113,8 @@ class VirtualStore(AbstractStore):
             KeyError: If the object with the provided ID does not exist.
         """
         del self.store[obj_id]
+        if obj_id in self.hashes:
+            self._release(obj_id)
 
     def has(self, obj_id: str) -> bool:
         """Check if the store contains an object with the provided ID.
@@ -0,0 +1,64 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.compression import CompressionPolicy  # noqa: E402
+from spycular.serde.capnp.context import serde_context  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.numpy.serde import arrow_serialize  # noqa: E402
+from spycular.serde.capnp.numpy.serde import (  # noqa: E402
+    numpy_deserialize,
+)
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+
+ZEROS = np.zeros(2**14, dtype=np.float32)
+NOISE = np.random.default_rng(0).random(2**14)
+
+
+def recorded_codec(x, policy):
+    with serde_context(compression=policy):
+        payload = _deserialize(arrow_serialize(x), from_bytes=True)
+    return payload[4]
+
+
+@pytest.mark.parametrize("codec", ["none", "lz4", "zstd", "snappy"])
+@pytest.mark.parametrize("x", [ZEROS, NOISE, np.arange(10)])
+def test_codec_round_trip(codec, x):
+    policy = CompressionPolicy(codec=codec, min_size=0, adaptive=False)
+    with serde_context(compression=policy):
+        serialized_x = _serialize(x, to_bytes=True)
+
+    deserialized_x = _deserialize(serialized_x, from_bytes=True)
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.dtype == x.dtype
+    assert recorded_codec(x, policy) == codec
+
+
+def test_small_buffers_are_not_compressed():
+    policy = CompressionPolicy(codec="zstd", min_size=2**20, adaptive=False)
+    assert recorded_codec(ZEROS, policy) == "none"
+
+
+def test_adaptive_policy_skips_incompressible_buffers():
+    policy = CompressionPolicy(codec="zstd", adaptive=True)
+    assert recorded_codec(NOISE, policy) == "none"
+    assert recorded_codec(ZEROS, policy) == "zstd"
+
+
+def test_payload_without_codec_is_snappy():
+    x = np.arange(100)
+    apache_arrow = pa.Tensor.from_numpy(obj=x)
+    sink = pa.BufferOutputStream()
+    pa.ipc.write_tensor(apache_arrow, sink)
+    buffer = sink.getvalue()
+    numpy_bytes = pa.compress(buffer, asbytes=True, codec="snappy")
+    legacy = _serialize((numpy_bytes, buffer.size, "int64"), to_bytes=True)
+
+    assert np.array_equal(numpy_deserialize(legacy), x)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        CompressionPolicy(codec="rar")
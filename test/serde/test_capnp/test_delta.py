@@ -0,0 +1,157 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+capnp = pytest.importorskip("capnp")
+
+from spycular.pointer.object_pointer import GetPointer  # noqa: E402
+from spycular.producer.abstract import AbstractProducer  # noqa: E402
+from spycular.serde.capnp.delta import DeltaArray  # noqa: E402
+from spycular.serde.capnp.delta import block_checksums  # noqa: E402
+from spycular.serde.capnp.delta import describe  # noqa: E402
+from spycular.serde.capnp.delta import make_delta  # noqa: E402
+from spycular.serde.capnp.delta import raw_view  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+BLOCK_SIZE = 4096
+
+
+def round_trip(x):
+    return _deserialize(_serialize(x, to_bytes=True), from_bytes=True)
+
+
+class LoopbackProducer(AbstractProducer):
+    """Solves requests against a local store, through the serde."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.reply_sizes = []
+
+    def send(self, ptr):
+        pass
+
+    def request(self, ptr):
+        replies = []
+        round_trip(ptr).solve(
+            None,
+            self.store,
+            lambda obj_id, obj: replies.append(obj),
+        )
+        reply = _serialize(replies[0], to_bytes=True)
+        self.reply_sizes.append(len(reply))
+        return _deserialize(reply, from_bytes=True)
+
+
+@pytest.fixture
+def store():
+    store = VirtualStore()
+    store.save("x", np.arange(2**16, dtype=np.float64))
+    return store
+
+
+def test_only_changed_blocks_are_sent(store):
+    producer = LoopbackProducer(store)
+    x = store.get("x")
+
+    first = producer.request_delta("x", BLOCK_SIZE)
+    x[10] = -1
+    x[-1] = -1
+    second = producer.request_delta("x", BLOCK_SIZE)
+
+    assert np.array_equal(second, x)
+    assert producer.reply_sizes[1] < producer.reply_sizes[0] // 10
+    # Both results view the same copy, which is patched in place.
+    assert first[10] == -1
+    assert not second.flags.writeable
+
+
+def test_unchanged_array(store):
+    producer = LoopbackProducer(store)
+
+    producer.request_delta("x", BLOCK_SIZE)
+    result = producer.request_delta("x", BLOCK_SIZE)
+
+    assert np.array_equal(result, store.get("x"))
+    assert producer.reply_sizes[1] < producer.reply_sizes[0] // 100
+
+
+def test_full_array_is_sent_when_the_copy_is_outdated(store):
+    producer = LoopbackProducer(store)
+
+    producer.request_delta("x", BLOCK_SIZE)
+    store.get("x")[:] = 7
+    assert (producer.request_delta("x", BLOCK_SIZE) == 7).all()
+    store.save("x", np.ones(10, dtype=np.int32))
+    result = producer.request_delta("x", BLOCK_SIZE)
+    assert result.dtype == np.int32
+    assert (result == 1).all()
+    store.save("x", "text")
+    assert producer.request_delta("x", BLOCK_SIZE) == "text"
+    assert "x" not in producer.delta_copies
+
+
+def test_forget_delta(store):
+    producer = LoopbackProducer(store)
+    store.save("y", np.zeros(2**12))
+
+    producer.request_delta("x", BLOCK_SIZE)
+    producer.request_delta("y", BLOCK_SIZE)
+    producer.forget_delta("x")
+    assert list(producer.delta_copies) == ["y"]
+    producer.request_delta("x", BLOCK_SIZE)
+    assert producer.reply_sizes[2] >= producer.reply_sizes[0]
+
+    producer.forget_delta()
+    assert not producer.delta_copies
+
+
+def test_get_pointer_without_checksums_replies_whole_object():
+    x = np.arange(10)
+    ptr = round_trip(GetPointer(target_id="x", delta_block_size=BLOCK_SIZE))
+
+    assert ptr.delta(x) is x
+
+
+def test_delta_array_round_trip():
+    x = np.arange(2**12, dtype=np.int32)
+    previous = x.copy()
+    previous[-1] = 0
+    checksums = block_checksums(raw_view(previous), BLOCK_SIZE)
+
+    delta = round_trip(make_delta(x, checksums, describe(x), BLOCK_SIZE))
+
+    assert isinstance(delta, DeltaArray)
+    assert delta.indices.tolist() == [3]
+    delta.apply(raw_view(previous))
+    assert np.array_equal(previous, x)
+
+
+def test_torch_tensor_delta():
+    th = pytest.importorskip("torch")
+    store = VirtualStore()
+    store.save("t", th.rand(2**14))
+    producer = LoopbackProducer(store)
+
+    producer.request_delta("t", BLOCK_SIZE)
+    store.get("t")[100] = 3
+    result = producer.request_delta("t", BLOCK_SIZE)
+
+    assert th.equal(result, store.get("t"))
+    assert producer.reply_sizes[1] < producer.reply_sizes[0] // 4
+
+
+def test_writes_to_torch_results_dont_change_the_copy():
+    th = pytest.importorskip("torch")
+    store = VirtualStore()
+    store.save("t", th.zeros(2**14))
+    producer = LoopbackProducer(store)
+
+    result = producer.request_delta("t", BLOCK_SIZE)
+    result[0] = 5.0
+    store.get("t")[-1] = 1.0
+    result = producer.request_delta("t", BLOCK_SIZE)
+
+    assert th.equal(result, store.get("t"))
+    assert result[0] == 0.0
@@ -0,0 +1,87 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.hashing import content_hash  # noqa: E402
+from spycular.serde.capnp.recursive import (  # noqa: E402
+    recursive_serde_register,
+)
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+class TaggedValue:
+    __hash_exclude_attrs__ = ["tag"]
+
+    def __init__(self, value, tag):
+        self.value = value
+        self.tag = tag
+
+
+recursive_serde_register(TaggedValue, serialize_attrs=["value", "tag"])
+
+
+def test_equal_objects_have_equal_hashes():
+    x = {"a": np.arange(2**16), "b": [1, "two", 3.0]}
+    y = {"a": np.arange(2**16), "b": [1, "two", 3.0]}
+
+    assert content_hash(x) == content_hash(y)
+    y["a"][-1] = 0
+    assert content_hash(x) != content_hash(y)
+
+
+def test_array_dtype_and_shape_are_hashed():
+    x = np.zeros(2**16, dtype=np.int64)
+
+    hashes = {
+        content_hash(x),
+        content_hash(x.view(np.float64)),
+        content_hash(x.reshape(2**8, 2**8)),
+        content_hash(np.zeros(2**17, dtype=np.int32)),
+    }
+    assert len(hashes) == 4
+
+
+def test_buffer_boundaries_are_hashed():
+    x = np.arange(10, dtype=np.uint8)
+    assert content_hash((x[:4], x[4:])) != content_hash((x[:5], x[5:]))
+
+
+def test_hash_exclude_attrs():
+    first = content_hash(TaggedValue(np.ones(4), tag="first"))
+    second = content_hash(TaggedValue(np.ones(4), tag="second"))
+
+    assert first == second
+    assert first != content_hash(TaggedValue(np.zeros(4), tag="first"))
+
+
+def test_shared_objects_hash_like_copies():
+    x = np.arange(8)
+    assert content_hash((x, x)) == content_hash((x, x.copy()))
+
+    t = TaggedValue([1, 2], tag="t")
+    assert content_hash([t, t]) == content_hash(
+        [t, TaggedValue([1, 2], tag="t")]
+    )
+
+    item = (1, [2])
+    assert content_hash([item, item]) == content_hash([(1, [2]), (1, [2])])
+    assert content_hash({"a": item, "b": item}) == content_hash(
+        {"a": (1, [2]), "b": (1, [2])}
+    )
+    assert content_hash([item, item]) != content_hash([(1, [2]), (1, [3])])
+
+
+def test_cycles_are_not_hashable():
+    cycle = []
+    cycle.append(cycle)
+    with pytest.raises(ValueError):
+        content_hash(cycle)
+
+
+def test_dedupe_store_finds_shared_duplicates():
+    store = VirtualStore(dedupe=True)
+    x = np.arange(8)
+    store.save("shared", (x, x))
+    store.save("copies", (x, x.copy()))
+    assert store.get("copies") is store.get("shared")
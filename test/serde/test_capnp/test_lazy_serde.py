@@ -0,0 +1,145 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.recursive import LAZY_LOADERS  # noqa: E402
+from spycular.serde.capnp.recursive import TYPE_BANK  # noqa: E402
+from spycular.serde.capnp.recursive import load_lazy_serde  # noqa: E402
+from spycular.serde.capnp.recursive import (  # noqa: E402
+    register_lazy_serde,
+)
+from spycular.serde.capnp.util import get_capnp_schema  # noqa: E402
+
+
+def run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+
+
+def test_import_does_not_load_extras():
+    pytest.importorskip("numpy")
+    loaded = run(
+        "import sys, spycular\n"
+        "print(*[m for m in ('numpy', 'pyarrow', 'torch')"
+        " if m in sys.modules])",
+    )
+    assert loaded == []
+
+
+def test_hashing_does_not_need_pyarrow():
+    output = run(
+        "import sys\n"
+        "sys.modules['pyarrow'] = None\n"
+        "import spycular.consumer.websocket, spycular.producer.websocket\n"
+        "from spycular.store.virtual import VirtualStore\n"
+        "store = VirtualStore(dedupe=True)\n"
+        "store.save('a', [1, 2])\n"
+        "store.save('b', [1, 2])\n"
+        "print(store.get('a') is store.get('b'))",
+    )
+    assert output == ["True"]
+
+
+def test_serde_is_registered_on_first_use():
+    pytest.importorskip("numpy")
+    pytest.importorskip("pyarrow")
+    output = run(
+        "import numpy as np\n"
+        "from spycular.serde.capnp.deserialize import _deserialize\n"
+        "from spycular.serde.capnp.recursive import TYPE_BANK\n"
+        "from spycular.serde.capnp.serialize import _serialize\n"
+        "print('numpy.ndarray' in TYPE_BANK)\n"
+        "blob = _serialize([np.arange(3), np.int8(4)], to_bytes=True)\n"
+        "print('numpy.ndarray' in TYPE_BANK)\n"
+        "print(_deserialize(blob, from_bytes=True)[0].sum())",
+    )
+    assert output == ["False", "True", "3"]
+
+
+def test_deserialization_loads_by_name():
+    pytest.importorskip("numpy")
+    pytest.importorskip("pyarrow")
+    output = run(
+        "import numpy as np, sys\n"
+        "from spycular.serde.capnp.context import serde_context\n"
+        "from spycular.serde.capnp.serialize import _serialize\n"
+        "with serde_context(type_ids=frozenset()):\n"
+        "    blob = _serialize(np.arange(3), to_bytes=True)\n"
+        "sys.stdout.buffer.write(blob.hex().encode())",
+    )
+    deserialized = run(
+        "from spycular.serde.capnp.deserialize import _deserialize\n"
+        f"print(_deserialize(bytes.fromhex('{output[0]}'),"
+        " from_bytes=True).tolist())",
+    )
+    assert deserialized == ["[0,", "1,", "2]"]
+
+
+def test_missing_loader_dependency():
+    def loader():
+        raise ImportError("missing")
+
+    register_lazy_serde("lazy_test_module", loader)
+
+    assert not load_lazy_serde("lazy_test_module.Type")
+    assert "lazy_test_module" not in LAZY_LOADERS
+    assert "lazy_test_module.Type" not in TYPE_BANK
+
+
+def test_schemas_are_compiled_once():
+    assert get_capnp_schema("iterable.capnp") is get_capnp_schema(
+        "iterable.capnp",
+    )
+
+
+def test_concurrent_lookups_wait_for_the_loader():
+    calls = []
+
+    def loader():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        TYPE_BANK["lazy_threads_module.Type"] = None
+
+    register_lazy_serde("lazy_threads_module", loader)
+    seen = []
+
+    def lookup():
+        load_lazy_serde("lazy_threads_module.Type")
+        seen.append("lazy_threads_module.Type" in TYPE_BANK)
+
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    del TYPE_BANK["lazy_threads_module.Type"]
+
+    assert len(calls) == 1
+    assert seen == [True] * 4
+    assert "lazy_threads_module" not in LAZY_LOADERS
+
+
+def test_failed_loader_is_kept():
+    attempts = []
+
+    def loader():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise RuntimeError("failed")
+
+    register_lazy_serde("lazy_retry_module", loader)
+
+    with pytest.raises(RuntimeError):
+        load_lazy_serde("lazy_retry_module.Type")
+    assert "lazy_retry_module" in LAZY_LOADERS
+    assert load_lazy_serde("lazy_retry_module.Type")
+    assert "lazy_retry_module" not in LAZY_LOADERS
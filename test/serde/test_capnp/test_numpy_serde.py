@@ -3,7 +3,11 @@ import pytest
 np = pytest.importorskip("numpy")
 capnp = pytest.importorskip("capnp")
 
+from spycular.serde.capnp.compression import CompressionPolicy  # noqa: E402
+from spycular.serde.capnp.context import serde_context  # noqa: E402
 from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.numpy.serde import arraytonumpyutf8  # noqa: E402
+from spycular.serde.capnp.numpy.serde import numpy_deserialize  # noqa: E402
 from spycular.serde.capnp.serialize import _serialize  # noqa: E402
 
 
@@ -47,3 +51,112 @@ def test_bool_numpy_array():
 
     serialized_x = _serialize(x, to_bytes=True)
     assert np.array_equal(x, _deserialize(serialized_x, from_bytes=True))
+
+
+def test_decompressed_array_is_not_copied():
+    x = np.zeros(2**12, dtype=np.bool_)
+
+    deserialized_x = _deserialize(
+        _serialize(x, to_bytes=True), from_bytes=True
+    )
+
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.dtype == x.dtype
+    assert deserialized_x.flags.writeable
+    # Views the decompressed Arrow buffer instead of owning a copy.
+    assert not deserialized_x.flags.owndata
+
+
+@pytest.mark.parametrize("readonly", [False, True])
+def test_uncompressed_array_writability(readonly):
+    x = np.arange(2**12)
+    with serde_context(compression=CompressionPolicy(codec="none")):
+        serialized_x = _serialize(x, to_bytes=True)
+
+    with serde_context(readonly=readonly):
+        deserialized_x = _deserialize(serialized_x, from_bytes=True)
+
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.flags.writeable is not readonly
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        np.array(["a", "bé", "", "d\x00e"]),
+        np.array([[b"x", b"yz\x00w"], [b"", b"q"]]),
+        np.array(["a", "bc"], dtype=object),
+        np.array([b"a", b"bc"], dtype=object),
+        np.array([], dtype="U3"),
+        np.array("scalar"),
+    ],
+)
+def test_string_array(x):
+    deserialized_x = _deserialize(
+        _serialize(x, to_bytes=True), from_bytes=True
+    )
+
+    assert deserialized_x.dtype == x.dtype
+    assert deserialized_x.shape == x.shape
+    assert np.array_equal(x, deserialized_x)
+
+
+def test_string_array_is_smaller_than_legacy_encoding():
+    x = np.array([f"label_{idx % 10}" for idx in range(1000)])
+
+    serialized_x = _serialize(x, to_bytes=True)
+    legacy = arraytonumpyutf8(x)
+
+    assert len(serialized_x) < len(legacy)
+    assert np.array_equal(numpy_deserialize(legacy), x)
+
+
+def test_string_array_with_none():
+    with pytest.raises(ValueError):
+        _serialize(np.array(["a", None], dtype=object), to_bytes=True)
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        np.arange(24).reshape(4, 6)[:, ::2],
+        np.arange(10)[::-1],
+        np.arange(6.0).reshape(2, 3).T,
+        np.array([1 + 2j, 3 - 4j], dtype=np.complex64),
+        np.asfortranarray(np.ones((2, 3)) * 1j),
+        np.array(["2020-01-01", "2021-06-30"], dtype="datetime64[D]"),
+        np.array([1, 2], dtype="timedelta64[s]"),
+    ],
+)
+def test_views_and_raw_dtypes(x):
+    deserialized_x = _deserialize(
+        _serialize(x, to_bytes=True), from_bytes=True
+    )
+
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.dtype == x.dtype
+    assert deserialized_x.flags.writeable
+
+
+def test_strided_view_sends_only_referenced_elements():
+    base = np.arange(2**20, dtype=np.float64)
+    x = base[::1024]
+
+    serialized_x = _serialize(x, to_bytes=True)
+
+    assert len(serialized_x) < 2 * x.nbytes
+    assert np.array_equal(x, _deserialize(serialized_x, from_bytes=True))
+
+
+def test_broadcast_view_is_not_materialized():
+    x = np.broadcast_to(np.arange(256.0), (4096, 256))
+
+    serialized_x = _serialize(x, to_bytes=True)
+    deserialized_x = _deserialize(serialized_x, from_bytes=True)
+
+    assert len(serialized_x) < 4 * 256 * 8
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.flags.writeable
+    with serde_context(readonly=True):
+        deserialized_x = _deserialize(serialized_x, from_bytes=True)
+    assert deserialized_x.strides[0] == 0
@@ -0,0 +1,90 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+capnp = pytest.importorskip("capnp")
+
+from spycular.pointer.callable_pointer import FunctionPointer  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.frames import FrameReader  # noqa: E402
+from spycular.serde.capnp.frames import deserialize_frames  # noqa: E402
+from spycular.serde.capnp.frames import serialize_frames  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+
+
+def test_out_of_band_buffers_are_not_copied():
+    x = np.arange(2**14, dtype=np.float64)
+    buffers = []
+
+    serialized_x = _serialize(x, to_bytes=True, buffer_callback=buffers.append)
+
+    assert len(buffers) == 1
+    assert len(serialized_x) < 1024
+    assert np.shares_memory(np.frombuffer(buffers[0], dtype=np.uint8), x)
+    deserialized_x = _deserialize(
+        serialized_x,
+        from_bytes=True,
+        buffers=[bytearray(buf) for buf in buffers],
+    )
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.flags.writeable
+
+
+def test_out_of_band_fortran_array():
+    x = np.asfortranarray(np.arange(2**14, dtype=np.int32).reshape(128, 128))
+    buffers = []
+
+    serialized_x = _serialize(x, to_bytes=True, buffer_callback=buffers.append)
+    deserialized_x = _deserialize(
+        serialized_x, from_bytes=True, buffers=buffers
+    )
+
+    assert np.array_equal(x, deserialized_x)
+    assert deserialized_x.flags.f_contiguous
+
+
+def test_small_arrays_stay_in_band():
+    x = np.arange(10)
+    buffers = []
+
+    serialized_x = _serialize(x, to_bytes=True, buffer_callback=buffers.append)
+
+    assert buffers == []
+    assert np.array_equal(x, _deserialize(serialized_x, from_bytes=True))
+
+
+def test_frames_roundtrip():
+    x = np.ones((256, 256))
+    ptr = FunctionPointer(path="sum", args=(x, np.arange(3)))
+
+    frames = serialize_frames(ptr)
+    deserialized_ptr = deserialize_frames(frames)
+
+    assert len(frames) == 3
+    assert np.array_equal(deserialized_ptr.args[0], x)
+    assert np.array_equal(deserialized_ptr.args[1], np.arange(3))
+
+
+def test_frames_without_buffers_are_plain_messages():
+    ptr = FunctionPointer(path="sum", args=(1, 2))
+
+    frames = serialize_frames(ptr)
+
+    assert len(frames) == 1
+    assert _deserialize(frames[0], from_bytes=True).args == (1, 2)
+
+
+def test_readonly_frames_are_not_copied():
+    x = np.arange(2**14, dtype=np.float32)
+    frames = [bytes(frame) for frame in serialize_frames(x)]
+
+    reader = FrameReader(readonly=True)
+    for frame in frames:
+        reader.feed(frame)
+    deserialized_x = reader.result()
+
+    assert np.array_equal(x, deserialized_x)
+    assert not deserialized_x.flags.writeable
+    assert np.shares_memory(
+        deserialized_x,
+        np.frombuffer(frames[-1], dtype=np.float32),
+    )
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+import pytest
+
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.primitives.serde import (  # noqa: E402
+    get_packed_field,
+)
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+
+PACKABLE = [
+    (1, -2, 2**63 - 1, -(2**63)),
+    [0.5, float("inf"), -0.0],
+    [True, False],
+    ("a", "b\x00c", ""),
+    [b"x", b"\x00"],
+    (1, "a", None, 1.5, True, b"y"),
+    {3, 4},
+    frozenset({"a"}),
+    {"axis": 0, "dtype": "float32", "keepdims": False, "out": None},
+    OrderedDict(b=1, a=2),
+    complex(1, 2),
+    range(1, 10, 2),
+    slice(1, None, 2),
+]
+
+
+@pytest.mark.parametrize("version", [1, 2])
+@pytest.mark.parametrize("obj", PACKABLE)
+def test_packed_round_trip(obj, version):
+    blob = _serialize(obj, to_bytes=True, version=version)
+    deserialized = _deserialize(blob, from_bytes=True)
+
+    assert deserialized == obj
+    assert type(deserialized) is type(obj)
+    if isinstance(obj, (tuple, list)):
+        assert list(map(type, deserialized)) == list(map(type, obj))
+
+
+@pytest.mark.parametrize(
+    "values,field",
+    [
+        ((1, 2), "ints"),
+        ((1, True), "scalars"),
+        ((None,), "scalars"),
+        ((1, 2**63), None),
+        ((1, [2]), None),
+        ((), None),
+    ],
+)
+def test_packed_field(values, field):
+    assert get_packed_field(values) == field
+
+
+def test_packed_args_are_a_single_node():
+    args = (1, 2, 3)
+    kwargs = {"axis": 0, "keepdims": True}
+
+    assert len(_serialize(args).nodes) == 1
+    assert len(_serialize(kwargs).nodes) == 1
+
+
+def test_unpackable_items_are_not_packed():
+    obj = {"a": [1, 2], 1: "b"}
+    proto = _serialize(obj)
+
+    assert len(proto.nodes) > 1
+    assert _deserialize(proto.to_bytes(), from_bytes=True) == obj
@@ -0,0 +1,100 @@
+import pytest
+
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.recursive import as_bytes  # noqa: E402
+from spycular.serde.capnp.recursive import combine_bytes  # noqa: E402
+from spycular.serde.capnp.recursive import get_plan  # noqa: E402
+from spycular.serde.capnp.recursive import (  # noqa: E402
+    recursive_serde_register,
+)
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+
+
+def test_combine_single_chunk_is_not_copied():
+    chunk = b"spycular"
+    combined = combine_bytes([chunk])
+
+    assert isinstance(combined, memoryview)
+    assert combined.obj is chunk
+    assert as_bytes(combined) is chunk
+
+
+def test_combine_multiple_chunks():
+    combined = combine_bytes([b"spy", b"cu", b"lar"])
+
+    assert isinstance(combined, bytearray)
+    assert combined == b"spycular"
+
+
+def test_deserialize_from_buffer_protocol_objects():
+    serialized = _serialize(["a", b"b", 1.5, 2], to_bytes=True)
+
+    for blob in (bytearray(serialized), memoryview(serialized)):
+        assert _deserialize(blob, from_bytes=True) == ["a", b"b", 1.5, 2]
+
+
+def test_nested_format_still_decodes():
+    x = {"a": (1, 2.5), "b": ["c", None, True]}
+    proto = _serialize(x, version=1)
+
+    assert proto.version == 0
+    assert _deserialize(proto.to_bytes(), from_bytes=True) == x
+
+
+def test_flat_format_single_message():
+    x = ({"a": [1, 2]}, {"b": [3, 4]})
+    proto = _serialize(x)
+
+    assert proto.version == 2
+    assert len(proto.nodes) == 7
+    assert _deserialize(proto.to_bytes(), from_bytes=True) == x
+
+
+def test_flat_format_shared_references():
+    shared = [1, 2, 3]
+    x = (shared, shared)
+
+    deserialized_x = _deserialize(
+        _serialize(x, to_bytes=True), from_bytes=True
+    )
+
+    assert deserialized_x == x
+    assert deserialized_x[0] is deserialized_x[1]
+
+
+def test_flat_format_cyclic_references():
+    x = [1]
+    x.append(x)
+
+    with pytest.raises(ValueError):
+        _deserialize(_serialize(x, to_bytes=True), from_bytes=True)
+
+
+class PlannedPoint:
+    def __init__(self, y, x, secret=None):
+        self.y = y
+        self.x = x
+        self.secret = secret
+
+
+recursive_serde_register(
+    PlannedPoint,
+    serialize_attrs=["y", "x", "secret"],
+    exclude_attrs=["secret"],
+)
+
+
+def test_plan_fields_are_sorted_and_filtered():
+    point = PlannedPoint(y=2, x=1, secret="s")
+    plan = get_plan(point)
+
+    assert plan.cls is PlannedPoint
+    assert plan.get_fields(point) == [("x", 1), ("y", 2)]
+
+    deserialized = _deserialize(
+        _serialize(point, to_bytes=True), from_bytes=True
+    )
+    assert (deserialized.x, deserialized.y) == (1, 2)
+    assert not hasattr(deserialized, "secret")
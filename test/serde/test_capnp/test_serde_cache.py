@@ -0,0 +1,127 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.cache import CacheMirror  # noqa: E402
+from spycular.serde.capnp.cache import SerdeCache  # noqa: E402
+from spycular.serde.capnp.frames import FrameReader  # noqa: E402
+from spycular.serde.capnp.frames import iter_frames  # noqa: E402
+
+X = np.arange(2**14, dtype=np.float64)
+
+
+def send(x, cache, reader):
+    frames = list(iter_frames(x, cache=cache))
+    for frame in frames:
+        if reader.feed(frame):
+            return sum(memoryview(f).nbytes for f in frames), reader.result()
+
+
+def test_repeated_array_is_sent_as_reference():
+    cache = SerdeCache(min_size=1024)
+    reader = FrameReader(cache_mirror=CacheMirror())
+
+    first_size, first = send({"x": X}, cache, reader)
+    second_size, second = send({"x": X.copy()}, cache, reader)
+
+    assert second_size < first_size // 10
+    assert np.array_equal(first["x"], X)
+    assert np.array_equal(second["x"], X)
+    # Every result is a writable copy of the cached array.
+    second["x"][0] = -1
+    assert send(X, cache, reader)[1][0] == 0
+
+
+def test_readonly_reader_shares_cached_array():
+    cache = SerdeCache(min_size=1024)
+    reader = FrameReader(readonly=True, cache_mirror=CacheMirror())
+
+    first = send(X, cache, reader)[1]
+    second = send(X, cache, reader)[1]
+
+    assert second is first
+    assert not second.flags.writeable
+
+
+def test_small_and_modified_arrays_are_not_referenced():
+    cache = SerdeCache(min_size=1024)
+    reader = FrameReader(cache_mirror=CacheMirror())
+    y = X.copy()
+
+    send(y, cache, reader)
+    y[0] = 42
+    assert send(y, cache, reader)[1][0] == 42
+    assert send(np.arange(10), cache, reader)[1].size == 10
+    assert len(cache._entries) == 2
+
+
+def test_immutable_arrays_are_keyed_by_identity():
+    cache = SerdeCache(min_size=1024, by_content=False)
+    reader = FrameReader(cache_mirror=CacheMirror())
+    cache.mark_immutable(X)
+
+    send(X, cache, reader)
+    size, result = send(X, cache, reader)
+
+    assert size < 1024
+    assert np.array_equal(result, X)
+    # Without declaration nor content hashing, nothing is cached.
+    send(X.copy(), cache, reader)
+    assert len(cache._entries) == 1
+
+
+def test_evictions_are_mirrored():
+    cache = SerdeCache(max_bytes=2 * X.nbytes, min_size=1024)
+    mirror = CacheMirror()
+    reader = FrameReader(cache_mirror=mirror)
+
+    for idx in range(4):
+        assert send(X + idx, cache, reader)[1][0] == idx
+
+    assert cache.nbytes == 2 * X.nbytes
+    assert len(mirror) == 2
+    assert send(X + 3, cache, reader)[1][0] == 3
+
+
+def test_reference_without_mirror():
+    cache = SerdeCache(min_size=1024)
+    assert np.array_equal(send(X, cache, FrameReader())[1], X)
+
+    with pytest.raises(ValueError):
+        send(X, cache, FrameReader())
+
+
+def test_torch_tensors_are_cached():
+    th = pytest.importorskip("torch")
+    cache = SerdeCache(min_size=1024)
+    reader = FrameReader(cache_mirror=CacheMirror())
+    x = th.arange(2**14, dtype=th.float32)
+
+    first_size, _ = send(x, cache, reader)
+    second_size, result = send(x, cache, reader)
+
+    assert second_size < first_size // 10
+    assert th.equal(result, x)
+
+
+def test_failed_messages_are_not_cached():
+    cache = SerdeCache(min_size=1024)
+    reader = FrameReader(cache_mirror=CacheMirror())
+    send(X, cache, reader)
+    y = X + 1
+
+    # Serialization fails after the array was cached.
+    with pytest.raises(Exception):
+        list(iter_frames((y, lambda: 0), cache=cache))
+    assert len(cache._entries) == 1
+
+    # Sending fails after the first frame.
+    frames = iter_frames(y, cache=cache, oob_threshold=0, chunk_size=1024)
+    next(frames)
+    frames.close()
+    assert len(cache._entries) == 1
+
+    assert np.array_equal(send(y, cache, reader)[1], y)
+    assert np.array_equal(send(y, cache, reader)[1], y)
+    assert len(cache._entries) == 2
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+capnp = pytest.importorskip("capnp")
+
+from spycular.serde.capnp.frames import FrameReader  # noqa: E402
+from spycular.serde.capnp.frames import iter_frames  # noqa: E402
+from spycular.serde.capnp.frames import read_stream  # noqa: E402
+from spycular.serde.capnp.frames import write_stream  # noqa: E402
+
+
+def feed_all(reader, frames):
+    results = [reader.feed(bytes(frame)) for frame in frames]
+    assert results[-1] and not any(results[:-1])
+    return reader.result()
+
+
+def test_frames_are_bounded_by_chunk_size():
+    x = {"a": np.arange(2**16, dtype=np.float64), "b": np.zeros(10)}
+
+    frames = list(iter_frames(x, chunk_size=4096))
+
+    assert max(memoryview(frame).nbytes for frame in frames) <= 4096
+    deserialized_x = feed_all(FrameReader(), frames)
+    assert np.array_equal(x["a"], deserialized_x["a"])
+    assert np.array_equal(x["b"], deserialized_x["b"])
+    # Chunks are reassembled in a bytearray, used without another copy.
+    assert deserialized_x["a"].flags.writeable
+    assert isinstance(deserialized_x["a"].base, bytearray)
+
+
+def test_large_message_without_buffers_is_chunked():
+    x = [str(idx) for idx in range(10000)]
+
+    frames = list(iter_frames(x, chunk_size=1024))
+
+    assert len(frames) > 2
+    assert feed_all(FrameReader(), frames) == x
+
+
+def test_chunk_size_mismatch():
+    frames = list(iter_frames(np.arange(2**14), chunk_size=4096))
+    reader = FrameReader()
+    for frame in frames[:-1]:
+        reader.feed(frame)
+
+    with pytest.raises(ValueError):
+        reader.feed(bytes(frames[-1]) + b"extra")
+
+
+def test_stream_round_trip():
+    x = (np.arange(2**15, dtype=np.int32), "tail")
+    stream = io.BytesIO()
+
+    written = write_stream(x, stream, chunk_size=1024)
+    write_stream(1, stream)
+
+    assert written < stream.tell()
+    stream.seek(0)
+    deserialized_x = read_stream(stream)
+    assert np.array_equal(x[0], deserialized_x[0])
+    assert deserialized_x[1] == "tail"
+    assert read_stream(stream) == 1
+
+
+def test_truncated_stream():
+    stream = io.BytesIO()
+    write_stream(np.arange(2**15), stream)
+
+    with pytest.raises(ValueError):
+        read_stream(io.BytesIO(stream.getvalue()[:-1]))
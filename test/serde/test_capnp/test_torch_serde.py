@@ -4,6 +4,8 @@ np = pytest.importorskip("numpy")
 capnp = pytest.importorskip("capnp")
 th = pytest.importorskip("torch")
 
+from spycular.serde.capnp.compression import CompressionPolicy  # noqa: E402
+from spycular.serde.capnp.context import serde_context  # noqa: E402
 from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
 from spycular.serde.capnp.serialize import _serialize  # noqa: E402
 
@@ -13,3 +15,93 @@ def test_simple_numpy_array():
 
     serialized_x = _serialize(x, to_bytes=True)
     assert th.equal(x, _deserialize(serialized_x, from_bytes=True))
+
+
+@pytest.mark.parametrize("codec", ["none", "lz4", "zstd", "snappy"])
+def test_compression_codecs(codec):
+    x = th.zeros(4096)
+    policy = CompressionPolicy(codec=codec, min_size=0, adaptive=False)
+
+    with serde_context(compression=policy):
+        serialized_x = _serialize(x, to_bytes=True)
+    assert th.equal(x, _deserialize(serialized_x, from_bytes=True))
+
+
+def test_readonly_option_keeps_tensors_writable():
+    x = th.arange(2**14, dtype=th.float32)
+    buffers = []
+    serialized_x = _serialize(x, to_bytes=True, buffer_callback=buffers.append)
+
+    with serde_context(readonly=True):
+        deserialized_x = _deserialize(
+            serialized_x,
+            from_bytes=True,
+            buffers=[bytes(buffer) for buffer in buffers],
+        )
+
+    assert th.equal(x, deserialized_x)
+    deserialized_x += 1
+
+
+def round_trip(x):
+    return _deserialize(_serialize(x, to_bytes=True), from_bytes=True)
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        th.arange(24.0).reshape(4, 6)[:, ::2],
+        th.arange(16.0).reshape(4, 4).t(),
+        th.ones(1).expand(1000),
+        th.tensor([1.5, -2.0], dtype=th.bfloat16),
+        th.tensor([1 + 2j, 3 - 4j], dtype=th.complex64),
+        th.tensor([1 + 2j], dtype=th.complex128),
+        th.tensor([1 + 2j, 3 - 4j], dtype=th.complex64).conj(),
+        # Imaginary parts of conjugate views have the negative bit set.
+        th.tensor([1 + 2j, 3 - 4j], dtype=th.complex64).conj().imag,
+    ],
+)
+def test_views_and_dtypes(x):
+    deserialized_x = round_trip(x)
+
+    assert deserialized_x.dtype == x.dtype
+    assert th.equal(x, deserialized_x)
+
+
+def test_requires_grad():
+    x = th.ones(3, requires_grad=True)
+
+    deserialized_x = round_trip(x)
+
+    assert deserialized_x.requires_grad
+    assert th.equal(x.detach(), deserialized_x.detach())
+
+
+def test_sparse_coo_sends_only_non_zero_values():
+    indices = th.tensor([[0, 500, 9999], [3, 1, 7]])
+    x = th.sparse_coo_tensor(indices, th.ones(3), (10000, 8))
+
+    serialized_x = _serialize(x, to_bytes=True)
+    deserialized_x = _deserialize(serialized_x, from_bytes=True)
+
+    assert len(serialized_x) < x.to_dense().nbytes // 100
+    assert deserialized_x.layout == th.sparse_coo
+    assert deserialized_x.is_coalesced()
+    assert th.equal(x.to_dense(), deserialized_x.to_dense())
+
+
+@pytest.mark.parametrize(
+    "to_sparse",
+    [
+        lambda x: x.to_sparse_csr(),
+        lambda x: x.to_sparse_csc(),
+        lambda x: x.to_sparse_bsr((2, 2)),
+    ],
+)
+def test_sparse_compressed(to_sparse):
+    x = to_sparse(th.eye(4))
+
+    deserialized_x = round_trip(x)
+
+    assert deserialized_x.layout == x.layout
+    assert th.equal(x.to_dense(), deserialized_x.to_dense())
@@ -0,0 +1,57 @@
+import pytest
+
+capnp = pytest.importorskip("capnp")
+
+from spycular.pointer.object_pointer import ObjectPointer  # noqa: E402
+from spycular.pointer.registry_pointer import (  # noqa: E402
+    TypeRegistryPointer,
+)
+from spycular.serde.capnp.context import serde_context  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.recursive import get_type_id  # noqa: E402
+from spycular.serde.capnp.recursive import type_registry  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_type_ids_replace_names(version):
+    ptr = ObjectPointer(path="x")
+    with_names = _serialize(ptr, to_bytes=True, version=version)
+    with serde_context(type_ids=frozenset()):
+        without_ids = _serialize(ptr, to_bytes=True, version=version)
+
+    assert len(with_names) < len(without_ids)
+    for blob in (with_names, without_ids):
+        deserialized = _deserialize(blob, from_bytes=True)
+        assert (deserialized.id, deserialized.path) == (ptr.id, ptr.path)
+
+
+def test_unshared_types_fall_back_to_names():
+    int_id = get_type_id("builtins.int")
+    with serde_context(type_ids=frozenset([int_id])):
+        proto = _serialize([1, (2,)])
+
+    list_node, int_node, _ = proto.nodes
+    assert list_node.typeId == 0
+    assert list_node.fullyQualifiedName == "builtins.list"
+    assert int_node.typeId == int_id
+    assert int_node.fullyQualifiedName == ""
+
+
+def test_unknown_type_id():
+    proto = _serialize(1)
+    proto.nodes[0].typeId = proto.nodes[0].typeId + 1
+
+    with pytest.raises(Exception, match="not in TYPE_BANK"):
+        _deserialize(proto.to_bytes(), from_bytes=True)
+
+
+def test_registry_pointer_replies_shared_types():
+    registry = {get_type_id("builtins.int"): "builtins.int", 1: "unknown.A"}
+    replies = []
+
+    ptr = TypeRegistryPointer(registry=registry)
+    ptr.solve(None, reply_callback=lambda _, obj: replies.append(obj))
+
+    assert replies == [{get_type_id("builtins.int"): "builtins.int"}]
+    assert type_registry()[get_type_id("builtins.int")] == "builtins.int"
@@ -0,0 +1,130 @@
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import reflect, strike  # noqa: E402
+from spycular.consumer.virtual import VirtualConsumer  # noqa: E402
+from spycular.pointer.object_pointer import GetPointer  # noqa: E402
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.store.disk import DiskStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DiskStore(tmp_path / "store", mmap_threshold=1024)
+    yield store
+    store.close()
+
+
+def test_arrays_are_memory_mapped(store):
+    large = local_numpy.arange(1000.0)
+    small = local_numpy.arange(10)
+    store.save("large", large)
+    store.save("small", small)
+
+    mapped = store.get("large")
+    assert type(mapped) is local_numpy.ndarray
+    assert isinstance(mapped.base, local_numpy.memmap)
+    assert local_numpy.array_equal(mapped, large)
+    assert store.get("small") is small
+
+    # Changes made in place are written to the file.
+    mapped.fill(3.0)
+    assert local_numpy.array_equal(
+        store.get("large"), local_numpy.full(1000, 3)
+    )
+
+    # Replacing an array keeps the mapped ones valid.
+    store.save("large", local_numpy.zeros(2000))
+    assert mapped[0] == 3.0
+    assert store.get("large").shape == (2000,)
+    store.save("large", "text")
+    assert store.get("large") == "text"
+    store.delete("small")
+    assert len(store.store) == 1
+
+
+def test_objects_persist(tmp_path):
+    path = tmp_path / "store"
+    store = DiskStore(path, mmap_threshold=1024)
+    values = [1, 2]
+    store.save("array", local_numpy.arange(1000))
+    store.save("list", values)
+    store.save("scalar", local_numpy.float32(1.5))
+    store.save("function", local_numpy.sum)
+    values.append(3)
+    store.close()
+
+    store = DiskStore(path, mmap_mode=None)
+    assert list(store.store) == ["array", "list", "scalar"]
+    array = store.get("array")
+    assert type(array) is local_numpy.ndarray
+    assert local_numpy.array_equal(array, local_numpy.arange(1000))
+    # Changes made in place are written on close.
+    assert store.get("list") == [1, 2, 3]
+    scalar = store.get("scalar")
+    assert scalar == 1.5 and scalar.dtype == local_numpy.float32
+    store.close()
+
+
+def test_cache_keeps_the_last_used_objects(tmp_path):
+    store = DiskStore(tmp_path / "store", cache_size=2)
+    values = [[i] for i in range(4)]
+    store.save("0", values[0])
+    values[0].append(-1)
+    store.save("1", values[1])
+    store.save("2", values[2])
+
+    # Objects leaving the cache are written with their changes.
+    assert store.get("0") == [0, -1]
+    assert store.get("0") is not values[0]
+    # Reading an object keeps it, the least recently used one leaves.
+    assert store.get("2") is values[2]
+    store.save("3", values[3])
+    assert store.get("2") is values[2]
+    assert store.get("1") == [1]
+    assert store.get("1") is not values[1]
+    store.close()
+
+
+def test_tensors_are_memory_mapped(store):
+    torch = pytest.importorskip("torch")
+    tensor = torch.arange(1000, dtype=torch.float32)
+    store.save("tensor", tensor)
+    mapped = store.get("tensor")
+    assert isinstance(mapped, torch.Tensor)
+    assert torch.equal(mapped, tensor)
+    mapped.add_(1)
+    assert torch.equal(store.get("tensor"), tensor + 1)
+
+
+def test_conjugate_and_negative_views(store):
+    torch = pytest.importorskip("torch")
+    tensor = torch.randn(256, dtype=torch.complex64)
+    store.save("conj", tensor.conj())
+    # The imaginary part of a conjugate view has the negative bit set.
+    store.save("neg", tensor.conj().imag)
+    assert torch.equal(store.get("conj"), tensor.conj())
+    assert torch.equal(store.get("neg"), -tensor.imag)
+
+
+def test_consumer_with_disk_store(tmp_path):
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    storage = DiskStore(tmp_path / "store", mmap_threshold=1024)
+    consumer = VirtualConsumer(storage, message_queue, reply_queue)
+    reflect(local_numpy, consumer)
+    np = strike(local_numpy, producer)
+
+    x_ptr = np.arange(1000.0)
+    x_ptr.fill(2.0)
+    y_ptr = x_ptr * 3 + np.ones(1000)
+    get_ptr = GetPointer(page_index=0, page_size=2)
+    np.broker.send(get_ptr)
+    consumer.listen()
+
+    assert local_numpy.array_equal(
+        storage.get(y_ptr.id), local_numpy.full(1000, 7)
+    )
+    assert list(reply_queue[get_ptr.id]) == list(storage.store)[:2]
+    storage.close()
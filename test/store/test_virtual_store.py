@@ -1,29 +1,41 @@
+import pytest
+
 from spycular.pointer.object_pointer import GetPointer
+from spycular.store.disk import DiskStore
 from spycular.store.virtual import VirtualStore
 
 
-def test_create_virtual_store():
-    store = VirtualStore()
+@pytest.fixture(params=["virtual", "disk"])
+def store(request, tmp_path):
+    if request.param == "virtual":
+        yield VirtualStore()
+        return
+    pytest.importorskip("capnp")
+    store = DiskStore(tmp_path / "store")
+    yield store
+    store.close()
+
+
+def test_create_store(store):
     assert store.store == {}
+    assert len(store.store) == 0
 
 
-def test_virtual_store_save():
-    store = VirtualStore()
+def test_store_save(store):
     for i in range(100):
         store.save(str(i), i)
     assert len(store.store) == 100
 
 
-def test_virtual_store_get():
-    store = VirtualStore()
+def test_store_get(store):
     for i in range(100):
         store.save(str(i), i)
     for i in range(100):
         assert store.get(str(i)) == i
+    assert store.get("missing") is None
 
 
-def test_virtual_store_get_all():
-    store = VirtualStore()
+def test_store_get_all(store):
     obj_list = list(range(100, 0, -1))
     for i in range(100):
         store.save(str(i), obj_list[i])
@@ -43,19 +55,23 @@ def test_virtual_store_get_all():
     assert list(store.get_all(10, 11).values()) == []
     assert len(store.get_all(10, 10)) == 0
 
+    # Saving an ID again keeps its position.
+    store.save("0", -1)
+    assert list(store.get_all(0, 2).values()) == [-1, 99]
 
-def test_virtual_store_delete():
-    store = VirtualStore()
+
+def test_store_delete(store):
     for i in range(100):
         store.save(str(i), i)
     for i in range(100):
         assert len(store.store) == 100 - i
         store.delete(str(i))
     assert len(store.store) == 0
+    with pytest.raises(KeyError):
+        store.delete("0")
 
 
-def test_virtual_store_has():
-    store = VirtualStore()
+def test_store_has(store):
     for i in range(100):
         store.save(str(i), i)
     for i in range(100):
@@ -86,3 +102,32 @@ def test_consumer_get_all(np, consumer, replies):
             ]
         } == replies[ptr.id]
         last_start += 10
+
+
+def test_virtual_store_dedupe():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("capnp")
+    store = VirtualStore(dedupe=True)
+
+    store.save("a", np.arange(100))
+    store.save("b", np.arange(100))
+    store.save("c", np.arange(10))
+
+    assert store.get("a") is store.get("b")
+    assert store.get("c") is not store.get("a")
+    assert len(store.contents) == 2
+
+    store.delete("a")
+    store.save("b", np.arange(5))
+    assert len(store.contents) == 2
+    assert np.array_equal(store.get("b"), np.arange(5))
+
+
+def test_virtual_store_dedupe_unserializable():
+    store = VirtualStore(dedupe=True)
+    obj = object()
+
+    store.save("a", obj)
+
+    assert store.get("a") is obj
+    assert store.contents == {}
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import reflect, strike  # noqa: E402
+from spycular.consumer.virtual import VirtualConsumer  # noqa: E402
+from spycular.pointer.batch_pointer import PointerBatch  # noqa: E402
+from spycular.pointer.object_pointer import ObjectActionPointer  # noqa: E402
+from spycular.pointer.object_pointer import ObjectPointer  # noqa: E402
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+@pytest.fixture
+def setup():
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(VirtualStore(), message_queue, reply_queue)
+    reflect(local_numpy, consumer)
+    return producer, strike(local_numpy, producer), consumer, reply_queue
+
+
+def test_batch_is_sent_as_one_message(setup):
+    producer, np, consumer, replies = setup
+    with producer.batch():
+        x_ptr = np.arange(6)
+        for _ in range(10):
+            x_ptr = x_ptr + 1
+        assert not consumer.message_queue
+    assert len(consumer.message_queue) == 1
+    assert len(consumer.message_queue[0]) == 11
+
+    x_ptr.retrieve()
+    consumer.listen()
+    assert local_numpy.array_equal(
+        replies[x_ptr.id], local_numpy.arange(6) + 10
+    )
+
+
+def test_request_flushes_queue_with_request(setup):
+    producer, np, consumer, replies = setup
+    producer.start_batching()
+    x_ptr = np.ones(3) * 2
+    x_ptr.retrieve()
+    assert len(consumer.message_queue) == 1
+
+    consumer.listen()
+    assert local_numpy.array_equal(replies[x_ptr.id], local_numpy.ones(3) * 2)
+    producer.stop_batching()
+    assert not producer.batching
+
+
+def test_auto_flush_on_size_and_delay(setup):
+    producer, np, consumer, _ = setup
+    producer.start_batching(max_size=4)
+    for _ in range(10):
+        np.zeros(2)
+    assert [len(batch) for batch in consumer.message_queue] == [4, 4]
+    producer.stop_batching()
+    assert [len(batch) for batch in consumer.message_queue] == [4, 4, 2]
+
+    consumer.message_queue.clear()
+    with producer.batch(max_delay=0.01):
+        np.zeros(2)
+        for _ in range(200):
+            if consumer.message_queue:
+                break
+            time.sleep(0.01)
+        assert len(consumer.message_queue) == 1
+
+
+def test_batch_serde():
+    target = ObjectPointer(path="zeros")
+    action = ObjectActionPointer(
+        target_id=target.id,
+        path="__add__",
+        args=(1,),
+        parents=(target,),
+    )
+    batch = PointerBatch([target, action])
+    result = _deserialize(_serialize(batch, to_bytes=True), from_bytes=True)
+    assert [ptr.id for ptr in result.pointers] == [target.id, action.id]
+    assert result.pointers[1].args == (1,)
@@ -0,0 +1,251 @@
+import asyncio
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import reflect, strike  # noqa: E402
+from spycular.consumer.virtual import VirtualConsumer  # noqa: E402
+from spycular.pointer.fused_pointer import FusedPointer  # noqa: E402
+from spycular.pointer.graph.fusion import fuse_elementwise  # noqa: E402
+from spycular.pointer.graph.scheduler import GraphScheduler  # noqa: E402
+from spycular.pointer.object_pointer import ObjectPointer  # noqa: E402
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.reflection.reflected import ReflectedModule  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+def record(build, pinned=None):
+    """Record the pointers of `build(np)` as a graph keeping only the
+    `pinned(results)` IDs."""
+    producer = VirtualProducer([], {})
+    results = build(strike(local_numpy, producer, lazy=True))
+    graph = producer.recorder.pop_graph()
+    if pinned is not None:
+        graph.pinned = set(pinned(results))
+    return graph, results
+
+
+def chain(np):
+    x_ptr = np.arange(1.0, 9.0)
+    y_ptr = np.ones(8)
+    return x_ptr, ((x_ptr + y_ptr) * 3 - x_ptr) / 2
+
+
+def expected_chain():
+    x = local_numpy.arange(1.0, 9.0)
+    return ((x + local_numpy.ones(8)) * 3 - x) / 2
+
+
+def fused_pointers(graph):
+    return [
+        node.pointer
+        for node in graph.graph_map.values()
+        if isinstance(node.pointer, FusedPointer)
+    ]
+
+
+def test_chain_is_fused():
+    graph, (x_ptr, result) = record(chain, lambda res: [res[1].id])
+    assert len(graph.graph_map) == 6
+    assert fuse_elementwise(graph) == 1
+    assert len(graph.graph_map) == 3
+    (fused,) = fused_pointers(graph)
+    assert fused.id == result.id
+    assert [step[0] for step in fused.steps] == [
+        "__add__",
+        "__mul__",
+        "__sub__",
+        "__truediv__",
+    ]
+    assert graph.graph_map[x_ptr.id].count == 1
+    assert graph.topological_order()[-1] == result.id
+
+    storage = VirtualStore()
+    graph.solve(ReflectedModule(local_numpy), storage)
+    assert local_numpy.array_equal(storage.get(result.id), expected_chain())
+    assert set(storage.get_all()) == {result.id}
+
+
+def test_shared_and_pinned_results():
+    def build(np):
+        x_ptr = np.arange(4.0)
+        shared = x_ptr + 1
+        kept = shared * 2
+        return shared, kept, kept + 1, shared - 3
+
+    graph, (shared, kept, last, other) = record(build)
+    # Used twice, `shared` isn't fused. Every recorded result is pinned,
+    # `kept` is saved by the pointer it's fused in.
+    assert fuse_elementwise(graph) == 1
+    assert shared.id in graph.graph_map
+    assert kept.id not in graph.graph_map
+    assert graph.graph_map[shared.id].count == 2
+
+    storage = VirtualStore()
+    graph.solve(ReflectedModule(local_numpy), storage)
+    x = local_numpy.arange(4.0)
+    assert local_numpy.array_equal(storage.get(kept.id), (x + 1) * 2)
+    assert local_numpy.array_equal(storage.get(last.id), (x + 1) * 2 + 1)
+    assert local_numpy.array_equal(storage.get(other.id), x - 2)
+
+
+def test_square_of_a_temporary():
+    def build(np):
+        t_ptr = np.arange(3.0) + 1
+        return t_ptr, t_ptr * t_ptr
+
+    graph, (t_ptr, result) = record(build, lambda res: [res[1].id])
+    assert fuse_elementwise(graph) == 1
+    (fused,) = fused_pointers(graph)
+    assert fused.steps[-1][1:3] == (-1, -1)
+
+    storage = VirtualStore()
+    graph.solve(ReflectedModule(local_numpy), storage)
+    assert local_numpy.array_equal(
+        storage.get(result.id), (local_numpy.arange(3.0) + 1) ** 2
+    )
+
+
+def test_out_buffers_keep_operator_results():
+    ints = local_numpy.arange(1, 5)
+    halves = local_numpy.arange(4, dtype=local_numpy.float32) / 2
+    cases = [
+        # Integer division returns floats.
+        ([("__add__", 0, 1, ""), ("__truediv__", -1, 1, "")], [ints, 1]),
+        # Promoted to float64 by the second operand.
+        ([("__add__", 0, 1, ""), ("__mul__", -1, 2, "")], [halves, 1, ints]),
+        # Broadcast to a larger shape.
+        (
+            [("__add__", 0, 1, ""), ("__mul__", -1, 2, "")],
+            [ints, 1, local_numpy.ones((2, 4))],
+        ),
+        ([("__pow__", 0, 1, ""), ("__mod__", -1, 2, "")], [ints, 2, 3]),
+    ]
+    for steps, args in cases:
+        expected = args[0]
+        for name, _, right, _ in steps:
+            expected = getattr(expected, name)(args[right])
+        storage = VirtualStore()
+        result = FusedPointer(steps, args).solve(local_numpy, storage)
+        assert result.dtype == expected.dtype
+        assert local_numpy.array_equal(result, expected)
+
+
+def test_temporaries_are_reused():
+    x = local_numpy.arange(1_000_000.0)
+    steps = [
+        ("__add__", 0, 1, ""),
+        ("__mul__", -1, 1, ""),
+        ("__sub__", -2, 0, ""),
+        ("__truediv__", -3, 1, ""),
+    ]
+    pointer = FusedPointer(steps, [x, 2.0])
+    tracemalloc.start()
+    result = pointer.solve(local_numpy, VirtualStore())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1.5 * x.nbytes
+    assert local_numpy.array_equal(result, ((x + 2) * 2 - x) / 2)
+
+
+def test_stored_operands_are_not_modified():
+    x = local_numpy.arange(3.0)
+    storage = VirtualStore()
+    storage.save("x", x)
+    steps = [("__add__", 0, 1, ""), ("__mul__", -1, 1, "")]
+    pointer = FusedPointer(steps, [ObjectPointer(pointer_id="x"), 2.0])
+    pointer.solve(local_numpy, storage)
+    assert local_numpy.array_equal(storage.get("x"), local_numpy.arange(3.0))
+
+
+def test_fused_pointer_serde():
+    graph, (_, result) = record(chain, lambda res: [res[1].id])
+    fuse_elementwise(graph)
+    (fused,) = fused_pointers(graph)
+    copy = _deserialize(_serialize(fused, to_bytes=True), from_bytes=True)
+    assert copy.id == fused.id
+    assert [tuple(step) for step in copy.steps] == fused.steps
+
+
+def test_process_pool_runs_fused_pointers():
+    graph, (_, result) = record(chain, lambda res: [res[1].id])
+    fuse_elementwise(graph)
+    scheduler = GraphScheduler(ProcessPoolExecutor(max_workers=2))
+    storage = VirtualStore()
+    asyncio.run(
+        scheduler.run(graph, ReflectedModule(local_numpy), storage, None)
+    )
+    scheduler.shutdown()
+    assert local_numpy.array_equal(storage.get(result.id), expected_chain())
+
+
+def test_consumer_fuses_lazy_graphs():
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(
+        VirtualStore(),
+        message_queue,
+        reply_queue,
+        fuse=True,
+    )
+    reflect(local_numpy, consumer)
+    np = strike(local_numpy, producer, lazy=True)
+    x_ptr, result = chain(np)
+    result.retrieve()
+    graph = message_queue[0]
+    consumer.listen()
+    assert fused_pointers(graph)
+    assert local_numpy.array_equal(reply_queue[result.id], expected_chain())
+
+
+def lazy_setup():
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(
+        VirtualStore(),
+        message_queue,
+        reply_queue,
+        fuse=True,
+    )
+    reflect(local_numpy, consumer)
+    return strike(local_numpy, producer, lazy=True), consumer, reply_queue
+
+
+def test_lazy_intermediates_are_not_stored():
+    np, consumer, reply_queue = lazy_setup()
+    x_ptr = np.arange(1.0, 9.0)
+    total = x_ptr + np.ones(8)
+    scaled = total * 3
+    result = (scaled - x_ptr) / 2
+    intermediates = [total.id, scaled.id]
+    del total, scaled
+
+    result.retrieve()
+    graph = consumer.message_queue[0]
+    consumer.listen()
+    assert fused_pointers(graph)
+    assert local_numpy.array_equal(reply_queue[result.id], expected_chain())
+    assert set(consumer.storage.store) == {x_ptr.id, result.id}
+    assert not any(consumer.storage.has(key) for key in intermediates)
+
+
+def test_lazy_results_the_client_holds_are_stored():
+    np, consumer, reply_queue = lazy_setup()
+    x_ptr = np.arange(1.0, 9.0)
+    scaled = (x_ptr + np.ones(8)) * 3
+    result = (scaled - x_ptr) / 2
+
+    result.retrieve()
+    consumer.listen()
+    assert consumer.storage.has(scaled.id)
+    scaled.retrieve()
+    consumer.listen()
+    assert local_numpy.array_equal(
+        reply_queue[scaled.id],
+        (local_numpy.arange(1.0, 9.0) + 1) * 3,
+    )
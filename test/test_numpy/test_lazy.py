@@ -0,0 +1,98 @@
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import reflect, strike  # noqa: E402
+from spycular.consumer.virtual import VirtualConsumer  # noqa: E402
+from spycular.pointer.graph.abstract import PointerGraph  # noqa: E402
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+@pytest.fixture
+def setup():
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(VirtualStore(), message_queue, reply_queue)
+    reflect(local_numpy, consumer)
+    np = strike(local_numpy, producer, lazy=True)
+    return producer, np, consumer, reply_queue
+
+
+def graphs(consumer):
+    return [
+        msg for msg in consumer.message_queue if isinstance(msg, PointerGraph)
+    ]
+
+
+def test_retrieve_sends_one_graph(setup):
+    producer, np, consumer, replies = setup
+    x_ptr = np.arange(6)
+    y_ptr = (x_ptr + 1) * 2
+    assert not consumer.message_queue
+
+    y_ptr.retrieve()
+    assert len(graphs(consumer)) == 1
+    assert len(graphs(consumer)[0].graph_map) == 3
+    consumer.listen()
+    assert local_numpy.array_equal(
+        replies[y_ptr.id], (local_numpy.arange(6) + 1) * 2
+    )
+    assert not producer.recorder
+
+
+def test_dead_branches_are_pruned(setup):
+    producer, np, consumer, replies = setup
+    x_ptr = np.ones(4)
+    unused = np.zeros(4) + x_ptr
+    y_ptr = x_ptr * 3
+
+    y_ptr.retrieve()
+    (graph,) = graphs(consumer)
+    assert unused.id not in graph.graph_map
+    assert set(graph.graph_map) == {x_ptr.id, y_ptr.id}
+    consumer.listen()
+    assert local_numpy.array_equal(replies[y_ptr.id], local_numpy.ones(4) * 3)
+
+    # Later graphs use the results kept by the consumer.
+    unused.retrieve()
+    consumer.listen()
+    assert local_numpy.array_equal(replies[unused.id], local_numpy.ones(4))
+    assert len(producer.recorder) == 0
+
+
+def test_writes_keep_their_order(setup):
+    _, np, consumer, replies = setup
+    x_ptr = np.zeros(3)
+    before = x_ptr + 1
+    x_ptr.fill(5)
+    after = x_ptr + 1
+
+    after.retrieve()
+    before.retrieve()
+    consumer.listen()
+    assert local_numpy.array_equal(replies[after.id], local_numpy.full(3, 6.0))
+    assert local_numpy.array_equal(replies[before.id], local_numpy.ones(3))
+
+
+def test_stop_recording_sends_everything(setup):
+    producer, np, consumer, _ = setup
+    np.ones(2)
+    np.zeros(2)
+    producer.stop_recording()
+    assert not producer.lazy
+    (graph,) = graphs(consumer)
+    assert len(graph.graph_map) == 2
+
+
+def test_graph_serde(setup):
+    producer, np, _, _ = setup
+    x_ptr = np.arange(4)
+    y_ptr = x_ptr + x_ptr
+    graph = producer.recorder.pop_graph([y_ptr.id])
+
+    result = _deserialize(_serialize(graph, to_bytes=True), from_bytes=True)
+    assert result.graph_map[y_ptr.id].parents == [x_ptr.id]
+    assert result.pinned == {x_ptr.id, y_ptr.id}
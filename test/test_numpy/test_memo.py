@@ -0,0 +1,178 @@
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import reflect, strike  # noqa: E402
+from spycular.consumer.virtual import VirtualConsumer  # noqa: E402
+from spycular.pointer.graph.abstract import PointerGraph  # noqa: E402
+from spycular.pointer.graph.scheduler import GraphScheduler  # noqa: E402
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.reflection.memo import Memoizer  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+def make_setup(memo, lazy=False):
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    consumer = VirtualConsumer(
+        VirtualStore(),
+        message_queue,
+        reply_queue,
+        memo=memo,
+    )
+    reflect(local_numpy, consumer)
+    np = strike(local_numpy, producer, lazy=lazy)
+    return np, consumer, reply_queue
+
+
+@pytest.fixture
+def memo():
+    return Memoizer(pure=["numpy.arange", "numpy.sum"])
+
+
+def test_repeated_calls_are_served(memo):
+    np, consumer, replies = make_setup(memo)
+    first = np.arange(10)
+    second = np.arange(10)
+    other = np.arange(11)
+    consumer.listen()
+    assert memo.hits == 1
+    assert memo.misses == 2
+    assert len(memo) == 2
+
+    stored_first = consumer.storage.get(first.id)
+    stored_second = consumer.storage.get(second.id)
+    assert local_numpy.array_equal(stored_second, local_numpy.arange(10))
+    assert len(consumer.storage.get(other.id)) == 11
+    # Served results are copies.
+    assert stored_first is not stored_second
+    stored_second[0] = 100
+    assert stored_first[0] == 0
+
+
+def test_pointer_arguments_key_by_id(memo):
+    np, consumer, replies = make_setup(memo)
+    x_ptr = np.arange(9).reshape(3, 3) + 1
+    first = np.sum(x_ptr)
+    second = np.sum(x_ptr)
+    consumer.listen()
+    assert memo.hits == 1
+    assert consumer.storage.get(second.id) == consumer.storage.get(first.id)
+
+    # Served copies are keyed as the result they're a copy of.
+    y_ptr = np.arange(4)
+    z_ptr = np.arange(4)
+    np.sum(y_ptr)
+    np.sum(z_ptr)
+    consumer.listen()
+    assert memo.hits == 3
+
+
+def test_writes_invalidate(memo):
+    np, consumer, replies = make_setup(memo)
+    x_ptr = np.arange(4.0)
+    first = np.sum(x_ptr)
+    x_ptr.fill(1.0)
+    second = np.sum(x_ptr)
+    consumer.listen()
+    assert memo.hits == 0
+    assert consumer.storage.get(first.id) == local_numpy.sum(
+        local_numpy.arange(4.0)
+    )
+    assert consumer.storage.get(second.id) == 4.0
+
+    # Writing a cached result drops it.
+    y_ptr = np.arange(3)
+    y_ptr.fill(7)
+    z_ptr = np.arange(3)
+    consumer.listen()
+    assert local_numpy.array_equal(
+        consumer.storage.get(z_ptr.id), local_numpy.arange(3)
+    )
+
+
+def test_impure_calls_are_executed():
+    memo = Memoizer()
+    np, consumer, replies = make_setup(memo)
+    np.arange(5)
+    np.arange(5)
+    consumer.listen()
+    assert memo.hits == 0
+    assert memo.misses == 0
+    assert len(memo) == 0
+
+    memo.mark_pure("numpy.a*")
+    assert memo.is_pure("numpy.arange")
+    assert not memo.is_pure("numpy.zeros")
+
+
+def test_least_recently_used_are_evicted():
+    memo = Memoizer(pure=["numpy.arange"], max_entries=2)
+    np, consumer, replies = make_setup(memo)
+    np.arange(1)
+    np.arange(2)
+    np.arange(1)
+    np.arange(3)
+    consumer.listen()
+    assert len(memo) == 2
+    np.arange(1)
+    np.arange(2)
+    consumer.listen()
+    assert memo.hits == 2
+    assert memo.misses == 4
+
+    memo.clear()
+    assert len(memo) == 0
+
+
+def test_max_bytes():
+    memo = Memoizer(pure=["numpy.arange"], max_bytes=1000)
+    np, consumer, replies = make_setup(memo)
+    np.arange(10)
+    np.arange(1000)
+    consumer.listen()
+    assert len(memo) == 1
+
+
+def test_graph_duplicates_run_once(memo):
+    np, consumer, replies = make_setup(memo, lazy=True)
+    first = np.arange(6)
+    second = np.arange(6)
+    total = first + second
+    total.retrieve()
+    (graph,) = [
+        msg for msg in consumer.message_queue if isinstance(msg, PointerGraph)
+    ]
+    assert memo.dedupe(graph, "numpy") == 1
+    assert first.id in graph.graph_map[second.id].parents
+    assert graph.topological_order().index(
+        first.id
+    ) < graph.topological_order().index(second.id)
+
+    consumer.listen()
+    assert memo.misses == 1
+    assert memo.hits == 1
+    assert local_numpy.array_equal(
+        replies[total.id], local_numpy.arange(6) * 2
+    )
+
+
+def test_scheduler_serves_duplicates(memo):
+    message_queue, reply_queue = [], {}
+    producer = VirtualProducer(message_queue, reply_queue)
+    scheduler = GraphScheduler()
+    consumer = VirtualConsumer(
+        VirtualStore(),
+        message_queue,
+        reply_queue,
+        scheduler=scheduler,
+        memo=memo,
+    )
+    reflect(local_numpy, consumer)
+    np = strike(local_numpy, producer, lazy=True)
+    total = np.sum(np.arange(5)) + np.sum(np.arange(5))
+    total.retrieve()
+    consumer.listen()
+    scheduler.shutdown()
+    assert memo.hits == 2
+    assert reply_queue[total.id] == 20
@@ -0,0 +1,286 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+local_numpy = pytest.importorskip("numpy")
+
+from spycular import strike  # noqa: E402
+from spycular.pointer.callable_pointer import FunctionPointer  # noqa: E402
+from spycular.pointer.graph.async_graph import AsyncPointerGraph  # noqa: E402
+from spycular.pointer.graph.cost import CostModel  # noqa: E402
+from spycular.pointer.graph.memory import object_nbytes  # noqa: E402
+from spycular.pointer.graph.scheduler import GraphScheduler  # noqa: E402
+from spycular.pointer.object_pointer import (  # noqa: E402
+    GetPointer,
+    ObjectPointer,
+)
+from spycular.producer.virtual import VirtualProducer  # noqa: E402
+from spycular.reflection.reflected import ReflectedModule  # noqa: E402
+from spycular.serde.capnp.deserialize import _deserialize  # noqa: E402
+from spycular.serde.capnp.serialize import _serialize  # noqa: E402
+from spycular.store.virtual import VirtualStore  # noqa: E402
+
+
+def record(build):
+    """Record the pointers of `build(np)` and return them as a graph."""
+    producer = VirtualProducer([], {})
+    results = build(strike(local_numpy, producer, lazy=True))
+    return producer.recorder.pop_graph(), results
+
+
+def run(scheduler, graph, module=local_numpy):
+    storage, replies = VirtualStore(), {}
+    asyncio.run(
+        scheduler.run(
+            graph,
+            ReflectedModule(module),
+            storage,
+            lambda obj_id, obj: replies.__setitem__(obj_id, obj),
+        ),
+    )
+    return storage
+
+
+def wide(np):
+    x_ptr = np.arange(8.0)
+    return [x_ptr * idx + 1 for idx in range(16)]
+
+
+def test_threads_run_independent_nodes_concurrently():
+    pointers = [FunctionPointer("sleep", args=(0.2,)) for _ in range(4)]
+    graph = AsyncPointerGraph(pointers, dependencies={})
+    scheduler = GraphScheduler(ThreadPoolExecutor(max_workers=4))
+
+    start = time.perf_counter()
+    run(scheduler, graph, module=time)
+    assert time.perf_counter() - start < 0.6
+    scheduler.shutdown()
+
+
+def test_thread_pool_results():
+    graph, results = record(wide)
+    scheduler = GraphScheduler(ThreadPoolExecutor(max_workers=4))
+    storage = run(scheduler, graph)
+    for idx, ptr in enumerate(results):
+        assert local_numpy.array_equal(
+            storage.get(ptr.id),
+            local_numpy.arange(8.0) * idx + 1,
+        )
+    scheduler.shutdown()
+
+
+def test_process_pool_results_and_writes():
+    def build(np):
+        x_ptr = np.zeros(4)
+        x_ptr.fill(3)
+        return [x_ptr + 1, x_ptr * 2]
+
+    graph, (y_ptr, z_ptr) = record(build)
+    scheduler = GraphScheduler(ProcessPoolExecutor(max_workers=2))
+    storage = run(scheduler, graph)
+    assert local_numpy.array_equal(
+        storage.get(y_ptr.id), local_numpy.full(4, 4.0)
+    )
+    assert local_numpy.array_equal(
+        storage.get(z_ptr.id), local_numpy.full(4, 6.0)
+    )
+    scheduler.shutdown()
+
+
+def test_in_flight_bound():
+    pointers = [FunctionPointer("sleep", args=(0.15,)) for _ in range(2)]
+    graph = AsyncPointerGraph(pointers, dependencies={})
+    scheduler = GraphScheduler(
+        ThreadPoolExecutor(max_workers=2),
+        max_in_flight=1,
+    )
+
+    start = time.perf_counter()
+    run(scheduler, graph, module=time)
+    assert time.perf_counter() - start >= 0.3
+    scheduler.shutdown()
+
+
+def test_errors_are_raised():
+    graph, _ = record(lambda np: np.ones(2) + "x")
+    scheduler = GraphScheduler(ThreadPoolExecutor(max_workers=2))
+    with pytest.raises(Exception):
+        run(scheduler, graph)
+    scheduler.shutdown()
+
+
+class RecordingModule:
+    """Stands in for a ReflectedModule, recording the execution order."""
+
+    def __init__(self):
+        self.order = []
+
+    def execute(self, pointer, storage=None, reply_callback=None):
+        self.order.append(pointer.path)
+        storage.save(pointer.id, None)
+
+
+def skewed_graph():
+    """A root, a chain of three nodes and two single node branches."""
+    root = FunctionPointer("root")
+    chain = [FunctionPointer(f"chain{idx}") for idx in range(3)]
+    short = [FunctionPointer(f"short{idx}") for idx in range(2)]
+    dependencies = {ptr.id: [root.id] for ptr in short}
+    dependencies[chain[0].id] = [root.id]
+    dependencies[chain[1].id] = [chain[0].id]
+    dependencies[chain[2].id] = [chain[1].id]
+    return AsyncPointerGraph(
+        [root] + short + chain,
+        dependencies=dependencies,
+    )
+
+
+def test_critical_path_and_width():
+    graph = skewed_graph()
+    remaining = {
+        graph.graph_map[key].path: length
+        for key, length in graph.critical_path().items()
+    }
+    assert remaining["root"] == 4
+    assert remaining["chain0"] == 3
+    assert remaining["short0"] == 1
+    assert graph.width == 3
+
+
+def test_longest_remaining_path_runs_first():
+    module = RecordingModule()
+    scheduler = GraphScheduler(ThreadPoolExecutor(max_workers=1))
+    asyncio.run(scheduler.run(skewed_graph(), module, VirtualStore()))
+    assert module.order[:2] == ["root", "chain0"]
+    scheduler.shutdown()
+
+    module = RecordingModule()
+    asyncio.run(skewed_graph().async_solve(module, VirtualStore()))
+    assert module.order[:2] == ["root", "chain0"]
+
+
+def test_costs_of_previous_runs_change_priorities():
+    costs = CostModel()
+    costs.update("short0", 10.0)
+    module = RecordingModule()
+    asyncio.run(
+        skewed_graph().async_solve(module, VirtualStore(), None, costs)
+    )
+    assert module.order[:2] == ["root", "short0"]
+
+    # The run measured every path, averaging with the previous estimate.
+    assert "chain2" in costs
+    assert costs.estimate("short0") < 5.1
+    assert costs.estimate("unknown") == costs.default
+
+
+def test_fan_out_from_single_root_runs_every_node():
+    graph, results = record(wide)
+    assert graph.width == len(results)
+    storage = VirtualStore()
+    asyncio.run(graph.async_solve(ReflectedModule(local_numpy), storage))
+    for idx, ptr in enumerate(results):
+        assert local_numpy.array_equal(
+            storage.get(ptr.id),
+            local_numpy.arange(8.0) * idx + 1,
+        )
+
+
+def test_compiled_graph_indices():
+    outside = FunctionPointer("outside")
+    first, second, reduction = (FunctionPointer(name) for name in "abc")
+    # Pointers in any order, with a parent outside the graph.
+    graph = AsyncPointerGraph(
+        [reduction, second, first],
+        dependencies={
+            reduction.id: [first.id, second.id],
+            second.id: [outside.id],
+        },
+    )
+    compiled = graph.compiled
+    index = compiled.index
+    assert compiled.indegree.tolist() == [2, 0, 0]
+    assert compiled.sucessors(index[first.id]).tolist() == [0]
+    assert sorted(compiled.parents(index[reduction.id])) == [1, 2]
+    assert compiled.topological_order()[-1] == index[reduction.id]
+    assert graph.graph_map[first.id].count == 1
+
+
+def test_slotted_nodes_serde():
+    graph, _ = record(wide)
+    assert not hasattr(next(iter(graph.graph_map.values())), "__dict__")
+    graph.compiled
+    received = _deserialize(_serialize(graph, to_bytes=True), from_bytes=True)
+    assert received.graph_map.keys() == graph.graph_map.keys()
+    assert received.compiled.indegree == graph.compiled.indegree
+
+
+def expand_reduce(width, length):
+    root = FunctionPointer("ones", args=(length,))
+    pointers, dependencies, totals = [root], {}, []
+    for _ in range(width):
+        branch = FunctionPointer(
+            "sin",
+            args=(ObjectPointer(pointer_id=root.id),),
+        )
+        total = FunctionPointer(
+            "sum",
+            args=(ObjectPointer(pointer_id=branch.id),),
+        )
+        dependencies[branch.id] = [root.id]
+        dependencies[total.id] = [branch.id]
+        pointers += [branch, total]
+        totals.append(total)
+    return AsyncPointerGraph(pointers, dependencies=dependencies), totals
+
+
+def test_object_nbytes():
+    array = local_numpy.zeros(128)
+    assert object_nbytes(array) == 1024
+    assert object_nbytes([array, array]) > 2048
+
+
+def test_memory_budget_bounds_stored_results():
+    nbytes = 8 * 1024
+    peaks = {}
+    for limit in (2**40, 3 * nbytes):
+        graph, totals = expand_reduce(16, nbytes // 8)
+        scheduler = GraphScheduler(
+            ThreadPoolExecutor(max_workers=2),
+            memory_budget=limit,
+        )
+        storage = run(scheduler, graph)
+        for total in totals:
+            assert storage.get(total.id) == pytest.approx(
+                (nbytes // 8) * local_numpy.sin(1.0),
+            )
+        peaks[limit] = scheduler.memory_peak
+        scheduler.shutdown()
+    # Critical path order stores every branch when unbounded.
+    assert peaks[2**40] >= 16 * nbytes
+    # One branch may run past the budget when nothing else can.
+    assert peaks[3 * nbytes] <= 4 * nbytes + 1024
+
+
+def test_retrieved_results_are_pinned():
+    def build(np):
+        y_ptr = np.ones(3) + 1
+        return y_ptr, y_ptr * 2
+
+    graph, (y_ptr, z_ptr) = record(build)
+    pointers = [node.pointer for node in graph.graph_map.values()]
+    get_ptr = GetPointer(target_id=y_ptr.id)
+    graph = AsyncPointerGraph([get_ptr] + pointers)
+    assert y_ptr.id in graph.pinned
+
+    storage, replies = VirtualStore(), {}
+    graph.solve(
+        ReflectedModule(local_numpy),
+        storage,
+        lambda obj_id, obj: replies.__setitem__(obj_id, obj),
+    )
+    assert local_numpy.array_equal(replies[y_ptr.id], local_numpy.full(3, 2))
+    assert storage.has(y_ptr.id)
+    assert storage.has(z_ptr.id)
@@ -20,3 +20,11 @@ def ws_np_client2():
     np = strike(module=local_numpy, producer=producer)
     yield np
     producer.close()
+
+
+@pytest.fixture(scope="session")
+def ws_np_lazy_client():
+    producer = WebSocketsProducer("localhost:8765")
+    np = strike(module=local_numpy, producer=producer, lazy=True)
+    yield np
+    producer.close()
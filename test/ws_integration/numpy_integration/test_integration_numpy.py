@@ -33,3 +33,42 @@ def test_multiple_ws_clients(ws_np_client, ws_np_client2):
         x2_ptr.retrieve(),
         local_numpy.array([2, 4, 6, 8, 10, 12]),
     )
+
+
+def test_delta_retrieve(ws_np_client):
+    np = ws_np_client
+    x_ptr = np.zeros(2**18)
+
+    first = x_ptr.retrieve(delta=True)
+    x_ptr[5] = 1.0
+    second = x_ptr.retrieve(delta=True)
+
+    # Earlier results view the same copy, patched in place.
+    assert first[5] == 1.0
+    assert second[5] == 1.0
+    assert second.sum() == 1.0
+    assert not second.flags.writeable
+
+
+def test_batched_operations(ws_np_client):
+    np = ws_np_client
+    with np.broker.batch():
+        x_ptr = np.arange(6)
+        for _ in range(100):
+            x_ptr = x_ptr + 1
+        assert np.broker.batch_queue
+        result = x_ptr.retrieve()
+
+    assert not np.broker.batch_queue
+    assert local_numpy.array_equal(result, local_numpy.arange(6) + 100)
+
+
+def test_lazy_graph(ws_np_lazy_client):
+    np = ws_np_lazy_client
+    x_ptr = np.arange(6)
+    y_ptr = (x_ptr + x_ptr) * 2
+    z_ptr = np.ones(6) - x_ptr
+
+    assert local_numpy.array_equal(y_ptr.retrieve(), local_numpy.arange(6) * 4)
+    assert z_ptr.id in np.broker.recorder.pending
+    assert local_numpy.array_equal(z_ptr.retrieve(), 1 - local_numpy.arange(6))